@@ -0,0 +1,57 @@
+"""Create finance_daily_rollup table and backfill it from existing transactions
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create finance_daily_rollup and fill it from t_finance_transaction + paid t_fee_transaction"""
+    op.create_table(
+        'finance_daily_rollup',
+        sa.Column('rollup_date', sa.Date(), primary_key=True),
+        sa.Column('source', sa.String(20), primary_key=True),
+        sa.Column('category', sa.String(), primary_key=True),
+        sa.Column('income', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('expense', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('transaction_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+    # Backfill (transaksi tanpa tanggal disimpan di 0001-01-01, sama seperti src/finance/rollup.py)
+    op.execute("""
+        INSERT INTO finance_daily_rollup (rollup_date, source, category, income, expense, transaction_count)
+        SELECT COALESCE(transaction_date, DATE '0001-01-01'), 'finance', category,
+               COALESCE(SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END), 0),
+               COUNT(*)
+        FROM t_finance_transaction
+        GROUP BY COALESCE(transaction_date, DATE '0001-01-01'), category
+    """)
+    op.execute("""
+        INSERT INTO finance_daily_rollup (rollup_date, source, category, income, expense, transaction_count)
+        SELECT COALESCE(ft.transaction_date, DATE '0001-01-01'), 'fee', f.fee_name,
+               COALESCE(SUM(ft.amount), 0), 0, COUNT(*)
+        FROM t_fee_transaction ft
+        JOIN m_fee f ON f.fee_id = ft.fee_id
+        WHERE ft.status = 'paid'
+        GROUP BY COALESCE(ft.transaction_date, DATE '0001-01-01'), f.fee_name
+    """)
+
+    print("✅ Created and backfilled 'finance_daily_rollup' table")
+
+
+def downgrade():
+    """Drop finance_daily_rollup table"""
+    op.drop_table('finance_daily_rollup', if_exists=True)
+
+    print("✅ Dropped 'finance_daily_rollup' table")
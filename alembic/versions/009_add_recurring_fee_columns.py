@@ -0,0 +1,42 @@
+"""Add rt_id to m_fee and period_start to t_fee_transaction for recurring fees
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add columns used by the recurring fee scheduler"""
+    # Scope RT untuk fee (null = semua keluarga)
+    op.add_column('m_fee', sa.Column('rt_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_fee_rt', 'm_fee', 'm_rt', ['rt_id'], ['rt_id'])
+
+    # Periode tagihan untuk fee weekly/monthly
+    op.add_column('t_fee_transaction', sa.Column('period_start', sa.Date(), nullable=True))
+    op.create_unique_constraint(
+        'uq_fee_transaction_period',
+        't_fee_transaction',
+        ['fee_id', 'family_id', 'period_start']
+    )
+
+    print("✅ Added 'rt_id' to m_fee and 'period_start' to t_fee_transaction")
+
+
+def downgrade():
+    """Remove recurring fee columns"""
+    op.drop_constraint('uq_fee_transaction_period', 't_fee_transaction', type_='unique')
+    op.drop_column('t_fee_transaction', 'period_start')
+    op.drop_constraint('fk_fee_rt', 'm_fee', type_='foreignkey')
+    op.drop_column('m_fee', 'rt_id')
+
+    print("✅ Removed recurring fee columns")
@@ -0,0 +1,50 @@
+"""Add rating_count and rating_sum to products
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add denormalized rating columns to m_product and backfill from t_product_rating"""
+    op.add_column(
+        'm_product',
+        sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0')
+    )
+    op.add_column(
+        'm_product',
+        sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0')
+    )
+
+    # Backfill dari rating yang sudah ada
+    op.execute("""
+        UPDATE m_product p
+        SET rating_count = r.rating_count,
+            rating_sum = r.rating_sum
+        FROM (
+            SELECT product_id, COUNT(*) AS rating_count, SUM(rating_value) AS rating_sum
+            FROM t_product_rating
+            GROUP BY product_id
+        ) r
+        WHERE p.product_id = r.product_id
+    """)
+
+    print("✅ Added and backfilled 'rating_count' and 'rating_sum' columns on m_product table")
+
+
+def downgrade():
+    """Remove rating aggregate columns from m_product table"""
+    op.drop_column('m_product', 'rating_sum')
+    op.drop_column('m_product', 'rating_count')
+
+    print("✅ Removed 'rating_count' and 'rating_sum' columns from m_product table")
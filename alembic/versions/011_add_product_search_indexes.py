@@ -0,0 +1,43 @@
+"""Add full-text and trigram search indexes for marketplace products
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create GIN indexes used by src/marketplace/search.py"""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Harus identik dengan product_search_document() di src/marketplace/search.py
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_product_search_vector
+        ON m_product
+        USING GIN (to_tsvector('simple'::regconfig, (COALESCE(name, '') || ' ') || COALESCE(description, '')))
+    """)
+
+    # Mempercepat ILIKE '%...%' dan similarity() pada name
+    op.execute("""
+        CREATE INDEX IF NOT EXISTS ix_product_name_trgm
+        ON m_product
+        USING GIN (name gin_trgm_ops)
+    """)
+
+    print("✅ Created product search indexes (tsvector + pg_trgm)")
+
+
+def downgrade():
+    """Drop product search indexes"""
+    op.execute("DROP INDEX IF EXISTS ix_product_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_product_search_vector")
+
+    print("✅ Dropped product search indexes")
@@ -0,0 +1,48 @@
+"""Add t_product_image_classification for offline product image classification
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Create result table written by src/ai/classify_catalog.py"""
+    op.create_table(
+        't_product_image_classification',
+        sa.Column('image_path', sa.String(500), nullable=False),
+        sa.Column('model_version', sa.String(20), nullable=False),
+        sa.Column('product_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('label', sa.String(50), nullable=True),
+        sa.Column('confidence', sa.Float(), nullable=True),
+        sa.Column('segmenter', sa.String(20), nullable=False),
+        sa.Column('error', sa.String(255), nullable=True),
+        sa.Column('classified_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('image_path', 'model_version'),
+        sa.ForeignKeyConstraint(['product_id'], ['m_product.product_id'], ondelete='CASCADE')
+    )
+    op.create_index(
+        'ix_t_product_image_classification_product_id',
+        't_product_image_classification',
+        ['product_id']
+    )
+
+    print("✅ Created 't_product_image_classification' table")
+
+
+def downgrade():
+    """Drop t_product_image_classification table"""
+    op.drop_index('ix_t_product_image_classification_product_id', table_name='t_product_image_classification')
+    op.drop_table('t_product_image_classification')
+
+    print("✅ Dropped 't_product_image_classification' table")
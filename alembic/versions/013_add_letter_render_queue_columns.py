@@ -0,0 +1,51 @@
+"""Add render queue columns to t_letter_transaction
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add columns used by src/letter/render_queue.py"""
+    op.add_column(
+        't_letter_transaction',
+        sa.Column('render_attempts', sa.Integer(), nullable=False, server_default='0')
+    )
+    op.add_column(
+        't_letter_transaction',
+        sa.Column('render_error', sa.String(), nullable=True)
+    )
+    op.add_column(
+        't_letter_transaction',
+        sa.Column('render_available_at', sa.DateTime(), nullable=True)
+    )
+
+    # Worker hanya membaca baris status 'rendering'
+    op.create_index(
+        'ix_letter_transaction_render_queue',
+        't_letter_transaction',
+        ['render_available_at'],
+        postgresql_where=sa.text("status = 'rendering'")
+    )
+
+    print("✅ Added render queue columns to t_letter_transaction table")
+
+
+def downgrade():
+    """Remove render queue columns from t_letter_transaction table"""
+    op.drop_index('ix_letter_transaction_render_queue', table_name='t_letter_transaction')
+    op.drop_column('t_letter_transaction', 'render_available_at')
+    op.drop_column('t_letter_transaction', 'render_error')
+    op.drop_column('t_letter_transaction', 'render_attempts')
+
+    print("✅ Removed render queue columns from t_letter_transaction table")
@@ -0,0 +1,39 @@
+"""Add render_batch_id to t_letter_transaction
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add render_batch_id used by POST /letters/requests/batch-approve"""
+    op.add_column(
+        't_letter_transaction',
+        sa.Column('render_batch_id', postgresql.UUID(as_uuid=True), nullable=True)
+    )
+    op.create_index(
+        'ix_t_letter_transaction_render_batch_id',
+        't_letter_transaction',
+        ['render_batch_id']
+    )
+
+    print("✅ Added render_batch_id to t_letter_transaction table")
+
+
+def downgrade():
+    """Remove render_batch_id from t_letter_transaction table"""
+    op.drop_index('ix_t_letter_transaction_render_batch_id', table_name='t_letter_transaction')
+    op.drop_column('t_letter_transaction', 'render_batch_id')
+
+    print("✅ Removed render_batch_id from t_letter_transaction table")
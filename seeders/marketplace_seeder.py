@@ -274,6 +274,8 @@ def seed_marketplace(db):
             )
             ratings.append(rating)
             db.add(rating)
+            product.rating_count = (product.rating_count or 0) + 1
+            product.rating_sum = (product.rating_sum or 0) + rating.rating_value
             rating_count += 1
             
             if rating_count % 10 == 0:
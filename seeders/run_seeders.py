@@ -39,7 +39,7 @@ def run_all_seeders():
     from src.entities.family import FamilyModel, FamilyMovementModel, RTModel
     from src.entities.home import HomeModel, HomeHistoryModel
     from src.entities.refresh_session import RefreshSessionModel
-    from src.entities.finance import FeeModel, FeeTransactionModel, FinanceTransactionModel
+    from src.entities.finance import FeeModel, FeeTransactionModel, FinanceTransactionModel, FinanceDailyRollupModel
     from src.entities.activity import ActivityModel, DashboardBannerModel
     from src.entities.marketplace import TransactionMethodModel, ProductModel, ProductTransactionModel, ListProductTransactionModel, ProductRatingModel
     from src.entities.report import ReportModel
@@ -62,6 +62,7 @@ def run_all_seeders():
     db.query(DashboardBannerModel).delete()
     db.query(ActivityModel).delete()
     # Delete finance tables
+    db.query(FinanceDailyRollupModel).delete()
     db.query(FeeTransactionModel).delete()
     db.query(FinanceTransactionModel).delete()
     db.query(FeeModel).delete()
@@ -125,6 +126,9 @@ def run_all_seeders():
         print("Step 9: Seeding finance (fees & transactions)...")
         print("-"*60)
         seed_finance(db)
+        from src.finance.rollup import rebuild_finance_rollup
+        rows = rebuild_finance_rollup(db)
+        print(f"✓ Rebuilt finance_daily_rollup: {rows} rows")
         print("\n")
 
         print("Step 10: Seeding refresh sessions...")
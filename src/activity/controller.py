@@ -18,10 +18,12 @@ def list_activities(
 	status_: str = Query(None, alias="status", description="Filter by status (LIKE)"),
 	offset: int = 0,
 	limit: int = 10,
+	cursor: str = Query(None, description="next_cursor dari halaman sebelumnya (keyset pagination)"),
+	include_total: str = Query("exact", pattern="^(false|exact|estimate)$", description="false = tanpa count (infinite scroll), estimate = perkiraan"),
 	db: Session = Depends(get_db)
 ):
-	filters = ActivityFilter(name=name, status=status_, offset=offset, limit=limit)
-	total_count, activities = service.get_activities(db, filters)
+	filters = ActivityFilter(name=name, status=status_, offset=offset, limit=limit, cursor=cursor, include_total=include_total)
+	total_count, activities, next_cursor = service.get_activities(db, filters)
 	
 	data = [
 		ActivityOut(
@@ -42,6 +44,7 @@ def list_activities(
 	
 	return ActivityListResponse(
 		total_count=total_count,
+		next_cursor=next_cursor,
 		data=data
 	)
 
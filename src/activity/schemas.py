@@ -42,7 +42,10 @@ class ActivityFilter(BaseModel):
 	status: Optional[str] = Field(None, description="Filter by status (LIKE)")
 	offset: int = 0
 	limit: int = 10
+	cursor: Optional[str] = Field(None, description="next_cursor dari halaman sebelumnya (keyset pagination)")
+	include_total: str = Field("exact", pattern="^(false|exact|estimate)$", description="false = tanpa count (infinite scroll)")
 
 class ActivityListResponse(BaseModel):
-	total_count: int
+	total_count: Optional[int] = None  # None jika memakai cursor
+	next_cursor: Optional[str] = None
 	data: List[ActivityOut]
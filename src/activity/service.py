@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 from src.entities.activity import ActivityModel
 from src.activity.schemas import ActivityCreate, ActivityUpdate, ActivityFilter
+from src.pagination import keyset_paginate, count_total
 from uuid import UUID
 
 # Helper function to format status (underscore to space, title case)
@@ -13,7 +14,7 @@ def format_status(status: str) -> str:
 		return status
 	return status.replace('_', ' ').title()
 
-def get_activities(db: Session, filters: ActivityFilter) -> Tuple[int, List[ActivityModel]]:
+def get_activities(db: Session, filters: ActivityFilter) -> Tuple[Optional[int], List[ActivityModel], Optional[str]]:
 	query_filters = []
 	# LIKE filter for name
 	if filters.name:
@@ -26,13 +27,10 @@ def get_activities(db: Session, filters: ActivityFilter) -> Tuple[int, List[Acti
 	if query_filters:
 		query = query.filter(and_(*query_filters))
 
-	total_count = query.count()
-	results = (
-		query
-		.order_by(ActivityModel.start_date.desc())
-		.offset(filters.offset)
-		.limit(filters.limit)
-		.all()
+	total_count = count_total(query, filters.include_total, filters.cursor)
+	results, next_cursor = keyset_paginate(
+		query, ActivityModel.start_date, ActivityModel.activity_id,
+		limit=filters.limit, offset=filters.offset, cursor=filters.cursor
 	)
 	# Format status for all results
 	for result in results:
@@ -40,7 +38,7 @@ def get_activities(db: Session, filters: ActivityFilter) -> Tuple[int, List[Acti
 			result.status = format_status(result.status)
 		if result.category:
 			result.category = format_status(result.category)
-	return total_count, results
+	return total_count, results, next_cursor
 
 def get_activity_by_id(db: Session, activity_id: UUID) -> Optional[ActivityModel]:
 	result = db.query(ActivityModel).filter(ActivityModel.activity_id == activity_id).first()
@@ -7,7 +7,7 @@ from src.entities.user import UserModel
 from src.entities.resident import ResidentModel
 from src.entities.report import ReportModel
 from src.entities.letter import LetterTransactionModel
-from src.entities.finance import FeeTransactionModel
+from src.entities.finance import FeeTransactionModel, FinanceDailyRollupModel
 
 
 # ==================== Admin Statistics Services ====================
@@ -111,10 +111,10 @@ def get_admin_statistics(db: Session) -> dict:
 def get_total_income(db: Session) -> float:
     """
     Get total income from all paid fee transactions.
-    Sums amount from fee_transactions where status='paid'
+    Sums fee income from finance_daily_rollup (maintained on fee verification)
     """
-    total = db.query(func.sum(FeeTransactionModel.amount)).filter(
-        FeeTransactionModel.status == 'paid'
+    total = db.query(func.sum(FinanceDailyRollupModel.income)).filter(
+        FinanceDailyRollupModel.source == 'fee'
     ).scalar()
     
     return float(total) if total else 0.0
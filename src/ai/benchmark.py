@@ -0,0 +1,271 @@
+"""
+Benchmark pipeline inference AI per tahap.
+
+Setiap gambar di storage/vegetable_images/<label>/*.jpg dijalankan melalui
+tahap yang sama dengan endpoint /ai/predict, dan setiap tahap diukur terpisah:
+
+    decode   decode_image_bytes (cek header + imdecode)
+    resize   resize_to_work_resolution (AI_WORK_MAX_SIDE)
+    segment  GrabCut / HSV
+    gray     grayscale + resize 128x128 bersama untuk HOG dan LBP
+    hog      skimage hog
+    lbp      histogram LBP uniform
+    predict  predict_proba satu baris (hanya jika model tersedia)
+
+Output: p50/p95/mean per tahap, peak RSS proses benchmark, serta throughput
+end-to-end lewat InferencePool pada beberapa jumlah worker (concurrency),
+termasuk peak RSS worker terbesar (VmHWM, Linux). Hasil lengkap bisa ditulis
+sebagai JSON untuk dibandingkan antar commit:
+
+    python -m src.ai.benchmark --output bench-before.json
+    python -m src.ai.benchmark --output bench-after.json --compare bench-before.json
+    python -m src.ai.benchmark --segmenter hsv --concurrency 1 2 4 --rounds 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from src.ai.compare_segmenters import DATASET_DIR, load_dataset
+from src.ai.features import hog_from_gray, lbp_histogram_from_gray, to_feature_gray
+from src.ai.model_loader import MODEL_PATH, model_registry
+from src.ai.service import (
+    DEFAULT_SEGMENTER, SEGMENTERS, WORK_MAX_SIDE,
+    decode_image_bytes, predict_features, resize_to_work_resolution, segment_image
+)
+from src.exceptions import AppException
+
+STAGES = ("decode", "resize", "segment", "gray", "hog", "lbp", "predict")
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss dalam KB di Linux, byte di macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _process_peak_rss_mb(pid: int) -> float:
+    """Peak RSS proses lain dari /proc/<pid>/status (VmHWM); None jika tidak tersedia."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def _summary(samples_ms: list) -> dict:
+    if not samples_ms:
+        return {"n": 0, "p50_ms": None, "p95_ms": None, "mean_ms": None}
+    values = np.asarray(samples_ms)
+    return {
+        "n": len(samples_ms),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "mean_ms": round(float(values.mean()), 3),
+    }
+
+
+# ---------------------------
+# LATENSI PER TAHAP
+# ---------------------------
+def benchmark_stages(samples: list, segmenter: str, model=None, repeat: int = 1) -> dict:
+    """Jalankan semua gambar tahap demi tahap (proses ini saja). Return ringkasan per tahap + total."""
+    timings = {stage: [] for stage in STAGES}
+    totals = []
+
+    for _ in range(repeat):
+        for _, _, data in samples:
+            image_ms = 0.0
+
+            def timed(stage, fn, *args):
+                nonlocal image_ms
+                start = time.perf_counter()
+                result = fn(*args)
+                elapsed = (time.perf_counter() - start) * 1000
+                timings[stage].append(elapsed)
+                image_ms += elapsed
+                return result
+
+            img = timed("decode", decode_image_bytes, data)
+            img = timed("resize", resize_to_work_resolution, img)
+            img = timed("segment", segment_image, img, segmenter)
+            gray = timed("gray", to_feature_gray, img)
+            hog_features = timed("hog", hog_from_gray, gray)
+            lbp_features = timed("lbp", lbp_histogram_from_gray, gray)
+            if model is not None:
+                features = np.hstack([hog_features, lbp_features]).reshape(1, -1)
+                timed("predict", predict_features, features, model)
+            totals.append(image_ms)
+
+    result = {stage: _summary(values) for stage, values in timings.items() if values}
+    result["total"] = _summary(totals)
+    return result
+
+
+# ---------------------------
+# THROUGHPUT END-TO-END
+# ---------------------------
+async def _throughput_at(samples: list, workers: int, segmenter: str, model_path: str, rounds: int) -> dict:
+    from src.ai.inference import InferencePool
+
+    items = [data for _, _, data in samples] * rounds
+    pool = InferencePool(workers=workers, max_pending=len(items), model_path=model_path)
+    try:
+        await pool.warm_up()
+        latencies = []
+
+        async def one(data):
+            start = time.perf_counter()
+            await pool.predict(data, segmenter)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one(data) for data in items])
+        elapsed = time.perf_counter() - start
+
+        # Baca sebelum shutdown selagi proses worker masih hidup
+        executor = pool._get_executor()
+        worker_rss = [_process_peak_rss_mb(pid) for pid in (executor._processes or {})] if executor else []
+        worker_rss = [rss for rss in worker_rss if rss is not None]
+    finally:
+        pool.shutdown()
+
+    latency = _summary(latencies)
+    return {
+        "concurrency": workers,
+        "images": len(items),
+        "seconds": round(elapsed, 3),
+        "images_per_second": round(len(items) / elapsed, 2),
+        "latency_p50_ms": latency["p50_ms"],
+        "latency_p95_ms": latency["p95_ms"],
+        "worker_peak_rss_mb": max(worker_rss) if worker_rss else None,
+    }
+
+
+def benchmark_throughput(samples: list, levels: list, segmenter: str, model_path: str, rounds: int = 1) -> list:
+    """Throughput lewat InferencePool (micro-batch + process pool) untuk setiap jumlah worker."""
+    return [asyncio.run(_throughput_at(samples, workers, segmenter, model_path, rounds)) for workers in levels]
+
+
+# ---------------------------
+# LAPORAN
+# ---------------------------
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmark(dataset_dir: str, segmenter: str, levels: list, rounds: int, repeat: int, model_path: str) -> dict:
+    samples = load_dataset(dataset_dir)
+    if not samples:
+        raise SystemExit(f"Dataset kosong: {dataset_dir}")
+
+    # Model tidak wajib ada: tanpa model tahap predict dan throughput dilewati
+    model, model_version, skipped = None, None, None
+    try:
+        model_registry.path = model_path
+        loaded = model_registry.get()
+        model, model_version = loaded.model, loaded.version
+    except AppException as ae:
+        skipped = ae.message
+
+    stages = benchmark_stages(samples, segmenter, model, repeat)
+    throughput = benchmark_throughput(samples, levels, segmenter, model_path, rounds) if model is not None else []
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "config": {
+            "dataset": dataset_dir,
+            "images": len(samples),
+            "segmenter": segmenter,
+            "work_max_side": WORK_MAX_SIDE,
+            "repeat": repeat,
+            "rounds": rounds,
+            "model_version": model_version,
+            "model_skipped": skipped,
+        },
+        "stages": stages,
+        "throughput": throughput,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _delta(new, old) -> str:
+    if new is None or not old:
+        return ""
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def print_report(result: dict, baseline: dict = None) -> None:
+    config = result["config"]
+    print(f"commit {result['commit']} | {config['images']} images x{config['repeat']} | segmenter={config['segmenter']} work_max_side={config['work_max_side'] or 'full'}")
+    if config["model_skipped"]:
+        print(f"! Model tidak tersedia ({config['model_skipped']}); predict & throughput dilewati")
+
+    old_stages = (baseline or {}).get("stages", {})
+    print(f"{'stage':<8} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9} {'Δ p50':>8}")
+    for stage, summary in result["stages"].items():
+        old_p50 = old_stages.get(stage, {}).get("p50_ms")
+        print(
+            f"{stage:<8} {summary['p50_ms']:>9.2f} {summary['p95_ms']:>9.2f} {summary['mean_ms']:>9.2f} "
+            f"{_delta(summary['p50_ms'], old_p50):>8}"
+        )
+
+    if result["throughput"]:
+        old_throughput = {t["concurrency"]: t for t in (baseline or {}).get("throughput", [])}
+        print(f"{'workers':>7} {'images/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'Δ img/s':>8} {'worker RSS MB':>14}")
+        for t in result["throughput"]:
+            old = old_throughput.get(t["concurrency"], {}).get("images_per_second")
+            print(
+                f"{t['concurrency']:>7} {t['images_per_second']:>9.2f} {t['latency_p50_ms']:>9.1f} "
+                f"{t['latency_p95_ms']:>9.1f} {_delta(t['images_per_second'], old):>8} {t['worker_peak_rss_mb'] or '-':>14}"
+            )
+
+    print(f"peak RSS proses benchmark: {result['peak_rss_mb']} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark pipeline inference AI per tahap")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--segmenter", choices=SEGMENTERS, default=DEFAULT_SEGMENTER)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 2, os.cpu_count() or 1],
+                        help="Jumlah worker InferencePool untuk uji throughput")
+    parser.add_argument("--rounds", type=int, default=1, help="Berapa kali dataset dikirim per level concurrency")
+    parser.add_argument("--repeat", type=int, default=1, help="Berapa kali dataset diulang untuk latensi per tahap")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--output", help="Tulis hasil lengkap sebagai JSON")
+    parser.add_argument("--compare", help="JSON hasil sebelumnya untuk ditampilkan selisihnya")
+    args = parser.parse_args()
+
+    levels = sorted({max(level, 1) for level in args.concurrency})
+    result = run_benchmark(args.dataset, args.segmenter, levels, args.rounds, args.repeat, args.model)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print_report(result, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"✓ JSON ditulis ke {args.output}")
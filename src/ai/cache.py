@@ -0,0 +1,148 @@
+"""
+Cache hasil prediksi berdasarkan isi gambar.
+
+Key = SHA-256 bytes upload + versi model + segmenter + resolusi kerja, sehingga
+gambar yang sama di-upload ulang langsung mendapat (label, confidence,
+model_version) tanpa segmentasi/ekstraksi fitur. SHA-256 (bukan perceptual hash) dipakai supaya
+gambar yang hanya mirip tidak pernah mendapat hasil gambar lain.
+
+- L1: LRU di memori proses, dibatasi AI_CACHE_MAX_ENTRIES
+- L2 (opsional): Redis bila AI_CACHE_REDIS_URL diisi, dengan TTL AI_CACHE_TTL_SECONDS
+
+Hanya prediksi yang berhasil yang di-cache. Versi model diambil dari model yang
+sedang dilayani inference pool, jadi hot-swap model otomatis memakai key baru.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple, Union
+from src.ai.service import DEFAULT_SEGMENTER, WORK_MAX_SIDE
+from src.exceptions import AppException
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "ai:prediction:v2:"
+
+
+class PredictionCache:
+    def __init__(self, max_entries: int, redis_url: str = None, ttl_seconds: int = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._redis = None
+        if redis_url:
+            from redis.asyncio import Redis
+            self._redis = Redis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+
+    def _get_local(self, key: str) -> Optional[Tuple[str, float, str]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: Tuple[str, float, str]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get(self, key: str) -> Optional[Tuple[str, float, str]]:
+        value = self._get_local(key)
+        if value is None and self._redis is not None:
+            try:
+                raw = await self._redis.get(REDIS_KEY_PREFIX + key)
+            except Exception:
+                logger.exception("Prediction cache: redis get failed")
+                raw = None
+            if raw:
+                label, confidence, model_version = json.loads(raw)
+                value = (label, float(confidence), model_version)
+                self._set_local(key, value)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    async def set(self, key: str, value: Tuple[str, float, str]) -> None:
+        self._set_local(key, value)
+        if self._redis is not None:
+            try:
+                await self._redis.set(REDIS_KEY_PREFIX + key, json.dumps(list(value)), ex=self.ttl_seconds)
+            except Exception:
+                logger.exception("Prediction cache: redis set failed")
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "backend": "memory+redis" if self._redis is not None else "memory",
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else None,
+            }
+
+
+prediction_cache = PredictionCache(
+    max_entries=int(os.getenv("AI_CACHE_MAX_ENTRIES", "1024")),
+    redis_url=os.getenv("AI_CACHE_REDIS_URL"),
+    ttl_seconds=int(os.getenv("AI_CACHE_TTL_SECONDS", "86400"))
+)
+
+
+def prediction_cache_key(data: bytes, model_version: str, segmenter: str = None) -> str:
+    digest = hashlib.sha256(data).hexdigest()
+    return f"{model_version}:{segmenter or DEFAULT_SEGMENTER}:{WORK_MAX_SIDE}:{digest}"
+
+
+async def predict_cached(pool, data: bytes, segmenter: str = None) -> Tuple[str, float, str]:
+    """pool.predict dengan cache; Return (label, confidence, model_version)"""
+    model_version = await asyncio.to_thread(pool.current_model_version)
+    key = await asyncio.to_thread(prediction_cache_key, data, model_version, segmenter)
+    cached = await prediction_cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = await pool.predict(data, segmenter)
+    # Model bisa di-swap selagi prediksi berjalan; jangan simpan hasil versi lain di key ini
+    if result[2] == model_version:
+        await prediction_cache.set(key, result)
+    return result
+
+
+async def predict_many_cached(
+    pool,
+    items: List[bytes],
+    segmenter: str = None
+) -> List[Union[Tuple[str, float, str], AppException]]:
+    """pool.predict_many dengan cache; hanya gambar yang belum ada di cache yang diprediksi."""
+    model_version = await asyncio.to_thread(pool.current_model_version)
+    keys = await asyncio.to_thread(lambda: [prediction_cache_key(data, model_version, segmenter) for data in items])
+    results = [await prediction_cache.get(key) for key in keys]
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        predictions = await pool.predict_many([items[i] for i in missing], segmenter)
+        for i, prediction in zip(missing, predictions):
+            results[i] = prediction
+            if not isinstance(prediction, AppException) and prediction[2] == model_version:
+                await prediction_cache.set(keys[i], prediction)
+
+    return results
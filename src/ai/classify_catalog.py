@@ -0,0 +1,339 @@
+"""
+Klasifikasi offline gambar produk marketplace (backfill kategori) tanpa web tier.
+
+Sumber gambar (di-stream, tidak dimuat ke memori sekaligus):
+    --dir PATH      semua gambar di folder (default: storage/default/product_banner)
+    --products      semua path di ProductModel.images_path
+
+Gambar dikirim per batch ke ProcessPoolExecutor (default: semua core). Setiap
+worker me-load model sekali (mmap + warm-up, lihat src/ai/model_loader.py) dan
+membaca file sendiri, jadi hanya path dan hasil yang melewati batas proses.
+
+Output (boleh keduanya):
+    --jsonl FILE    satu baris JSON per gambar, di-append + fsync per batch
+    --table         upsert ke t_product_image_classification (commit per batch)
+
+Checkpoint: setiap batch yang selesai langsung ditulis, dan saat dijalankan ulang
+gambar yang sudah punya hasil untuk versi model yang sama dilewati. Job yang
+terhenti cukup dijalankan ulang dengan argumen yang sama. Dengan --retry-errors
+gambar yang gagal diproses ulang; di JSONL baris terakhir per gambar yang berlaku.
+
+Cara menjalankan:
+    python -m src.ai.classify_catalog --jsonl storage/ai/product_banner.jsonl
+    python -m src.ai.classify_catalog --products --table --workers 8 --batch-size 32
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import uuid as uuid_lib
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+from src.ai.inference import _init_worker, _model_info_in_worker
+from src.ai.model_loader import MODEL_PATH
+from src.ai.service import DEFAULT_SEGMENTER, SEGMENTERS
+from src.exceptions import AppException
+
+DEFAULT_DIR = os.path.join("storage", "default", "product_banner")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+# ---------------------------
+# SUMBER GAMBAR
+# ---------------------------
+def iter_directory(directory: str) -> Iterator[Tuple[str, Optional[str]]]:
+    """Yield (path, None) untuk setiap gambar di folder, urut supaya hasil bisa dibandingkan antar run."""
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                yield os.path.join(root, filename).replace("\\", "/"), None
+
+
+def iter_product_images(db) -> Iterator[Tuple[str, Optional[str]]]:
+    """Yield (path, product_id) dari ProductModel.images_path, dibaca per 500 produk."""
+    from src.entities.marketplace import ProductModel
+
+    query = (
+        db.query(ProductModel.product_id, ProductModel.images_path)
+        .filter(ProductModel.images_path.isnot(None))
+        .order_by(ProductModel.product_id)
+        .yield_per(500)
+    )
+    for product_id, images_path in query:
+        for path in images_path or []:
+            yield path, str(product_id)
+
+
+# ---------------------------
+# DI DALAM PROSES WORKER
+# ---------------------------
+def _classify_paths_in_worker(paths: List[str], segmenter: str) -> List[dict]:
+    """Baca + klasifikasi satu batch file. Return satu dict hasil per path (urutan sama)."""
+    from src.ai.model_loader import model_registry
+    from src.ai.service import predict_batch_from_bytes
+
+    records = [{"image_path": path, "label": None, "confidence": None, "error": None} for path in paths]
+    try:
+        loaded = model_registry.get()
+    except AppException as ae:
+        for record in records:
+            record.update(error=ae.message, model_version=None)
+        return records
+
+    readable, items = [], []
+    for record in records:
+        record["model_version"] = loaded.version
+        try:
+            with open(record["image_path"], "rb") as f:
+                items.append(f.read())
+            readable.append(record)
+        except OSError as e:
+            record["error"] = f"Gagal membaca file: {e.strerror}"
+
+    results = predict_batch_from_bytes(items, [segmenter] * len(items), loaded.model) if items else []
+    for record, result in zip(readable, results):
+        if isinstance(result, AppException):
+            record["error"] = result.message
+        else:
+            record["label"], record["confidence"] = result
+    return records
+
+
+# ---------------------------
+# OUTPUT + CHECKPOINT
+# ---------------------------
+class JsonlSink:
+    def __init__(self, path: str, model_version: str, retry_errors: bool = False):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Baris terakhir bisa terpotong jika proses mati saat menulis
+                    if record.get("model_version") == model_version and not (retry_errors and record.get("error")):
+                        self.done.add(record["image_path"])
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, records: List[dict]) -> None:
+        for record in records:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class TableSink:
+    def __init__(self, db, model_version: str, retry_errors: bool = False):
+        from src.entities.marketplace import ProductImageClassificationModel as Model
+
+        self.db = db
+        self.model = Model
+        query = db.query(Model.image_path).filter(Model.model_version == model_version)
+        if retry_errors:
+            query = query.filter(Model.error.is_(None))
+        self.done = {image_path for image_path, in query}
+
+        dialect = db.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise AppException(f"t_product_image_classification upsert not supported for dialect: {dialect}", status_code=500)
+        self._insert = insert
+
+    def write(self, records: List[dict]) -> None:
+        rows = [
+            {
+                "image_path": record["image_path"],
+                "model_version": record["model_version"] or "missing",
+                "product_id": uuid_lib.UUID(record["product_id"]) if record.get("product_id") else None,
+                "label": record["label"],
+                "confidence": record["confidence"],
+                "segmenter": record["segmenter"],
+                "error": (record["error"] or "")[:255] or None,
+                "classified_at": datetime.utcnow(),
+            }
+            for record in records
+        ]
+        stmt = self._insert(self.model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["image_path", "model_version"],
+            set_={column: stmt.excluded[column] for column in ("product_id", "label", "confidence", "segmenter", "error", "classified_at")}
+        )
+        try:
+            self.db.execute(stmt)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def close(self) -> None:
+        pass
+
+
+# ---------------------------
+# JOB
+# ---------------------------
+def _batches(source, done: set, batch_size: int, stats: dict):
+    batch, seen = [], set()
+    for path, product_id in source:
+        if path in done or path in seen:
+            stats["skipped"] += 1
+            continue
+        seen.add(path)
+        batch.append((path, product_id))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def classify_catalog(
+    source,
+    sinks: list,
+    workers: int,
+    batch_size: int = 16,
+    segmenter: str = None,
+    model_path: str = MODEL_PATH,
+    start_method: str = "spawn",
+    progress_seconds: float = 10.0
+) -> dict:
+    """
+    Klasifikasi semua gambar dari source (iterator (path, product_id)) dan tulis ke sinks.
+    Return statistik: processed, ok, errors, skipped, elapsed_seconds, images_per_second.
+    """
+    segmenter = segmenter or DEFAULT_SEGMENTER
+    stats = {"processed": 0, "ok": 0, "errors": 0, "skipped": 0}
+    done = set.intersection(*[sink.done for sink in sinks]) if sinks else set()
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(start_method),
+        initializer=_init_worker,
+        initargs=(model_path,)
+    )
+    try:
+        # Load model di semua worker dulu supaya waktu load tidak masuk hitungan throughput
+        warm_up_start = time.perf_counter()
+        for future in [executor.submit(_model_info_in_worker) for _ in range(workers)]:
+            future.result()
+        stats["warm_up_seconds"] = round(time.perf_counter() - warm_up_start, 2)
+
+        start = last_report = time.perf_counter()
+        inflight = {}
+
+        def collect(futures):
+            for future in futures:
+                batch = inflight.pop(future)
+                records = future.result()
+                for record, (_, product_id) in zip(records, batch):
+                    record["product_id"] = product_id
+                    record["segmenter"] = segmenter
+                    stats["ok" if record["error"] is None else "errors"] += 1
+                for sink in sinks:
+                    sink.write(records)
+                stats["processed"] += len(records)
+
+        for batch in _batches(source, done, batch_size, stats):
+            # Batasi batch in-flight supaya source tetap di-stream
+            while len(inflight) >= workers * 2:
+                finished, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                collect(finished)
+
+            future = executor.submit(_classify_paths_in_worker, [path for path, _ in batch], segmenter)
+            inflight[future] = batch
+
+            now = time.perf_counter()
+            if progress_seconds and now - last_report >= progress_seconds:
+                last_report = now
+                rate = stats["processed"] / (now - start) if now > start else 0.0
+                print(f"… {stats['processed']} images ({stats['errors']} errors, {stats['skipped']} skipped), {rate:.1f} images/sec", flush=True)
+
+        while inflight:
+            finished, _ = wait(inflight, return_when=FIRST_COMPLETED)
+            collect(finished)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    stats["elapsed_seconds"] = round(elapsed, 2)
+    stats["images_per_second"] = round(stats["processed"] / elapsed, 2) if elapsed > 0 else None
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Klasifikasi offline gambar produk (backfill kategori)")
+    source_group = parser.add_mutually_exclusive_group()
+    source_group.add_argument("--dir", default=DEFAULT_DIR, help="Folder gambar (default: %(default)s)")
+    source_group.add_argument("--products", action="store_true", help="Ambil path dari ProductModel.images_path")
+    parser.add_argument("--jsonl", help="File output JSONL (append, sekaligus checkpoint)")
+    parser.add_argument("--table", action="store_true", help="Tulis hasil ke t_product_image_classification")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--segmenter", choices=SEGMENTERS, default=DEFAULT_SEGMENTER)
+    parser.add_argument("--model", default=MODEL_PATH, help="File model (default: %(default)s)")
+    parser.add_argument("--retry-errors", action="store_true", help="Proses ulang gambar yang sebelumnya gagal")
+    parser.add_argument("--progress-seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if not args.jsonl and not args.table:
+        parser.error("pilih minimal satu output: --jsonl FILE dan/atau --table")
+
+    from src.ai.model_loader import get_model_version
+    model_version = get_model_version(args.model)
+    if model_version == "missing":
+        raise SystemExit(f"Model file not found: {args.model}")
+
+    # Session terpisah untuk source (yield_per) dan sink (commit per batch)
+    sessions = []
+    if args.products or args.table:
+        from src.database.core import SessionLocal
+
+    sinks = []
+    try:
+        if args.jsonl:
+            sinks.append(JsonlSink(args.jsonl, model_version, args.retry_errors))
+        if args.table:
+            sessions.append(SessionLocal())
+            sinks.append(TableSink(sessions[-1], model_version, args.retry_errors))
+
+        if args.products:
+            sessions.append(SessionLocal())
+            source = iter_product_images(sessions[-1])
+        else:
+            source = iter_directory(args.dir)
+        stats = classify_catalog(
+            source,
+            sinks,
+            workers=max(args.workers, 1),
+            batch_size=max(args.batch_size, 1),
+            segmenter=args.segmenter,
+            model_path=args.model,
+            progress_seconds=args.progress_seconds
+        )
+    finally:
+        for sink in sinks:
+            sink.close()
+        for session in sessions:
+            session.close()
+
+    print(
+        f"✓ model {model_version}: {stats['processed']} images classified "
+        f"({stats['ok']} ok, {stats['errors']} errors, {stats['skipped']} skipped from checkpoint) "
+        f"in {stats['elapsed_seconds']}s = {stats['images_per_second']} images/sec "
+        f"(model warm-up {stats['warm_up_seconds']}s)"
+    )
@@ -0,0 +1,114 @@
+"""
+Perbandingan akurasi/latensi mode segmentasi pada dataset berlabel
+storage/vegetable_images/<label>/*.jpg.
+
+Setiap konfigurasi (segmenter, resolusi kerja) menjalankan decode + segmentasi +
+HOG/LBP untuk semua gambar, lalu prediksi dengan model yang sama. Output:
+latensi per gambar (median & p95), akurasi terhadap label folder, dan
+kecocokan prediksi dengan baseline (grabcut resolusi penuh).
+
+Cara menjalankan:
+    python -m src.ai.compare_segmenters
+    python -m src.ai.compare_segmenters --max-side 0 256 320 512 --segmenter grabcut hsv
+"""
+import argparse
+import os
+import time
+import numpy as np
+from src.ai.service import SEGMENTERS, decode_image_bytes, extract_features, predict_features
+from src.exceptions import AppException
+
+DATASET_DIR = os.path.join("storage", "vegetable_images")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+
+def load_dataset(dataset_dir: str) -> list:
+    """Returns list (label, nama file, bytes) dari folder per label."""
+    samples = []
+    for label in sorted(os.listdir(dataset_dir)):
+        label_dir = os.path.join(dataset_dir, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for filename in sorted(os.listdir(label_dir)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                with open(os.path.join(label_dir, filename), "rb") as f:
+                    samples.append((label, filename, f.read()))
+    return samples
+
+
+def run_config(samples: list, segmenter: str, max_side: int, predict: bool) -> dict:
+    latencies, features = [], []
+    for _, _, data in samples:
+        start = time.perf_counter()
+        img = decode_image_bytes(data, work_max_side=max_side)
+        features.append(extract_features(img, segmenter=segmenter, work_max_side=max_side))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    predictions = None
+    if predict:
+        predictions = [label for label, _ in predict_features(np.vstack(features))]
+
+    return {
+        "segmenter": segmenter,
+        "max_side": max_side,
+        "latency_median_ms": float(np.median(latencies)),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+        "predictions": predictions,
+    }
+
+
+def compare(dataset_dir: str, segmenters: list, max_sides: list) -> list:
+    samples = load_dataset(dataset_dir)
+    if not samples:
+        raise SystemExit(f"Dataset kosong: {dataset_dir}")
+
+    # Model tidak wajib ada: tanpa model hanya latensi yang dibandingkan
+    try:
+        from src.ai.model_loader import load_model
+        load_model()
+        predict = True
+    except AppException as ae:
+        print(f"! Model tidak tersedia ({ae.message}); hanya latensi yang diukur")
+        predict = False
+
+    # Baseline = perilaku lama (GrabCut di resolusi penuh)
+    baseline = run_config(samples, "grabcut", 0, predict)
+    results = [baseline]
+    for segmenter in segmenters:
+        for max_side in max_sides:
+            if (segmenter, max_side) != ("grabcut", 0):
+                results.append(run_config(samples, segmenter, max_side, predict))
+
+    labels = [label for label, _, _ in samples]
+    baseline_predictions = baseline["predictions"]
+    for result in results:
+        predictions = result.pop("predictions")
+        if predictions is None:
+            result["accuracy"] = result["agreement"] = None
+            continue
+        result["accuracy"] = float(np.mean([p == t for p, t in zip(predictions, labels)]))
+        result["agreement"] = float(np.mean([p == b for p, b in zip(predictions, baseline_predictions)]))
+
+    return results
+
+
+def _fmt(value, pattern):
+    return "-" if value is None else pattern.format(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bandingkan mode segmentasi (akurasi vs latensi)")
+    parser.add_argument("--dataset", default=DATASET_DIR)
+    parser.add_argument("--segmenter", nargs="+", default=list(SEGMENTERS), choices=SEGMENTERS)
+    parser.add_argument("--max-side", nargs="+", type=int, default=[0, 320])
+    args = parser.parse_args()
+
+    results = compare(args.dataset, args.segmenter, args.max_side)
+
+    print(f"{'segmenter':<10} {'max_side':>8} {'median ms':>10} {'p95 ms':>10} {'accuracy':>9} {'agreement':>10}")
+    for r in results:
+        print(
+            f"{r['segmenter']:<10} {r['max_side'] or 'full':>8} "
+            f"{r['latency_median_ms']:>10.1f} {r['latency_p95_ms']:>10.1f} "
+            f"{_fmt(r['accuracy'], '{:.1%}'):>9} {_fmt(r['agreement'], '{:.1%}'):>10}"
+        )
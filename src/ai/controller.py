@@ -1,9 +1,19 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, status
 from src.exceptions import AppException
-from src.ai.service import save_upload_file, predict_from_file
-from src.ai.schemas import PredictResponse, PredictionResult
+from src.ai.service import MAX_UPLOAD_BYTES
+from src.ai.model_loader import MODEL_DIR
+from src.auth.service import require_role
+from src.ai.inference import inference_pool
+from src.ai.cache import prediction_cache, predict_cached, predict_many_cached
+from src.ai.thumbnails import thumbnail_set
+from src.ai.schemas import PredictResponse, PredictionResult, BatchPredictItem, BatchPredictResponse, ModelReloadRequest
+from typing import List, Optional
+import asyncio
 import os
 
+# Batas jumlah gambar per request /ai/predict/batch
+MAX_BATCH_IMAGES = int(os.getenv("AI_MAX_BATCH_IMAGES", "16"))
+
 router = APIRouter(prefix="/ai", tags=["AI Service"])
 
 # Pemetaan deskripsi dan gambar serupa berdasarkan label
@@ -65,53 +75,102 @@ label_to_description = {
     },
 }
 
+def build_prediction_result(label: str, confidence: float, model_version: str = None) -> PredictionResult:
+    """Lengkapi hasil prediksi dengan deskripsi, nama ilmiah, gambar serupa (+ thumbnail), dan versi model"""
+    info = label_to_description.get(label, {})
+    similar_images = info.get("similar_images", [])
+    thumbnails = [thumbnail_set(url) for url in similar_images]
+    return PredictionResult(
+        label=label,
+        confidence=confidence,
+        description=info.get("description", ""),
+        scientific_name=info.get("scientific_name", ""),
+        similar_images=similar_images,
+        similar_image_thumbnails=[thumbnail for thumbnail in thumbnails if thumbnail is not None],
+        model_version=model_version
+    )
+
+
 @router.post("/predict", response_model=PredictResponse)
-async def predict_image_endpoint(image: UploadFile = File(...)):
-    # Simpan file sementara
+async def predict_image_endpoint(
+    image: UploadFile = File(...),
+    segmenter: Optional[str] = Query(None, pattern="^(grabcut|hsv)$", description="Default dari AI_SEGMENTER")
+):
+    # Baca isi upload langsung ke memori (maksimal MAX_UPLOAD_BYTES + 1 untuk deteksi oversize)
+    data = await image.read(MAX_UPLOAD_BYTES + 1)
+
+    # Lakukan prediksi di process pool (tidak memblokir event loop, digabung ke micro-batch)
     try:
-        saved_path = save_upload_file(image)
+        label, confidence, model_version = await predict_cached(inference_pool, data, segmenter)
     except AppException as ae:
-        raise HTTPException(status_code=400, detail=str(ae))
+        raise HTTPException(status_code=ae.status_code, detail=ae.message)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save upload: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal prediction error: {e}")
 
-    # Lakukan prediksi
-    try:
-        label, confidence = predict_from_file(saved_path)
+    # Mengembalikan respons termasuk label, confidence, deskripsi, nama ilmiah, gambar serupa, dan versi model
+    return PredictResponse(success=True, result=build_prediction_result(label, confidence, model_version))
+
+
+@router.post("/predict/batch", response_model=BatchPredictResponse)
+async def predict_batch_endpoint(
+    images: List[UploadFile] = File(...),
+    segmenter: Optional[str] = Query(None, pattern="^(grabcut|hsv)$", description="Default dari AI_SEGMENTER")
+):
+    """
+    Prediksi beberapa gambar dalam satu request (maksimal MAX_BATCH_IMAGES).
+    Gambar yang gagal tidak menggagalkan gambar lain; lihat success/message per item.
+    """
+    if len(images) > MAX_BATCH_IMAGES:
+        raise HTTPException(status_code=400, detail=f"Maksimal {MAX_BATCH_IMAGES} gambar per request")
 
-        # Mengambil deskripsi dan gambar serupa berdasarkan label yang diprediksi
-        description = label_to_description.get(label, {}).get("description", "")
-        scientific_name = label_to_description.get(label, {}).get("scientific_name", "")
-        similar_images = label_to_description.get(label, {}).get("similar_images", [])
+    items = [await image.read(MAX_UPLOAD_BYTES + 1) for image in images]
 
+    try:
+        predictions = await predict_many_cached(inference_pool, items, segmenter)
     except AppException as ae:
-        # Bersihkan file dan kembalikan error
-        try:
-            os.remove(saved_path)
-        except Exception:
-            pass
-        raise HTTPException(status_code=400, detail=str(ae))
+        raise HTTPException(status_code=ae.status_code, detail=ae.message)
     except Exception as e:
-        try:
-            os.remove(saved_path)
-        except Exception:
-            pass
         raise HTTPException(status_code=500, detail=f"Internal prediction error: {e}")
 
-    # Hapus file sementara (opsional)
+    results = []
+    for image, prediction in zip(images, predictions):
+        if isinstance(prediction, AppException):
+            results.append(BatchPredictItem(filename=image.filename, success=False, message=prediction.message))
+        else:
+            results.append(BatchPredictItem(filename=image.filename, success=True, result=build_prediction_result(*prediction)))
+
+    return BatchPredictResponse(success=all(item.success for item in results), results=results)
+
+
+@router.get("/cache/stats", response_model=dict)
+async def prediction_cache_stats_endpoint():
+    """Statistik cache prediksi (hit/miss/eviction)"""
+    return prediction_cache.stats()
+
+
+@router.get("/model", response_model=dict)
+async def model_info_endpoint():
+    """Versi model yang sedang dilayani"""
+    return {"version": await asyncio.to_thread(inference_pool.current_model_version)}
+
+
+@router.post("/model/reload", response_model=dict, dependencies=[require_role("admin")])
+async def reload_model_endpoint(data: ModelReloadRequest):
+    """
+    Hot-swap model tanpa restart (admin). Model baru di-load dan di-warm-up di semua
+    worker dulu; jika gagal, model lama tetap dipakai.
+    """
+    filename = data.filename or os.path.basename(inference_pool.model_path)
+    if os.path.basename(filename) != filename or not filename.endswith(".pkl"):
+        raise HTTPException(status_code=400, detail="filename harus nama file .pkl di folder model")
+
+    model_path = os.path.join(MODEL_DIR, filename)
+    if not os.path.isfile(model_path):
+        raise HTTPException(status_code=404, detail=f"Model {filename} tidak ditemukan")
+
     try:
-        os.remove(saved_path)
-    except Exception:
-        pass
-
-    # Mengembalikan respons termasuk label, confidence, deskripsi, nama ilmiah, dan gambar serupa
-    return PredictResponse(
-        success=True,
-        result=PredictionResult(
-            label=label,
-            confidence=confidence,
-            description=description,
-            scientific_name=scientific_name,
-            similar_images=similar_images
-        )
-    )
+        info = await inference_pool.swap_model(model_path)
+    except AppException as ae:
+        raise HTTPException(status_code=ae.status_code, detail=ae.message)
+
+    return {"success": True, "version": info["version"], "load_ms": info.get("load_ms")}
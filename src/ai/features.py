@@ -0,0 +1,143 @@
+"""
+Ekstraksi fitur HOG + LBP dengan satu pass grayscale.
+
+Sebelumnya extract_hog_features dan extract_lbp_features masing-masing
+melakukan cvtColor + resize sendiri, dan LBP memakai implementasi per-pixel
+scikit-image. Di sini grayscale 128x128 dihitung sekali, dan histogram LBP
+uniform dihitung dengan NumPy (vektor per titik sampling, rumus interpolasi
+bilinear yang sama dengan scikit-image) sehingga hasilnya identik dan
+model_sayur.pkl tetap bisa dipakai.
+
+HOG tetap memakai skimage.feature.hog: cv2.HOGDescriptor memakai gradien,
+interpolasi bin dan urutan blok yang berbeda (serta tidak punya transform_sqrt),
+sehingga tidak kompatibel dengan fitur yang dipakai saat training.
+
+Verifikasi kesetaraan dengan implementasi lama:
+    python -m src.ai.features --verify
+    python -m src.ai.features --verify --dataset storage/vegetable_images
+"""
+import argparse
+import os
+import cv2
+import numpy as np
+from skimage.feature import hog
+
+FEATURE_SIZE = (128, 128)
+
+
+def to_feature_gray(img: np.ndarray) -> np.ndarray:
+    """Grayscale + resize ke FEATURE_SIZE (dipakai bersama oleh HOG dan LBP)."""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, FEATURE_SIZE)
+
+
+def hog_from_gray(gray: np.ndarray) -> np.ndarray:
+    return hog(
+        gray,
+        orientations=9,
+        pixels_per_cell=(8, 8),
+        cells_per_block=(2, 2),
+        block_norm='L2-Hys',
+        visualize=False,
+        transform_sqrt=True
+    )
+
+
+def lbp_uniform(gray: np.ndarray, P: int = 8, R: int = 1) -> np.ndarray:
+    """
+    LBP metode 'uniform' tervektorisasi, setara skimage.feature.local_binary_pattern:
+    titik sampling dibulatkan 5 desimal, interpolasi bilinear dengan nilai 0 di luar gambar.
+    """
+    image = np.ascontiguousarray(gray, dtype=np.float64)
+    h, w = image.shape
+    pad = R + 1
+    padded = np.pad(image, pad, mode="constant")
+    rows = np.arange(h, dtype=np.float64)[:, np.newaxis]
+    cols = np.arange(w, dtype=np.float64)[np.newaxis, :]
+
+    def shifted(dy, dx):
+        # Pixel (r + dy, c + dx) untuk semua (r, c); di luar gambar bernilai 0
+        return padded[pad + dy:pad + dy + h, pad + dx:pad + dx + w]
+
+    bits = np.empty((P, h, w), dtype=np.uint8)
+    for i in range(P):
+        rp = round(-R * np.sin(2 * np.pi * i / P), 5)
+        cp = round(R * np.cos(2 * np.pi * i / P), 5)
+        r0, r1 = int(np.floor(rp)), int(np.ceil(rp))
+        c0, c1 = int(np.floor(cp)), int(np.ceil(cp))
+
+        # dr/dc dihitung per baris/kolom persis seperti scikit-image (r + rp) - floor(r + rp)
+        dr = (rows + rp) - (rows + r0)
+        dc = (cols + cp) - (cols + c0)
+
+        top = (1 - dc) * shifted(r0, c0) + dc * shifted(r0, c1)
+        bottom = (1 - dc) * shifted(r1, c0) + dc * shifted(r1, c1)
+        texture = (1 - dr) * top + dr * bottom
+        np.greater_equal(texture - image, 0, out=bits[i], casting="unsafe")
+
+    # Pola uniform (<= 2 transisi 0/1) -> jumlah bit 1, selain itu P + 1
+    changes = (bits[:-1] != bits[1:]).sum(axis=0)
+    return np.where(changes <= 2, bits.sum(axis=0), P + 1).astype(np.float64)
+
+
+def lbp_histogram_from_gray(gray: np.ndarray, P: int = 8, R: int = 1) -> np.ndarray:
+    lbp = lbp_uniform(gray, P, R)
+    hist = np.bincount(lbp.ravel().astype(np.intp), minlength=P + 2)[:P + 2].astype("float")
+    hist /= (hist.sum() + 1e-7)  # Normalisasi histogram
+    return hist
+
+
+def extract_feature_vector(img_segmented: np.ndarray) -> np.ndarray:
+    """HOG + histogram LBP dari gambar BGR yang sudah disegmentasi."""
+    gray = to_feature_gray(img_segmented)
+    return np.hstack([hog_from_gray(gray), lbp_histogram_from_gray(gray)])
+
+
+def verify_equivalence(images, atol: float = 1e-9) -> dict:
+    """
+    Bandingkan extract_feature_vector dengan implementasi lama
+    (extract_hog_features + extract_lbp_features di src.ai.service).
+    Returns dict berisi jumlah gambar, selisih maksimum, dan status ok.
+    """
+    from src.ai.service import extract_hog_features, extract_lbp_features
+
+    max_diff = 0.0
+    for img in images:
+        expected = np.hstack([extract_hog_features(img), extract_lbp_features(img)])
+        actual = extract_feature_vector(img)
+        if expected.shape != actual.shape:
+            return {"images": len(images), "max_abs_diff": None, "ok": False}
+        max_diff = max(max_diff, float(np.max(np.abs(expected - actual))))
+
+    return {"images": len(images), "max_abs_diff": max_diff, "ok": max_diff <= atol}
+
+
+def _verification_images(dataset_dir: str) -> list:
+    images = []
+    if os.path.isdir(dataset_dir):
+        for root, _, files in os.walk(dataset_dir):
+            for filename in sorted(files):
+                img = cv2.imread(os.path.join(root, filename))
+                if img is not None:
+                    images.append(img)
+
+    # Gambar sintetis: noise, area datar (banyak nilai sama), dan hasil segmentasi (latar hitam)
+    rng = np.random.default_rng(0)
+    images.append(rng.integers(0, 256, (240, 320, 3), dtype=np.uint8))
+    images.append(np.full((100, 100, 3), 127, dtype=np.uint8))
+    masked = rng.integers(0, 256, (200, 150, 3), dtype=np.uint8)
+    masked[:50] = 0
+    images.append(masked)
+    return images
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifikasi fitur HOG/LBP baru vs implementasi lama")
+    parser.add_argument("--verify", action="store_true", required=True)
+    parser.add_argument("--dataset", default=os.path.join("storage", "vegetable_images"))
+    parser.add_argument("--atol", type=float, default=1e-9)
+    args = parser.parse_args()
+
+    result = verify_equivalence(_verification_images(args.dataset), atol=args.atol)
+    print(f"{'✓' if result['ok'] else '✗'} {result['images']} images, max |diff| = {result['max_abs_diff']}")
+    raise SystemExit(0 if result["ok"] else 1)
@@ -0,0 +1,353 @@
+"""
+Inference service klasifikasi sayur di luar event loop.
+
+GrabCut + HOG/LBP + model.predict memakan ratusan milidetik CPU per gambar.
+Pekerjaan itu dijalankan di ProcessPoolExecutor khusus (model di-load sekali
+per worker lewat load_model), endpoint cukup meng-await future-nya.
+
+Micro-batching: request yang datang bersamaan dikumpulkan selama
+AI_BATCH_WINDOW_MS (atau sampai AI_BATCH_MAX_SIZE gambar), lalu dikirim ke satu
+worker sebagai satu batch: fitur digabung menjadi satu matriks dan
+predict_proba dipanggil sekali.
+
+Backpressure: jika jumlah gambar yang sedang diproses/antri sudah mencapai
+AI_INFERENCE_MAX_PENDING, request baru langsung ditolak dengan 503.
+
+Model: warm_up() (saat startup) dan swap_model() menyiapkan pool worker baru,
+dan pool aktif hanya diganti jika setiap worker berhasil me-load model
+(+ inference warm-up) dengan versi yang sama; batch yang sedang berjalan di pool
+lama tetap diselesaikan. Di pool tersebut kegagalan load di initializer bersifat
+fatal (pool rusak -> 503), dan setiap worker wajib melapor sekali lewat barrier.
+Jika warm-up gagal, pool dibuat lazy saat request pertama dan error load
+dikembalikan per request. Setiap hasil prediksi membawa versi model yang
+benar-benar dipakai.
+
+Konfigurasi (env):
+    AI_INFERENCE_WORKERS        jumlah proses worker (default: 2, 0 = thread in-process)
+    AI_INFERENCE_MAX_PENDING    batas gambar in-flight (default: workers * 4 * AI_BATCH_MAX_SIZE)
+    AI_INFERENCE_START_METHOD   spawn / fork / forkserver (default: spawn)
+    AI_BATCH_WINDOW_MS          jendela pengumpulan batch (default: 5)
+    AI_BATCH_MAX_SIZE           ukuran batch maksimal (default: 4)
+    AI_WARM_UP_TIMEOUT_SECONDS  batas tunggu semua worker siap saat warm-up/swap (default: 120)
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Tuple, Union
+from src.ai.model_loader import MODEL_PATH, get_model_version
+from src.exceptions import AppException
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_TIMEOUT_SECONDS = float(os.getenv("AI_WARM_UP_TIMEOUT_SECONDS", "120"))
+
+
+# ---------------------------
+# DI DALAM PROSES WORKER
+# ---------------------------
+_warm_up_barrier = None
+
+
+def _init_worker(model_path: str = None, strict: bool = False, barrier=None):
+    """
+    Load + warm-up model saat worker start supaya request pertama tidak menanggung load.
+    strict=True (warm-up/swap): kegagalan load di-raise sehingga worker mati dan pool
+    rusak. strict=False: worker tetap hidup dan error yang sama dikembalikan per request.
+    barrier dipakai _model_info_in_worker untuk memastikan setiap worker melapor.
+    """
+    global _warm_up_barrier
+    _warm_up_barrier = barrier
+
+    from src.ai.service import activate_model
+    try:
+        activate_model(model_path)
+    except AppException as ae:
+        logger.error(f"AI worker failed to preload model: {ae.message}")
+        if strict:
+            raise
+
+
+def _model_info_in_worker(timeout: float = WARM_UP_TIMEOUT_SECONDS) -> dict:
+    """
+    Info model + pid worker ini. Pada pool warm-up, task menunggu di barrier sampai
+    semua worker melapor, sehingga satu worker tidak bisa mengambil dua task.
+    """
+    global _warm_up_barrier
+    from src.ai.model_loader import model_registry
+
+    if _warm_up_barrier is not None:
+        barrier, _warm_up_barrier = _warm_up_barrier, None
+        barrier.wait(timeout)
+    return {**model_registry.info(), "pid": os.getpid()}
+
+
+def _predict_batch_in_worker(items: List[bytes], segmenters: List[str]) -> list:
+    """
+    Jalankan prediksi satu batch di worker dengan satu snapshot model.
+    Hasil sukses berupa (label, confidence, versi model).
+    AppException dikembalikan sebagai nilai (bukan di-raise) agar status_code tetap utuh
+    saat melewati batas proses.
+    """
+    from src.ai.model_loader import model_registry
+    from src.ai.service import predict_batch_from_bytes
+
+    def pack(result):
+        if isinstance(result, AppException):
+            return "error", (result.message, result.status_code)
+        return "ok", (*result, loaded.version)
+
+    try:
+        loaded = model_registry.get()
+        return [pack(result) for result in predict_batch_from_bytes(items, segmenters, loaded.model)]
+    except AppException as ae:
+        return [pack(ae)] * len(items)
+
+
+def _unpack(packed) -> Tuple[str, float, str]:
+    status, result = packed
+    if status == "error":
+        message, status_code = result
+        raise AppException(message, status_code=status_code)
+    return result
+
+
+# ---------------------------
+# DI PROSES API
+# ---------------------------
+class InferencePool:
+    def __init__(
+        self,
+        workers: int,
+        max_pending: int,
+        start_method: str = "spawn",
+        batch_window: float = 0.005,
+        batch_max_size: int = 4,
+        model_path: str = MODEL_PATH
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.start_method = start_method
+        self.batch_window = batch_window
+        self.batch_max_size = batch_max_size
+        self.model_path = model_path
+        self.model_version = None
+        self._executor = None
+        self._swap_lock = asyncio.Lock()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        # State micro-batch; hanya disentuh dari thread event loop
+        self._batch = []
+        self._flush_handle = None
+        self._batch_tasks = set()
+
+    def _new_executor(self, model_path: str, warm_up: bool = False) -> ProcessPoolExecutor:
+        """warm_up=True: load model wajib berhasil dan setiap worker melapor lewat barrier (lihat _load_in_workers)."""
+        context = multiprocessing.get_context(self.start_method)
+        barrier = context.Barrier(self.workers) if warm_up else None
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(model_path, warm_up, barrier)
+        )
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None and self.workers > 0:
+                self._executor = self._new_executor(self.model_path)
+            return self._executor
+
+    def _reset_executor(self, broken) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, fn, *args):
+        executor = self._get_executor()
+        if executor is None:
+            return await asyncio.to_thread(fn, *args)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # Worker mati (mis. OOM); pool dibuat ulang untuk request berikutnya
+            logger.exception("AI inference pool broken, recreating")
+            self._reset_executor(executor)
+            raise AppException("Layanan AI sedang dimulai ulang, coba lagi.", status_code=503)
+
+    def _acquire(self, count: int) -> None:
+        with self._lock:
+            if self._pending + count > self.max_pending:
+                raise AppException("Layanan AI sedang sibuk, coba lagi nanti.", status_code=503)
+            self._pending += count
+
+    def _release(self, count: int) -> None:
+        with self._lock:
+            self._pending -= count
+
+    def _dispatch_batch(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._batch = self._batch, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch) -> None:
+        try:
+            results = await self._run(
+                _predict_batch_in_worker,
+                [data for data, _, _ in batch],
+                [segmenter for _, segmenter, _ in batch]
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def predict(self, data: bytes, segmenter: str = None) -> Tuple[str, float, str]:
+        """
+        Prediksi satu gambar lewat micro-batch (segmenter None = default config).
+        Return (label, confidence, model_version); raise AppException 503 jika antrian penuh.
+        """
+        self._acquire(1)
+        try:
+            future = asyncio.get_running_loop().create_future()
+            self._batch.append((data, segmenter, future))
+            if len(self._batch) >= self.batch_max_size:
+                self._dispatch_batch()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._dispatch_batch)
+
+            packed = await future
+        finally:
+            self._release(1)
+
+        return _unpack(packed)
+
+    async def predict_many(self, items: List[bytes], segmenter: str = None) -> List[Union[Tuple[str, float, str], AppException]]:
+        """
+        Prediksi banyak gambar dari satu request (sudah berupa batch, tidak menunggu jendela).
+        Return list (label, confidence, model_version) atau AppException per gambar.
+        """
+        self._acquire(len(items))
+        try:
+            chunks = [items[i:i + self.batch_max_size] for i in range(0, len(items), self.batch_max_size)]
+            results = await asyncio.gather(*[
+                self._run(_predict_batch_in_worker, chunk, [segmenter] * len(chunk)) for chunk in chunks
+            ])
+        finally:
+            self._release(len(items))
+
+        unpacked = []
+        for packed in (packed for chunk in results for packed in chunk):
+            try:
+                unpacked.append(_unpack(packed))
+            except AppException as ae:
+                unpacked.append(ae)
+        return unpacked
+
+    # ---------------------------
+    # MODEL: WARM-UP & HOT-SWAP
+    # ---------------------------
+    def current_model_version(self) -> str:
+        """Versi model yang dilayani pool (dari warm-up/swap, atau hash file jika belum)."""
+        return self.model_version or get_model_version(self.model_path)
+
+    async def _load_in_workers(self, executor, model_path: str) -> dict:
+        """
+        Pastikan setiap worker executor warm-up (dibuat dengan _new_executor(warm_up=True))
+        sudah me-load model dengan versi yang sama. Satu task per worker; task saling
+        menunggu di barrier sehingga semua proses di-spawn dan masing-masing melapor sekali.
+        Return info model; raise AppException 503 jika ada worker yang gagal.
+        """
+        if executor is None:
+            from src.ai.service import activate_model
+            return (await asyncio.to_thread(activate_model, model_path)).info()
+
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await asyncio.gather(*[
+                loop.run_in_executor(executor, _model_info_in_worker) for _ in range(self.workers)
+            ])
+        except (BrokenProcessPool, threading.BrokenBarrierError):
+            logger.exception("AI worker failed while loading model")
+            raise AppException(f"Model gagal di-load di worker AI: {model_path}", status_code=503)
+
+        versions = {info["version"] for info in infos}
+        pids = {info["pid"] for info in infos}
+        if None in versions or len(versions) != 1 or len(pids) != self.workers:
+            raise AppException(f"Model gagal di-load di worker AI: {model_path}", status_code=503)
+        info = dict(infos[0])
+        info.pop("pid")
+        return info
+
+    async def warm_up(self) -> dict:
+        """Load + warm-up model aktif di semua worker (dipanggil saat startup)."""
+        return await self._activate(self.model_path)
+
+    async def swap_model(self, model_path: str) -> dict:
+        """
+        Ganti model tanpa restart. Pool worker baru di-warm-up dulu; pool aktif baru
+        diganti setelah semua worker siap, jadi request tidak pernah melihat model setengah jadi.
+        Jika gagal, model lama tetap dipakai dan AppException di-raise.
+        """
+        return await self._activate(model_path)
+
+    async def _activate(self, model_path: str) -> dict:
+        async with self._swap_lock:
+            if self.workers == 0:
+                info = await self._load_in_workers(None, model_path)
+                self.model_path, self.model_version = model_path, info["version"]
+                return info
+
+            executor = self._new_executor(model_path, warm_up=True)
+            try:
+                info = await self._load_in_workers(executor, model_path)
+            except BaseException:
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+
+            with self._lock:
+                old, self._executor = self._executor, executor
+                self.model_path, self.model_version = model_path, info["version"]
+            if old is not None:
+                # Batch yang sudah dikirim ke pool lama tetap diselesaikan
+                old.shutdown(wait=False)
+            return info
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _create_pool() -> InferencePool:
+    workers = int(os.getenv("AI_INFERENCE_WORKERS", "2"))
+    batch_max_size = int(os.getenv("AI_BATCH_MAX_SIZE", "4"))
+    max_pending = int(os.getenv("AI_INFERENCE_MAX_PENDING", str(max(workers, 1) * 4 * batch_max_size)))
+    return InferencePool(
+        workers=workers,
+        max_pending=max_pending,
+        start_method=os.getenv("AI_INFERENCE_START_METHOD", "spawn"),
+        batch_window=float(os.getenv("AI_BATCH_WINDOW_MS", "5")) / 1000,
+        batch_max_size=batch_max_size
+    )
+
+
+inference_pool = _create_pool()
@@ -1,23 +1,131 @@
+"""
+Registry model klasifikasi sayur.
+
+- Model di-load saat startup (bukan saat prediksi pertama) dan langsung diuji
+  dengan satu inference warm-up, sehingga user pertama setelah deploy/restart
+  worker tidak menanggung biaya load.
+- joblib.load memakai mmap_mode (AI_MODEL_MMAP_MODE, default "r"): array NumPy
+  di file model di-memory-map read-only, sehingga beberapa worker berbagi page
+  yang sama di page cache. Tidak berpengaruh untuk file yang di-dump terkompresi.
+- Hot-swap: activate_model() me-load + warm-up versi baru terlebih dahulu, lalu
+  mengganti model aktif dalam satu assignment di bawah lock. Request yang sedang
+  berjalan tetap memakai snapshot model lama sampai selesai.
+
+Versi model = 12 karakter pertama SHA-256 file model.
+"""
 import os
+import hashlib
+import threading
+import time
 import joblib
 from src.exceptions import AppException
 
 MODEL_FILENAME = "model_sayur.pkl"  # Gantilah dengan nama file model Anda
-MODEL_PATH = os.path.join(os.path.dirname(__file__), MODEL_FILENAME)
+MODEL_DIR = os.path.dirname(__file__)
+MODEL_PATH = os.getenv("AI_MODEL_PATH", os.path.join(MODEL_DIR, MODEL_FILENAME))
+MODEL_MMAP_MODE = os.getenv("AI_MODEL_MMAP_MODE", "r") or None
 
-_model = None
 
-def load_model():
+_version_cache = {}
+
+def get_model_version(path: str = None) -> str:
     """
-    Fungsi untuk memuat model sekali saja. 
-    Raise AppException jika model gagal dimuat.
+    Versi model = 12 karakter pertama SHA-256 file model.
+    Dihitung ulang hanya jika mtime/ukuran file berubah. "missing" jika file tidak ada.
     """
-    global _model
-    if _model is None:
-        if not os.path.exists(MODEL_PATH):
-            raise AppException(f"Model file not found: {MODEL_PATH}")
+    path = path or MODEL_PATH
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return "missing"
+
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    if key not in _version_cache:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+        _version_cache[key] = digest.hexdigest()[:12]
+    return _version_cache[key]
+
+
+class LoadedModel:
+    """Snapshot model yang sudah di-load; tidak pernah diubah setelah dibuat."""
+
+    def __init__(self, model, version: str, path: str, load_ms: float):
+        self.model = model
+        self.version = version
+        self.path = path
+        self.load_ms = load_ms
+        self.loaded_at = time.time()
+
+    def info(self) -> dict:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "load_ms": round(self.load_ms, 1),
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ModelRegistry:
+    def __init__(self, path: str, mmap_mode: str = None):
+        self.path = path
+        self.mmap_mode = mmap_mode
+        self._active = None
+        self._lock = threading.Lock()
+
+    def load(self, path: str = None, warm_up=None) -> LoadedModel:
+        """
+        Load model dari file tanpa mengaktifkannya.
+        warm_up(model) dipanggil sekali setelah load; error apa pun dianggap model tidak valid.
+        Raise AppException jika model gagal dimuat.
+        """
+        path = path or self.path
+        if not os.path.exists(path):
+            raise AppException(f"Model file not found: {path}")
+
+        start = time.perf_counter()
         try:
-            _model = joblib.load(MODEL_PATH)  
+            model = joblib.load(path, mmap_mode=self.mmap_mode)
+            if warm_up is not None:
+                warm_up(model)
+        except AppException:
+            raise
         except Exception as e:
             raise AppException(f"Failed to load model: {e}")
-    return _model
+
+        return LoadedModel(model, get_model_version(path), path, (time.perf_counter() - start) * 1000)
+
+    def activate(self, path: str = None, warm_up=None) -> LoadedModel:
+        """Load (+ warm-up) lalu jadikan model aktif. Model lama tetap aktif jika gagal."""
+        loaded = self.load(path, warm_up)
+        with self._lock:
+            self._active = loaded
+            self.path = loaded.path
+        return loaded
+
+    def get(self) -> LoadedModel:
+        """Model aktif; di-load saat itu juga jika belum pernah diaktifkan."""
+        loaded = self._active
+        if loaded is None:
+            with self._lock:
+                if self._active is None:
+                    self._active = self.load(self.path)
+                loaded = self._active
+        return loaded
+
+    def info(self) -> dict:
+        loaded = self._active
+        return loaded.info() if loaded is not None else {"version": None, "path": self.path}
+
+
+model_registry = ModelRegistry(MODEL_PATH, MODEL_MMAP_MODE)
+
+
+def load_model():
+    """
+    Fungsi untuk memuat model sekali saja.
+    Raise AppException jika model gagal dimuat.
+    """
+    return model_registry.get().model
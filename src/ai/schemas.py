@@ -1,14 +1,37 @@
 from pydantic import BaseModel
 from typing import List, Optional
 
+class ThumbnailSet(BaseModel):
+    original: str
+    src: str
+    srcset: str
+    webp_srcset: str
+    width: int
+    height: int
+
 class PredictionResult(BaseModel):
     label: str
     confidence: float
     description: Optional[str] = None
     scientific_name: Optional[str] = None
     similar_images: Optional[List[str]] = []
+    similar_image_thumbnails: Optional[List[ThumbnailSet]] = []
+    model_version: Optional[str] = None
 
 class PredictResponse(BaseModel):
     success: bool
     result: Optional[PredictionResult] = None
     message: Optional[str] = None
+
+class BatchPredictItem(BaseModel):
+    filename: Optional[str] = None
+    success: bool
+    result: Optional[PredictionResult] = None
+    message: Optional[str] = None
+
+class BatchPredictResponse(BaseModel):
+    success: bool
+    results: List[BatchPredictItem] = []
+
+class ModelReloadRequest(BaseModel):
+    filename: Optional[str] = None  # file .pkl di folder src/ai; kosong = muat ulang file aktif
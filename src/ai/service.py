@@ -1,17 +1,43 @@
-from typing import Tuple
+from typing import List, Tuple, Union
 import cv2
 import numpy as np
 from skimage.feature import hog, local_binary_pattern
 from src.exceptions import AppException
-from src.ai.model_loader import load_model
+from src.ai.model_loader import load_model, model_registry, LoadedModel
+from src.ai.features import extract_feature_vector
 import os
 import secrets
+from io import BytesIO
+from PIL import Image
 from sklearn.preprocessing import LabelEncoder
 
 # LabelEncoder untuk memetakan index ke label
 le = LabelEncoder()
 le.fit(["bunga_kol", "cabai", "kubis", "sawi_hijau", "sawi_putih"])
 
+# Segmenter yang tersedia; bisa dipilih per request atau lewat env AI_SEGMENTER
+SEGMENTERS = ("grabcut", "hsv")
+DEFAULT_SEGMENTER = os.getenv("AI_SEGMENTER", "grabcut")
+
+# Sisi terpanjang gambar sebelum segmentasi (0 = resolusi asli upload).
+# Fitur tetap dihitung di 128x128, jadi GrabCut di resolusi penuh tidak menambah informasi.
+WORK_MAX_SIDE = int(os.getenv("AI_WORK_MAX_SIDE", "0"))
+
+
+# --------------------------
+# PREPROCESS: RESOLUSI KERJA
+# --------------------------
+def resize_to_work_resolution(img: np.ndarray, max_side: int = None) -> np.ndarray:
+    max_side = WORK_MAX_SIDE if max_side is None else max_side
+    h, w = img.shape[:2]
+    if not max_side or max(h, w) <= max_side:
+        return img
+
+    scale = max_side / max(h, w)
+    size = (max(1, round(w * scale)), max(1, round(h * scale)))
+    return cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+
+
 # --------------------------
 # SEGMENTASI GRABCUT
 # --------------------------
@@ -34,8 +60,56 @@ def segment_grabcut(img: np.ndarray) -> np.ndarray:
     return img * mask2[:, :, np.newaxis]
 
 
+# --------------------------
+# SEGMENTASI HSV (MURAH)
+# --------------------------
+def segment_hsv(img: np.ndarray) -> np.ndarray:
+    """
+    Alternatif cepat GrabCut: warna background diperkirakan dari pinggir gambar,
+    pixel yang berbeda cukup jauh (hue/saturation/value) dianggap objek.
+    Hanya komponen terhubung terbesar yang dipertahankan.
+    """
+    hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV).astype(np.int16)
+    h, w = hsv.shape[:2]
+    border = max(1, min(h, w) // 20)
+    edges = np.concatenate([
+        hsv[:border].reshape(-1, 3), hsv[-border:].reshape(-1, 3),
+        hsv[:, :border].reshape(-1, 3), hsv[:, -border:].reshape(-1, 3)
+    ])
+    bg_h, bg_s, bg_v = np.median(edges, axis=0)
+
+    hue_diff = np.abs(hsv[:, :, 0] - bg_h)
+    hue_diff = np.minimum(hue_diff, 180 - hue_diff)  # hue OpenCV melingkar 0..179
+    mask = (
+        ((hue_diff > 15) & (hsv[:, :, 1] > 40))
+        | (np.abs(hsv[:, :, 1] - bg_s) > 50)
+        | (np.abs(hsv[:, :, 2] - bg_v) > 60)
+    ).astype("uint8")
+
+    kernel = np.ones((5, 5), np.uint8)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+
+    count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if count > 1:
+        largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))
+        mask = (labels == largest).astype("uint8")
+
+    return img * mask[:, :, np.newaxis]
+
+
+def segment_image(img: np.ndarray, segmenter: str = None) -> np.ndarray:
+    segmenter = segmenter or DEFAULT_SEGMENTER
+    if segmenter == "grabcut":
+        return segment_grabcut(img)
+    if segmenter == "hsv":
+        return segment_hsv(img)
+    raise AppException(f"Segmenter tidak dikenal: {segmenter}")
+
+
 # ---------------------------
 # EKSTRAKSI FITUR HOG
+# (implementasi referensi; dipakai oleh src.ai.features --verify)
 # ---------------------------
 def extract_hog_features(img: np.ndarray) -> np.ndarray:
     # Konversi ke grayscale
@@ -59,6 +133,7 @@ def extract_hog_features(img: np.ndarray) -> np.ndarray:
 
 # ---------------------------
 # EKSTRAKSI FITUR LBP
+# (implementasi referensi; dipakai oleh src.ai.features --verify)
 # ---------------------------
 def extract_lbp_features(img: np.ndarray, P=8, R=1) -> np.ndarray:
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
@@ -83,17 +158,60 @@ def extract_lbp_features(img: np.ndarray, P=8, R=1) -> np.ndarray:
 # ---------------------------
 # GABUNGKAN FITUR HOG & LBP
 # ---------------------------
-def extract_features(img: np.ndarray) -> np.ndarray:
-    # Terapkan segmentasi terlebih dahulu (dengan GrabCut)
-    img_segmented = segment_grabcut(img)
+def extract_features(img: np.ndarray, segmenter: str = None, work_max_side: int = None) -> np.ndarray:
+    # Turunkan ke resolusi kerja, lalu segmentasi (default GrabCut)
+    img = resize_to_work_resolution(img, work_max_side)
+    img_segmented = segment_image(img, segmenter)
+
+    # Ekstraksi HOG dan LBP dengan satu pass grayscale (lihat src/ai/features.py)
+    return extract_feature_vector(img_segmented)
+
+
+# ---------------------------
+# PREDIKSI DARI MATRIKS FITUR
+# ---------------------------
+def predict_features(features: np.ndarray, model=None) -> List[Tuple[str, float]]:
+    """
+    Prediksi untuk matriks fitur (n_gambar x n_fitur) dengan satu pass model.
+    Label diambil dari argmax predict_proba, sehingga predict() tidak perlu dipanggil lagi.
+    model: snapshot model yang dipakai (default: model aktif di registry).
+    Return list (label, confidence) sesuai urutan baris.
+    """
+    # Memuat model
+    if model is None:
+        model = load_model()
 
-    # Ekstraksi HOG dan LBP
-    hog_feat = extract_hog_features(img_segmented)
-    lbp_feat = extract_lbp_features(img_segmented)
+    try:
+        if hasattr(model, "predict_proba"):
+            proba = model.predict_proba(features)
+            best = np.argmax(proba, axis=1)
+            classes = getattr(model, "classes_", None)
+            preds = classes[best] if classes is not None else best
+            confidences = proba[np.arange(len(best)), best]
+        else:
+            preds = model.predict(features)
+            confidences = np.ones(len(preds))
+
+        # Mengonversi angka ke nama label menggunakan LabelEncoder
+        labels = le.inverse_transform(np.asarray(preds).astype(int))
+    except Exception as e:
+        raise AppException(f"Gagal melakukan prediksi: {e}")
+
+    return [(str(label), float(confidence)) for label, confidence in zip(labels, confidences)]
 
-    # Gabungkan kedua fitur menjadi satu vektor
-    feature_vector = np.hstack([hog_feat, lbp_feat])
-    return feature_vector
+
+# ---------------------------
+# PREDIKSI DARI GAMBAR (BGR)
+# ---------------------------
+def predict_from_image(img: np.ndarray, segmenter: str = None) -> Tuple[str, float]:
+    """
+    Preprocess, ekstraksi fitur, dan prediksi dari gambar BGR yang sudah di-decode
+    menggunakan model pipeline yang sudah di-load.
+    Return (label, confidence)
+    """
+    # Ekstraksi fitur dari gambar
+    features = extract_features(img, segmenter).reshape(1, -1)
+    return predict_features(features)[0]
 
 
 # ---------------------------
@@ -101,8 +219,7 @@ def extract_features(img: np.ndarray) -> np.ndarray:
 # ---------------------------
 def predict_from_file(file_path: str) -> Tuple[str, float]:
     """
-    Mengambil file path gambar (yang sudah disimpan), lakukan preprocess, ekstraksi fitur,
-    dan prediksi menggunakan model pipeline yang sudah di-load.
+    Mengambil file path gambar (yang sudah disimpan) lalu prediksi.
     Return (label, confidence)
     """
     # Membaca gambar
@@ -110,29 +227,110 @@ def predict_from_file(file_path: str) -> Tuple[str, float]:
     if img is None:
         raise AppException("Gagal membaca file gambar.")
 
-    # Ekstraksi fitur dari gambar
-    features = extract_features(img).reshape(1, -1)
+    return predict_from_image(img)
 
-    # Memuat model
-    model = load_model()
 
+# ---------------------------
+# PREDIKSI DARI BYTES (TANPA FILE SEMENTARA)
+# ---------------------------
+MAX_UPLOAD_BYTES = int(os.getenv("AI_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_IMAGE_PIXELS = int(os.getenv("AI_MAX_IMAGE_PIXELS", str(40_000_000)))
+
+
+def _reduced_decode_flag(width: int, height: int, max_side: int) -> int:
+    """Decode JPEG langsung di 1/2, 1/4 atau 1/8 ukuran jika masih >= resolusi kerja."""
+    if max_side:
+        for factor, flag in ((8, cv2.IMREAD_REDUCED_COLOR_8), (4, cv2.IMREAD_REDUCED_COLOR_4), (2, cv2.IMREAD_REDUCED_COLOR_2)):
+            if max(width, height) // factor >= max_side:
+                return flag
+    return cv2.IMREAD_COLOR
+
+
+def decode_image_bytes(data: bytes, work_max_side: int = None) -> np.ndarray:
+    """
+    Decode buffer upload menjadi gambar BGR langsung di memori.
+    Gambar terlalu besar (bytes atau resolusi) dan file rusak ditolak sebelum decode penuh.
+    Jika resolusi kerja diset, gambar besar di-decode dalam ukuran tereduksi.
+    """
+    if not data:
+        raise AppException("File gambar kosong.")
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise AppException(f"Ukuran gambar melebihi {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.", status_code=413)
+
+    # Baca header saja (tanpa decode pixel) untuk cek format dan resolusi
     try:
-        # Prediksi kelas (model mengembalikan angka)
-        pred = model.predict(features)[0]
+        with Image.open(BytesIO(data)) as header:
+            width, height = header.size
+    except Exception:
+        raise AppException("File bukan gambar yang valid.")
+    if width * height > MAX_IMAGE_PIXELS:
+        raise AppException("Resolusi gambar terlalu besar.", status_code=413)
 
-        # Mengonversi angka ke nama label menggunakan LabelEncoder
-        label = le.inverse_transform([int(pred)])[0]  # Mengonversi angka ke nama label
+    max_side = WORK_MAX_SIDE if work_max_side is None else work_max_side
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), _reduced_decode_flag(width, height, max_side))
+    if img is None:
+        raise AppException("Gagal membaca file gambar.")
+    return img
+
+
+def predict_from_bytes(data: bytes, segmenter: str = None) -> Tuple[str, float]:
+    """
+    Prediksi langsung dari isi file upload (tanpa menulis ke storage/uploads).
+    Return (label, confidence)
+    """
+    return predict_from_image(decode_image_bytes(data), segmenter)
+
+
+def predict_batch_from_bytes(
+    items: List[bytes],
+    segmenters: List[str] = None,
+    model=None
+) -> List[Union[Tuple[str, float], AppException]]:
+    """
+    Prediksi banyak gambar sekaligus: fitur semua gambar valid digabung menjadi
+    satu matriks lalu diprediksi dengan satu panggilan predict_proba.
+    Gambar yang gagal di-decode tidak menggagalkan batch; posisinya berisi AppException.
+    segmenters: segmenter per gambar (None = default).
+    """
+    segmenters = segmenters or [None] * len(items)
+    results = [None] * len(items)
+    rows, features = [], []
+    for i, (data, segmenter) in enumerate(zip(items, segmenters)):
+        try:
+            features.append(extract_features(decode_image_bytes(data), segmenter))
+            rows.append(i)
+        except AppException as ae:
+            results[i] = ae
+
+    if features:
+        try:
+            predictions = predict_features(np.vstack(features), model)
+        except AppException as ae:
+            predictions = [ae] * len(rows)
+        for i, prediction in zip(rows, predictions):
+            results[i] = prediction
+
+    return results
+
+
+# ---------------------------
+# WARM-UP & HOT-SWAP MODEL
+# ---------------------------
+def warm_up_model(model) -> None:
+    """
+    Satu inference penuh (segmentasi + HOG/LBP + predict_proba) pada gambar sintetis,
+    supaya import lazy, alokasi, dan inisialisasi OpenCV/scikit-image terjadi sebelum
+    request pertama. Raise jika model tidak bisa memprediksi fitur dari pipeline ini.
+    """
+    rng = np.random.default_rng(0)
+    img = rng.integers(0, 256, (160, 160, 3), dtype=np.uint8)
+    features = extract_features(img, work_max_side=0).reshape(1, -1)
+    predict_features(features, model)
 
-        # Menghitung confidence jika model mendukung predict_proba()
-        if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(features)[0]
-            confidence = float(np.max(proba))
-        else:
-            confidence = 1.0
-    except Exception as e:
-        raise AppException(f"Gagal melakukan prediksi: {e}")
 
-    return label, confidence
+def activate_model(path: str = None) -> LoadedModel:
+    """Load + warm-up model (default: path aktif) lalu ganti model aktif secara atomic."""
+    return model_registry.activate(path, warm_up=warm_up_model)
 
 
 # ---------------------------
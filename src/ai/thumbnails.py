@@ -0,0 +1,271 @@
+"""
+Thumbnail untuk similar_images di response /ai/predict.
+
+Setiap gambar di storage/vegetable_images dibuat dalam beberapa lebar
+(AI_THUMBNAIL_WIDTHS, default 160,320,640; tidak pernah di-upscale) dan dua
+format (WebP + JPEG progresif). Nama file memuat hash isi thumbnail:
+
+    storage/thumbnails/<label>/<nama>-320w.<hash>.webp
+
+sehingga URL tidak pernah berubah isinya dan bisa di-cache selamanya oleh
+browser/CDN (Cache-Control immutable, lihat ImmutableStaticFiles). Jika gambar
+sumber berubah, hash berubah dan URL baru otomatis dipakai.
+
+manifest.json memetakan URL gambar asli ke daftar varian; sumber yang hash-nya
+tidak berubah tidak di-encode ulang, dan thumbnail yang tidak lagi dirujuk dihapus.
+
+Build diserialisasi dengan file lock (output_dir/.lock) karena startup dijalankan
+di setiap proses uvicorn/gunicorn: proses berikutnya menunggu lalu memakai ulang
+hasil proses pertama. File sementara diberi pid (<file>.<pid>.tmp) dan tidak
+pernah ikut dihapus saat pruning.
+
+Dibangun saat startup (AI_THUMBNAILS_ON_STARTUP=1, default) atau lewat CLI:
+    python -m src.ai.thumbnails
+    python -m src.ai.thumbnails --force
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Optional
+from PIL import Image
+from starlette.staticfiles import StaticFiles
+
+try:
+    import fcntl
+except ImportError:  # Windows: build tidak diserialisasi antar proses
+    fcntl = None
+
+SOURCE_DIR = os.path.join("storage", "vegetable_images")
+THUMBNAIL_DIR = os.path.join("storage", "thumbnails")
+THUMBNAIL_URL_PREFIX = "/storage/thumbnails"
+MANIFEST_FILENAME = "manifest.json"
+LOCK_FILENAME = ".lock"
+THUMBNAIL_WIDTHS = tuple(sorted(int(w) for w in os.getenv("AI_THUMBNAIL_WIDTHS", "160,320,640").split(",") if w.strip()))
+# Lebar default untuk atribut src (fallback jika client tidak mendukung srcset)
+DEFAULT_SRC_WIDTH = 320
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+
+# format -> (format Pillow, ekstensi, opsi encode)
+THUMBNAIL_FORMATS = {
+    "webp": ("WEBP", "webp", {"quality": 80, "method": 6}),
+    "jpeg": ("JPEG", "jpg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles dengan Cache-Control immutable (hanya untuk file dengan nama ber-hash)."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        return response
+
+
+# ---------------------------
+# BUILD
+# ---------------------------
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    # Nama .tmp per proses: beberapa proses bisa menulis file yang sama bersamaan
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+@contextmanager
+def _build_lock(output_dir: str):
+    """Lock eksklusif antar proses selama build (blocking)."""
+    with open(os.path.join(output_dir, LOCK_FILENAME), "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _source_url(path: str) -> str:
+    return "/" + path.replace("\\", "/").lstrip("/")
+
+
+def _read_manifest(output_dir: str) -> dict:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILENAME), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _entry_files_exist(entry: dict, output_dir: str) -> bool:
+    return all(
+        os.path.exists(os.path.join(output_dir, variant["file"]))
+        for variants in entry["variants"].values()
+        for variant in variants
+    )
+
+
+def _render_variants(data: bytes, relative_dir: str, stem: str, widths: tuple, output_dir: str) -> dict:
+    """Encode semua lebar x format untuk satu gambar sumber. Return entry manifest."""
+    with Image.open(BytesIO(data)) as source:
+        image = source.convert("RGB")
+    width, height = image.size
+
+    # Tidak upscale; gambar yang lebih kecil dari semua lebar cukup satu varian selebar aslinya
+    targets = [w for w in widths if w < width] or [width]
+    variants = {fmt: [] for fmt in THUMBNAIL_FORMATS}
+    for target in targets:
+        resized = image if target == width else image.resize((target, max(1, round(height * target / width))), Image.LANCZOS)
+        for fmt, (pil_format, extension, options) in THUMBNAIL_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+            encoded = buffer.getvalue()
+
+            relative_path = os.path.join(relative_dir, f"{stem}-{target}w.{_sha256(encoded)[:12]}.{extension}").replace("\\", "/")
+            full_path = os.path.join(output_dir, relative_path)
+            if not os.path.exists(full_path):
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                _write_atomic(full_path, encoded)
+            variants[fmt].append({"width": target, "file": relative_path, "bytes": len(encoded)})
+
+    return {"source_hash": _sha256(data), "width": width, "height": height, "variants": variants}
+
+
+def build_thumbnails(
+    source_dir: str = SOURCE_DIR,
+    output_dir: str = THUMBNAIL_DIR,
+    widths: tuple = THUMBNAIL_WIDTHS,
+    force: bool = False
+) -> dict:
+    """
+    Buat/perbarui thumbnail semua gambar di source_dir dan tulis manifest.
+    Return dict statistik: images, rendered, reused, pruned.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    with _build_lock(output_dir):
+        return _build_thumbnails_locked(source_dir, output_dir, widths, force)
+
+
+def _build_thumbnails_locked(source_dir: str, output_dir: str, widths: tuple, force: bool) -> dict:
+    previous = _read_manifest(output_dir)
+    manifest, rendered, reused = {}, 0, 0
+
+    for root, dirs, files in os.walk(source_dir):
+        dirs.sort()
+        for filename in sorted(files):
+            if not filename.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(root, filename)
+            with open(path, "rb") as f:
+                data = f.read()
+
+            url = _source_url(path)
+            entry = previous.get(url)
+            if (
+                not force
+                and entry is not None
+                and entry.get("source_hash") == _sha256(data)
+                and entry.get("widths") == list(widths)
+                and _entry_files_exist(entry, output_dir)
+            ):
+                manifest[url] = entry
+                reused += 1
+                continue
+
+            relative_dir = os.path.relpath(root, source_dir)
+            stem = os.path.splitext(filename)[0]
+            manifest[url] = _render_variants(data, "" if relative_dir == "." else relative_dir, stem, widths, output_dir)
+            manifest[url]["widths"] = list(widths)
+            rendered += 1
+
+    # Hapus thumbnail yang tidak lagi dirujuk manifest (sumber dihapus/berubah).
+    # .tmp dilewati: bisa milik proses lain yang sedang menulis (mis. CLI tanpa lock di Windows)
+    referenced = {
+        os.path.normpath(os.path.join(output_dir, variant["file"]))
+        for entry in manifest.values()
+        for variants in entry["variants"].values()
+        for variant in variants
+    }
+    pruned = 0
+    for root, _, files in os.walk(output_dir):
+        for filename in files:
+            full_path = os.path.normpath(os.path.join(root, filename))
+            if filename in (MANIFEST_FILENAME, LOCK_FILENAME) or filename.endswith(".tmp"):
+                continue
+            if full_path not in referenced:
+                os.remove(full_path)
+                pruned += 1
+
+    _write_atomic(os.path.join(output_dir, MANIFEST_FILENAME), json.dumps(manifest, indent=1).encode("utf-8"))
+    _set_manifest(manifest)
+    return {"images": len(manifest), "rendered": rendered, "reused": reused, "pruned": pruned}
+
+
+# ---------------------------
+# LOOKUP (DIPAKAI CONTROLLER)
+# ---------------------------
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def _set_manifest(manifest: dict) -> None:
+    global _manifest
+    with _manifest_lock:
+        _manifest = manifest
+
+
+def get_manifest() -> dict:
+    """Manifest di memori; dibaca dari disk sekali jika build belum dijalankan di proses ini."""
+    if _manifest is None:
+        _set_manifest(_read_manifest(THUMBNAIL_DIR))
+    return _manifest
+
+
+def _variant_url(variant: dict) -> str:
+    return f"{THUMBNAIL_URL_PREFIX}/{variant['file']}"
+
+
+def thumbnail_set(image_url: str) -> Optional[dict]:
+    """
+    Thumbnail untuk satu URL gambar asli dalam bentuk siap pakai di <img>/<picture>:
+    src (JPEG ~DEFAULT_SRC_WIDTH), srcset (JPEG) dan webp_srcset. None jika belum dibuat.
+    """
+    entry = get_manifest().get(image_url)
+    if entry is None:
+        return None
+
+    jpeg, webp = entry["variants"]["jpeg"], entry["variants"]["webp"]
+    default = min(jpeg, key=lambda variant: abs(variant["width"] - DEFAULT_SRC_WIDTH))
+    return {
+        "original": image_url,
+        "src": _variant_url(default),
+        "srcset": ", ".join(f"{_variant_url(v)} {v['width']}w" for v in jpeg),
+        "webp_srcset": ", ".join(f"{_variant_url(v)} {v['width']}w" for v in webp),
+        "width": entry["width"],
+        "height": entry["height"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Buat thumbnail similar_images AI (WebP + JPEG, nama ber-hash)")
+    parser.add_argument("--source", default=SOURCE_DIR)
+    parser.add_argument("--output", default=THUMBNAIL_DIR)
+    parser.add_argument("--force", action="store_true", help="Encode ulang semua thumbnail")
+    args = parser.parse_args()
+
+    stats = build_thumbnails(args.source, args.output, force=args.force)
+    print(f"✓ {stats['images']} images: {stats['rendered']} rendered, {stats['reused']} reused, {stats['pruned']} stale files removed")
@@ -5,11 +5,12 @@ from src.entities.refresh_session import RefreshSessionModel
 from src.entities.resident import ResidentModel, OccupationModel
 from src.entities.family import FamilyModel, FamilyMovementModel, RTModel
 from src.entities.home import HomeModel, HomeHistoryModel
-from src.entities.finance import FeeModel, FeeTransactionModel, FinanceTransactionModel
+from src.entities.finance import FeeModel, FeeTransactionModel, FinanceTransactionModel, FinanceDailyRollupModel
 from src.entities.activity import ActivityModel, DashboardBannerModel, ActivityStatus, ActivityCategory
 from src.entities.marketplace import (
     ProductModel, ProductTransactionModel, ListProductTransactionModel,
-    ProductRatingModel, TransactionMethodModel, ProductCategoryEnum
+    ProductRatingModel, TransactionMethodModel, ProductCategoryEnum,
+    ProductImageClassificationModel
 )
 
 __all__ = [
@@ -18,8 +19,9 @@ __all__ = [
     'ResidentModel', 'OccupationModel',
     'FamilyModel', 'FamilyMovementModel', 'RTModel',
     'HomeModel', 'HomeHistoryModel',
-    'FeeModel', 'FeeTransactionModel', 'FinanceTransactionModel',
+    'FeeModel', 'FeeTransactionModel', 'FinanceTransactionModel', 'FinanceDailyRollupModel',
     'ActivityModel', 'DashboardBannerModel', 'ActivityStatus', 'ActivityCategory',
     'ProductModel', 'ProductTransactionModel', 'ListProductTransactionModel',
-    'ProductRatingModel', 'TransactionMethodModel', 'ProductCategoryEnum'
+    'ProductRatingModel', 'TransactionMethodModel', 'ProductCategoryEnum',
+    'ProductImageClassificationModel'
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, Date, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Date, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 from src.database.core import Base
 from sqlalchemy.dialects.postgresql import UUID
@@ -31,6 +31,7 @@ class FeeModel(Base):
 	fee_category = Column(String, nullable=False)
 	automation_mode = Column(String, nullable=True, default=AutomationMode.monthly.value)
 	due_date = Column(Date, nullable=True)
+	rt_id = Column(Integer, ForeignKey('m_rt.rt_id'), nullable=True)  # Null = semua keluarga
 
 	transactions = relationship('FeeTransactionModel', back_populates='fee_rel')
 
@@ -40,6 +41,10 @@ class FeeModel(Base):
 # Entity untuk t_fee_transaction
 class FeeTransactionModel(Base):
 	__tablename__ = 't_fee_transaction'
+	__table_args__ = (
+		# Idempotensi generator fee berulang: satu transaksi per (fee, keluarga, periode)
+		UniqueConstraint('fee_id', 'family_id', 'period_start', name='uq_fee_transaction_period'),
+	)
 
 	fee_transaction_id = Column(Integer, primary_key=True, autoincrement=True)
 	transaction_date = Column(Date, nullable=True)
@@ -49,6 +54,7 @@ class FeeTransactionModel(Base):
 	status = Column(String, nullable=False, default=PaymentStatus.unpaid.value)
 	family_id = Column(UUID(as_uuid=True), ForeignKey('m_family.family_id'), nullable=False)
 	evidence_path = Column(String, nullable=False)
+	period_start = Column(Date, nullable=True)  # Awal periode untuk fee weekly/monthly
 
 	fee_rel = relationship('FeeModel', back_populates='transactions')
 	# family_rel = relationship('FamilyModel') # Uncomment jika FamilyModel tersedia
@@ -69,3 +75,17 @@ class FinanceTransactionModel(Base):
 
 	def __repr__(self):
 		return f"<FinanceTransactionModel(finance_transaction_id={self.finance_transaction_id}, name={self.name}, amount={self.amount})>"
+
+# Entity untuk finance_daily_rollup (ringkasan harian, dipelihara oleh src/finance/rollup.py)
+class FinanceDailyRollupModel(Base):
+	__tablename__ = 'finance_daily_rollup'
+
+	rollup_date = Column(Date, primary_key=True)  # Transaksi tanpa tanggal disimpan di date.min
+	source = Column(String(20), primary_key=True)  # 'finance' atau 'fee'
+	category = Column(String, primary_key=True)  # category finance / fee_name untuk fee
+	income = Column(BigInteger, nullable=False, default=0)
+	expense = Column(BigInteger, nullable=False, default=0)  # Disimpan sebagai nilai positif
+	transaction_count = Column(Integer, nullable=False, default=0)
+
+	def __repr__(self):
+		return f"<FinanceDailyRollupModel(rollup_date={self.rollup_date}, source={self.source}, category={self.category}, income={self.income}, expense={self.expense})>"
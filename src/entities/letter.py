@@ -1,6 +1,6 @@
 import enum
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, JSON, Integer
 from sqlalchemy.orm import relationship
 from src.database.core import Base
 from sqlalchemy.dialects.postgresql import UUID
@@ -9,8 +9,10 @@ from datetime import datetime
 
 class LetterStatus(str, enum.Enum):
     pending = "pending"
+    rendering = "rendering"  # Disetujui, PDF sedang/akan dibuat oleh src/letter/render_queue.py
     approved = "approved"
     rejected = "rejected"
+    render_failed = "render_failed"  # PDF gagal dibuat setelah semua percobaan
 
 
 class LetterModel(Base):
@@ -38,6 +40,10 @@ class LetterTransactionModel(Base):
     data = Column(JSON, nullable=True)
     letter_result_path = Column(String, nullable=True)
     rejection_reason = Column(String, nullable=True)
+    render_attempts = Column(Integer, nullable=False, default=0)
+    render_error = Column(String, nullable=True)
+    render_available_at = Column(DateTime, nullable=True)  # Job render boleh diambil mulai waktu ini (backoff/lease)
+    render_batch_id = Column(UUID(as_uuid=True), nullable=True, index=True)  # Diisi oleh batch-approve untuk polling progres
     user_id = Column(UUID(as_uuid=True), ForeignKey('m_user.user_id'), nullable=False)
     letter_id = Column(UUID(as_uuid=True), ForeignKey('m_letter.letter_id'), nullable=False)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
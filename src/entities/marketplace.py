@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON, SmallInteger, Text, CheckConstraint, Enum
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, JSON, SmallInteger, Text, CheckConstraint, Enum, Float
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID, ARRAY
 from src.database.core import Base
@@ -52,6 +52,8 @@ class ProductModel(Base):
     view_count = Column(Integer, nullable=False, default=0)
     status = Column(String(20), nullable=False, default="active")
     sold_count = Column(Integer, nullable=False, default=0)
+    rating_count = Column(Integer, nullable=False, default=0)  # Denormalisasi dari t_product_rating
+    rating_sum = Column(Integer, nullable=False, default=0)  # Dijaga oleh create/update/delete_rating
     description = Column(String, nullable=True)
     more_detail = Column(JSON, nullable=True)
     images_path = Column(ARRAY(String), nullable=True)
@@ -128,3 +130,20 @@ class ProductRatingModel(Base):
 
     def __repr__(self):
         return f"<ProductRatingModel(id={self.rating_id}, product={self.product_id}, rating={self.rating_value})>"
+
+
+class ProductImageClassificationModel(Base):
+    """Hasil klasifikasi offline gambar produk (python -m src.ai.classify_catalog)."""
+    __tablename__ = 't_product_image_classification'
+
+    image_path = Column(String(500), primary_key=True)
+    model_version = Column(String(20), primary_key=True)
+    product_id = Column(UUID(as_uuid=True), ForeignKey('m_product.product_id', ondelete='CASCADE'), nullable=True, index=True)
+    label = Column(String(50), nullable=True)
+    confidence = Column(Float, nullable=True)
+    segmenter = Column(String(20), nullable=False)
+    error = Column(String(255), nullable=True)  # Diisi jika gambar gagal diklasifikasi
+    classified_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<ProductImageClassificationModel(image={self.image_path}, label={self.label}, confidence={self.confidence})>"
@@ -24,6 +24,8 @@ def list_families(
     family_name: str = Query(None, description="Filter by family name (LIKE)"),
     offset: int = 0,
     limit: int = 10,
+    cursor: str = Query(None, description="next_cursor dari halaman sebelumnya (keyset pagination)"),
+    include_total: str = Query("exact", pattern="^(false|exact|estimate)$", description="false = tanpa count (infinite scroll), estimate = perkiraan"),
     db: Session = Depends(get_db)
 ):
     """Get list of families with filters"""
@@ -32,10 +34,12 @@ def list_families(
         status=status,
         family_name=family_name,
         offset=offset,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total
     )
     
-    total, families = service.get_families(db, filters)
+    total, families, next_cursor = service.get_families(db, filters)
     
     # Transform to response
     data = []
@@ -56,7 +60,7 @@ def list_families(
         )
         data.append(family_out)
     
-    return FamilyListResponse(total=total, offset=offset, limit=limit, data=data)
+    return FamilyListResponse(total=total, offset=offset, limit=limit, next_cursor=next_cursor, data=data)
 
 
 @router.get("/{family_id}", response_model=FamilyOut)
@@ -51,12 +51,15 @@ class FamilyFilter(BaseModel):
     family_name: Optional[str] = None
     offset: int = 0
     limit: int = 10
+    cursor: Optional[str] = None  # next_cursor dari halaman sebelumnya (keyset pagination)
+    include_total: str = Field(default="exact", pattern="^(false|exact|estimate)$")  # false = tanpa count (infinite scroll)
 
 
 class FamilyListResponse(BaseModel):
-    total: int
+    total: Optional[int] = None  # None jika memakai cursor
     offset: int
     limit: int
+    next_cursor: Optional[str] = None
     data: List[FamilyOut]
 
 
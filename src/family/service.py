@@ -8,11 +8,12 @@ import uuid as uuid_lib
 from src.entities.family import FamilyModel, FamilyMovementModel, RTModel
 from src.entities.resident import ResidentModel
 from src.family.schemas import FamilyCreate, FamilyUpdate, FamilyFilter, FamilyMovementCreate
+from src.pagination import keyset_paginate, count_total
 
 
 # ==================== Family Services ====================
 
-def get_families(db: Session, filters: FamilyFilter) -> Tuple[int, List[FamilyModel]]:
+def get_families(db: Session, filters: FamilyFilter) -> Tuple[Optional[int], List[FamilyModel], Optional[str]]:
     """Get list of families with filters and pagination"""
     query = db.query(FamilyModel).options(
         joinedload(FamilyModel.rt_rel),
@@ -29,10 +30,13 @@ def get_families(db: Session, filters: FamilyFilter) -> Tuple[int, List[FamilyMo
     if filters.family_name:
         query = query.filter(FamilyModel.family_name.ilike(f"%{filters.family_name}%"))
     
-    total = query.count()
-    results = query.order_by(FamilyModel.family_name).offset(filters.offset).limit(filters.limit).all()
+    total = count_total(query, filters.include_total, filters.cursor)
+    results, next_cursor = keyset_paginate(
+        query, FamilyModel.family_name, FamilyModel.family_id,
+        limit=filters.limit, offset=filters.offset, cursor=filters.cursor, descending=False
+    )
     
-    return total, results
+    return total, results, next_cursor
 
 
 def get_family_by_id(db: Session, family_id: UUID) -> Optional[FamilyModel]:
@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Header, Query, P
 from starlette import status
 from src.database.core import get_db
 from src.rate_limit import SafeRateLimiter
+from src.auth.service import require_role
 from sqlalchemy.orm import Session
 import os
 from src.finance.schemas import (
@@ -12,7 +13,7 @@ from src.finance.schemas import (
     FamilyFeeTransactionData, FamilyFeeFilter
 )
 from src.finance.service import (
-    get_finance_list, get_total_balance, get_fees_list, create_finance_transaction,
+    get_finance_list, get_total_balance, get_balance_by_periods, get_fees_list, create_finance_transaction,
     get_fee_summary_by_family, get_fee_transactions_list, create_fee_with_transactions,
     get_families_by_fee
 )
@@ -32,7 +33,13 @@ async def list_finance_transactions(
     filters: FinanceFilter = Depends(),
     db: Session = Depends(get_db)
 ):
-    total, results = get_finance_list(db=db, filters=filters, offset=filters.offset, limit=filters.limit)
+    total, results, next_cursor = get_finance_list(
+        db=db,
+        filters=filters,
+        offset=filters.offset,
+        limit=filters.limit,
+        cursor=filters.cursor
+    )
 
     data = [
         FinanceTransactionData(
@@ -49,6 +56,7 @@ async def list_finance_transactions(
         "total": total,
         "limit": filters.limit,
         "offset": filters.offset,
+        "next_cursor": next_cursor,
         "data": data
     }   
 
@@ -56,6 +64,7 @@ async def list_finance_transactions(
 @router.get("/balance", response_model=dict, dependencies=[Depends(SafeRateLimiter(times=50, seconds=60))])
 async def get_balance(
     period: str = Query('all', regex="^(day|month|year|all)$"),
+    periods: str = Query(None, regex="^all$"),
     db: Session = Depends(get_db)
 ):
     """
@@ -63,6 +72,7 @@ async def get_balance(
     
     Args:
         period: Filter waktu - 'day' (hari ini), 'month' (bulan ini), 'year' (tahun ini), 'all' (semua waktu)
+        periods: Isi 'all' untuk mendapatkan semua period (day, month, year, all) sekaligus
     
     Returns:
         total_balance: Total saldo (pemasukan - pengeluaran)
@@ -70,8 +80,12 @@ async def get_balance(
         total_expense: Total pengeluaran
         period: Period yang dipilih
         period_details: Detail breakdown per sumber
+
+        Jika periods=all: {"periods": {"day": {...}, "month": {...}, "year": {...}, "all": {...}}}
     """
     try:
+        if periods == 'all':
+            return {"periods": get_balance_by_periods(db=db)}
         result = get_total_balance(db=db, period=period)
         return result
     except Exception as e:
@@ -267,13 +281,16 @@ async def create_fee_endpoint(
     """
     Create fee baru dan otomatis membuat transaksi untuk semua keluarga.
     
-    Setelah fee dibuat, sistem akan otomatis membuat FeeTransaction untuk:
-    - Semua keluarga yang ada
+    Setelah fee dibuat, sistem akan otomatis membuat FeeTransaction (satu statement
+    INSERT ... SELECT, berapapun jumlah keluarga) untuk:
+    - Semua keluarga yang ada (atau keluarga di RT `rt_id` jika diisi)
     - Status: unpaid
     - Transaction date: null (belum bayar)
     - Transaction method: cash (default)
     - Evidence path: kosong
-    - Automation mode: off (fixed)
+    
+    Jika automation_mode 'weekly'/'monthly', transaksi periode berikutnya dibuat
+    otomatis oleh scheduler (src/finance/scheduler.py), bukan oleh request ini.
     
     Args:
         fee_name: Nama fee
@@ -282,6 +299,8 @@ async def create_fee_endpoint(
         due_date: Tanggal jatuh tempo (required)
         description: Deskripsi fee (optional)
         fee_category: Kategori fee
+        rt_id: Batasi ke keluarga di RT tertentu (optional)
+        automation_mode: 'weekly', 'monthly' atau 'off' (default: off)
     
     Returns:
         detail: Success message
@@ -438,3 +457,58 @@ async def update_fee_transaction_status(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating fee transaction: {str(e)}")
+
+
+@router.patch("/fee-transactions/{fee_transaction_id}/status", response_model=dict, dependencies=[Depends(SafeRateLimiter(times=30, seconds=60)), require_role("admin")])
+async def verify_fee_transaction_status(
+    fee_transaction_id: int = Path(..., description="ID transaksi fee"),
+    status: str = Query(..., regex="^(paid|unpaid)$"),
+    db: Session = Depends(get_db)
+):
+    """
+    Verifikasi pembayaran fee oleh admin.
+    
+    Transaksi berstatus 'pending' diubah menjadi 'paid' (bukti diterima) atau
+    kembali ke 'unpaid' (bukti ditolak). Fee yang 'paid' langsung masuk ke
+    ringkasan keuangan (finance_daily_rollup).
+    
+    Args:
+        fee_transaction_id: ID transaksi fee
+        status: Status baru ('paid' atau 'unpaid')
+    
+    Returns:
+        detail: Success message
+        data: Updated fee transaction data
+    """
+    try:
+        from src.finance.service import update_fee_transaction_status
+        
+        updated_transaction = update_fee_transaction_status(
+            db=db,
+            fee_transaction_id=fee_transaction_id,
+            status=status
+        )
+        
+        fee = updated_transaction.fee_rel
+        family = db.query(FamilyModel).filter(FamilyModel.family_id == updated_transaction.family_id).first()
+        
+        return {
+            "detail": f"Fee transaction status updated to {status} successfully",
+            "data": FeeTransactionData(
+                fee_transaction_id=updated_transaction.fee_transaction_id,
+                transaction_date=updated_transaction.transaction_date,
+                fee_id=updated_transaction.fee_id,
+                fee_name=fee.fee_name if fee else "Unknown",
+                fee_category=fee.fee_category if fee else "Unknown",
+                amount=updated_transaction.amount,
+                transaction_method=updated_transaction.transaction_method,
+                status=updated_transaction.status,
+                family_id=updated_transaction.family_id,
+                family_name=family.family_name if family else "Unknown",
+                evidence_path=updated_transaction.evidence_path
+            )
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error verifying fee transaction: {str(e)}")
@@ -0,0 +1,146 @@
+"""
+Pemeliharaan tabel finance_daily_rollup.
+
+Rollup berisi total income/expense per (tanggal, source, category) dari
+t_finance_transaction dan t_fee_transaction (status=paid), sehingga dashboard
+dan chart cukup membaca beberapa ratus baris ringkasan.
+
+- record_finance_rollup(): update inkremental, dipanggil di transaksi DB yang
+  sama dengan perubahan data (sebelum commit).
+- rebuild_finance_rollup(): hitung ulang dari tabel transaksi (backfill).
+
+Rebuild via command line:
+    python -m src.finance.rollup
+    python -m src.finance.rollup --from 2025-01-01 --to 2025-12-31
+"""
+import argparse
+from datetime import date
+from sqlalchemy import case, delete, func, literal, select, union_all
+from sqlalchemy.orm import Session
+from src.entities.finance import FinanceDailyRollupModel, FinanceTransactionModel, FeeTransactionModel, FeeModel
+from src.exceptions import AppException
+
+# Transaksi tanpa tanggal tetap dihitung (untuk period 'all') dengan tanggal ini
+UNDATED = date.min
+
+SOURCE_FINANCE = 'finance'
+SOURCE_FEE = 'fee'
+
+
+def _insert_for(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise AppException(f"finance_daily_rollup upsert not supported for dialect: {dialect}", status_code=500)
+    return insert
+
+
+def record_finance_rollup(
+    db: Session,
+    source: str,
+    category: str,
+    transaction_date,
+    amount: int,
+    sign: int = 1
+) -> None:
+    """
+    Tambahkan (sign=1) atau kurangi (sign=-1) satu transaksi ke rollup harian.
+    Tidak melakukan commit; pemanggil yang commit bersama perubahan transaksi.
+    """
+    income = amount if amount > 0 else 0
+    expense = -amount if amount < 0 else 0
+
+    insert = _insert_for(db)
+    stmt = insert(FinanceDailyRollupModel).values(
+        rollup_date=transaction_date or UNDATED,
+        source=source,
+        category=category,
+        income=income * sign,
+        expense=expense * sign,
+        transaction_count=sign
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['rollup_date', 'source', 'category'],
+        set_={
+            'income': FinanceDailyRollupModel.income + stmt.excluded.income,
+            'expense': FinanceDailyRollupModel.expense + stmt.excluded.expense,
+            'transaction_count': FinanceDailyRollupModel.transaction_count + stmt.excluded.transaction_count,
+        }
+    )
+    db.execute(stmt)
+
+
+def rebuild_finance_rollup(db: Session, start_date: date = None, end_date: date = None) -> int:
+    """
+    Hitung ulang rollup dari t_finance_transaction dan t_fee_transaction (paid).
+    Jika start_date/end_date diisi, hanya rentang tanggal tersebut yang diganti.
+
+    Returns:
+        Jumlah baris rollup yang ditulis
+    """
+    finance_date = func.coalesce(FinanceTransactionModel.transaction_date, literal(UNDATED))
+    fee_date = func.coalesce(FeeTransactionModel.transaction_date, literal(UNDATED))
+
+    def in_range(date_expr):
+        conditions = []
+        if start_date:
+            conditions.append(date_expr >= start_date)
+        if end_date:
+            conditions.append(date_expr <= end_date)
+        return conditions
+
+    finance_rows = select(
+        finance_date,
+        literal(SOURCE_FINANCE),
+        FinanceTransactionModel.category,
+        func.coalesce(func.sum(case((FinanceTransactionModel.amount > 0, FinanceTransactionModel.amount), else_=0)), 0),
+        func.coalesce(func.sum(case((FinanceTransactionModel.amount < 0, -FinanceTransactionModel.amount), else_=0)), 0),
+        func.count(),
+    ).where(
+        *in_range(finance_date)
+    ).group_by(finance_date, FinanceTransactionModel.category)
+
+    fee_rows = select(
+        fee_date,
+        literal(SOURCE_FEE),
+        FeeModel.fee_name,
+        func.coalesce(func.sum(FeeTransactionModel.amount), 0),
+        literal(0),
+        func.count(),
+    ).join(
+        FeeModel, FeeTransactionModel.fee_id == FeeModel.fee_id
+    ).where(
+        FeeTransactionModel.status == 'paid',
+        *in_range(fee_date)
+    ).group_by(fee_date, FeeModel.fee_name)
+
+    db.execute(delete(FinanceDailyRollupModel).where(*in_range(FinanceDailyRollupModel.rollup_date)))
+    result = db.execute(
+        FinanceDailyRollupModel.__table__.insert().from_select(
+            ['rollup_date', 'source', 'category', 'income', 'expense', 'transaction_count'],
+            union_all(finance_rows, fee_rows)
+        )
+    )
+    db.commit()
+
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild tabel finance_daily_rollup")
+    parser.add_argument("--from", dest="start_date", type=date.fromisoformat, default=None, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="end_date", type=date.fromisoformat, default=None, help="YYYY-MM-DD")
+    args = parser.parse_args()
+
+    import src.entities  # noqa: F401  (registrasi semua mapper)
+    from src.database.core import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_finance_rollup(db, start_date=args.start_date, end_date=args.end_date)
+        print(f"✓ finance_daily_rollup rebuilt: {rows} rows")
+    finally:
+        db.close()
@@ -0,0 +1,127 @@
+"""
+Generator fee berulang (AutomationMode weekly/monthly).
+
+Untuk setiap fee dengan automation_mode 'weekly' atau 'monthly' yang sudah
+melewati charge_date, buat transaksi periode berjalan untuk semua keluarga
+(atau keluarga di fee.rt_id) dengan satu INSERT ... SELECT per fee.
+Idempotent per (fee, keluarga, period_start), aman dijalankan berkali-kali.
+
+Cara menjalankan:
+- In-process: set FEE_SCHEDULER_ENABLED=true, loop asyncio dijalankan saat
+  startup (lihat src/main.py) dan hanya bekerja di jam off-peak.
+- Sekali jalan (cron / worker terpisah):
+    python -m src.finance.scheduler
+- rq: enqueue `src.finance.scheduler.run_recurring_fee_job` ke queue redis.
+
+Konfigurasi (env):
+    FEE_SCHEDULER_ENABLED            true/false (default: false)
+    FEE_SCHEDULER_INTERVAL_SECONDS   jeda antar pengecekan (default: 3600)
+    FEE_SCHEDULER_OFF_PEAK_HOURS     rentang jam lokal inklusif, mis. "0-5" atau
+                                     "22-2" (melewati tengah malam) (default: 0-5)
+"""
+import asyncio
+import logging
+import os
+from datetime import date, datetime
+from sqlalchemy.orm import Session
+from src.entities.finance import FeeModel, AutomationMode
+from src.finance.service import get_period_start, insert_fee_transactions_for_families
+
+logger = logging.getLogger(__name__)
+
+RECURRING_MODES = (AutomationMode.weekly.value, AutomationMode.monthly.value)
+
+
+def generate_recurring_fee_transactions(db: Session, today: date = None) -> dict:
+    """
+    Buat transaksi periode berjalan untuk semua fee berulang.
+    Setiap fee di-commit sebagai batch sendiri.
+
+    Returns:
+        dict {fee_id: jumlah transaksi baru} (hanya fee yang menghasilkan transaksi)
+    """
+    today = today or date.today()
+
+    fees = db.query(FeeModel.fee_id, FeeModel.amount, FeeModel.automation_mode, FeeModel.rt_id).filter(
+        FeeModel.automation_mode.in_(RECURRING_MODES),
+        (FeeModel.charge_date == None) | (FeeModel.charge_date <= today)
+    ).all()
+
+    created = {}
+    for fee in fees:
+        try:
+            count = insert_fee_transactions_for_families(
+                db,
+                fee_id=fee.fee_id,
+                amount=fee.amount,
+                rt_id=fee.rt_id,
+                period_start=get_period_start(fee.automation_mode, today)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception(f"Failed to generate recurring transactions for fee {fee.fee_id}")
+            continue
+
+        if count:
+            created[str(fee.fee_id)] = count
+
+    return created
+
+
+def run_recurring_fee_job() -> dict:
+    """Entry point untuk cron/rq: buka session sendiri lalu jalankan generator."""
+    import src.entities  # noqa: F401  (registrasi semua mapper)
+    from src.database.core import SessionLocal
+
+    db = SessionLocal()
+    try:
+        created = generate_recurring_fee_transactions(db)
+        logger.info(f"Recurring fee job created {sum(created.values())} transactions for {len(created)} fees")
+        return created
+    finally:
+        db.close()
+
+
+def _off_peak_hours() -> set:
+    """
+    Jam off-peak dari FEE_SCHEDULER_OFF_PEAK_HOURS ("start-end", inklusif).
+    Rentang yang melewati tengah malam (mis. "22-2") dibungkus ke jam berikutnya.
+    """
+    value = os.getenv("FEE_SCHEDULER_OFF_PEAK_HOURS", "0-5")
+    try:
+        start, end = (int(hour) for hour in value.split("-"))
+    except ValueError:
+        raise ValueError(f"FEE_SCHEDULER_OFF_PEAK_HOURS must be 'start-end', got {value!r}") from None
+    if not (0 <= start <= 23 and 0 <= end <= 23):
+        raise ValueError(f"FEE_SCHEDULER_OFF_PEAK_HOURS hours must be within 0-23, got {value!r}")
+
+    if end < start:
+        end += 24
+    return {hour % 24 for hour in range(start, end + 1)}
+
+
+async def recurring_fee_scheduler_loop():
+    """
+    Loop asyncio in-process. Pekerjaan DB dijalankan di thread terpisah
+    supaya event loop tidak terblokir.
+    """
+    interval = int(os.getenv("FEE_SCHEDULER_INTERVAL_SECONDS", "3600"))
+    off_peak = _off_peak_hours()
+
+    while True:
+        if datetime.now().hour in off_peak:
+            try:
+                await asyncio.to_thread(run_recurring_fee_job)
+            except Exception:
+                logger.exception("Recurring fee job failed")
+        await asyncio.sleep(interval)
+
+
+def scheduler_enabled() -> bool:
+    return os.getenv("FEE_SCHEDULER_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+if __name__ == "__main__":
+    created = run_recurring_fee_job()
+    print(f"✓ Created {sum(created.values())} fee transactions for {len(created)} recurring fees")
@@ -18,6 +18,8 @@ class FinanceFilter(BaseModel):
     transaction_type: Optional[str] = None  # 'income' atau 'expense'
     offset: int = 0
     limit: int = 10
+    cursor: Optional[str] = None  # next_cursor dari halaman sebelumnya (keyset pagination)
+    include_total: str = Field(default="exact", pattern="^(false|exact|estimate)$")  # false = tanpa count (infinite scroll)
 
 class FeeData(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -81,6 +83,8 @@ class CreateFeeRequest(BaseModel):
     due_date: Optional[date] = None
     description: Optional[str] = None
     fee_category: str = Field(..., min_length=1)
+    rt_id: Optional[int] = None  # Jika diisi, transaksi hanya dibuat untuk keluarga di RT ini
+    automation_mode: str = Field(default="off", pattern="^(weekly|monthly|off)$")
 
 # 4. List Families with Fee Transaction
 class FamilyFeeTransactionData(BaseModel):
@@ -6,111 +6,189 @@ from sqlalchemy.orm.exc import NoResultFound
 from fastapi import Depends
 from passlib.context import CryptContext
 from src.exceptions import AppException
-from src.entities.finance import FinanceTransactionModel, FeeTransactionModel, FeeModel
+from src.entities.finance import FinanceTransactionModel, FeeTransactionModel, FeeModel, FinanceDailyRollupModel
 from src.entities.family import FamilyModel
 from sqlalchemy.orm import joinedload
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select, union_all, case, literal, cast, String
+from src.pagination import encode_cursor, decode_cursor, count_total
+from src.finance.rollup import record_finance_rollup, SOURCE_FINANCE, SOURCE_FEE
 
 import os
 import hashlib
 
-def get_finance_list(db: Session, filters, offset: int = 0, limit: int = 10):
+def _finance_ledger_subquery():
     """
-    Menggabungkan data dari FinanceTransactionModel dan FeeTransactionModel (status=paid)
-    Returns: (total_count, list of dict with FinanceTransactionData structure)
+    UNION ALL antara FinanceTransactionModel dan FeeTransactionModel (status=paid)
+    dengan kolom yang sama seperti FinanceTransactionData, ditambah `type` dan
+    `ledger_key` (kunci unik untuk keyset pagination).
     """
-    
-    # Query FinanceTransactionModel
-    finance_query = db.query(
-        FinanceTransactionModel.name,
-        FinanceTransactionModel.amount,
-        FinanceTransactionModel.category,
-        FinanceTransactionModel.transaction_date,
-        FinanceTransactionModel.evidence_path
+    finance_select = select(
+        FinanceTransactionModel.name.label('name'),
+        FinanceTransactionModel.amount.label('amount'),
+        FinanceTransactionModel.category.label('category'),
+        FinanceTransactionModel.transaction_date.label('transaction_date'),
+        FinanceTransactionModel.evidence_path.label('evidence_path'),
+        case((FinanceTransactionModel.amount > 0, 'income'), else_='expense').label('type'),
+        (literal('f:') + cast(FinanceTransactionModel.finance_transaction_id, String)).label('ledger_key'),
     )
-    
-    # Query FeeTransactionModel dengan status 'paid'
-    fee_query = db.query(
-        FamilyModel.family_name.label('name'),
-        FeeTransactionModel.fee_id,
-        FeeTransactionModel.transaction_date,
-        FeeTransactionModel.evidence_path
-    ).join(
+
+    fee_select = select(
+        func.coalesce(FamilyModel.family_name, 'Unknown').label('name'),
+        FeeTransactionModel.amount.label('amount'),
+        (literal('iuran: ') + func.coalesce(FeeModel.fee_name, 'Unknown')).label('category'),
+        FeeTransactionModel.transaction_date.label('transaction_date'),
+        FeeTransactionModel.evidence_path.label('evidence_path'),
+        literal('income').label('type'),
+        (literal('p:') + cast(FeeTransactionModel.fee_transaction_id, String)).label('ledger_key'),
+    ).select_from(FeeTransactionModel).outerjoin(
         FamilyModel, FeeTransactionModel.family_id == FamilyModel.family_id
-    ).join(
-        FeeTransactionModel.fee_rel
-    ).filter(
+    ).outerjoin(
+        FeeModel, FeeTransactionModel.fee_id == FeeModel.fee_id
+    ).where(
         FeeTransactionModel.status == 'paid'
-    ).options(
-        joinedload(FeeTransactionModel.fee_rel)
     )
-    
-    # Get fee transactions with relationships
-    fee_transactions = db.query(FeeTransactionModel).filter(
-        FeeTransactionModel.status == 'paid'
-    ).options(
-        joinedload(FeeTransactionModel.fee_rel),
-    ).all()
-    
-    # Get finance transactions
-    finance_transactions = db.query(FinanceTransactionModel).all()
-    
-    # Convert to unified format
-    all_transactions = []
-    
-    # Add finance transactions
-    for ft in finance_transactions:
-        all_transactions.append({
-            'name': ft.name,
-            'amount': ft.amount,
-            'category': ft.category,
-            'transaction_date': ft.transaction_date,
-            'evidence_path': ft.evidence_path,
-            'type': 'income' if ft.amount > 0 else 'expense'
-        })
-    
-    # Add fee transactions
-    for fee_tx in fee_transactions:
-        family = db.query(FamilyModel).filter(FamilyModel.family_id == fee_tx.family_id).first()
-        family_name = family.family_name if family else 'Unknown'
-        fee_name = fee_tx.fee_rel.fee_name if fee_tx.fee_rel else 'Unknown'
-        
-        all_transactions.append({
-            'name': family_name,
-            'amount': fee_tx.amount,
-            'category': f'iuran: {fee_name}',
-            'transaction_date': fee_tx.transaction_date,
-            'evidence_path': fee_tx.evidence_path,
-            'type': 'income'
-        })
-    
-    # Apply filters
-    filtered_transactions = all_transactions
-    
+
+    return union_all(finance_select, fee_select).subquery('ledger')
+
+
+def get_finance_list(db: Session, filters, offset: int = 0, limit: int = 10, cursor: str = None):
+    """
+    Menggabungkan data dari FinanceTransactionModel dan FeeTransactionModel (status=paid)
+    langsung di database (UNION ALL), lalu filter, urutkan dan paginasi di SQL.
+
+    Jika `cursor` diisi, pagination memakai keyset (transaction_date, ledger_key)
+    dan `offset` diabaikan; total tidak dihitung agar biaya per halaman tetap.
+    filters.include_total: false | exact | estimate (lihat src.pagination.count_total).
+
+    Returns: (total_count | None, list of dict with FinanceTransactionData structure, next_cursor)
+    """
+    ledger = _finance_ledger_subquery()
+
+    # Tanggal kosong diurutkan paling akhir (sama seperti perilaku sebelumnya)
+    sort_date = func.coalesce(ledger.c.transaction_date, literal(date_type.min))
+
+    conditions = []
     if filters.name:
-        filtered_transactions = [
-            t for t in filtered_transactions 
-            if filters.name.lower() in t['name'].lower()
-        ]
-    
+        conditions.append(ledger.c.name.ilike(f"%{filters.name}%"))
     if filters.transaction_type:
-        filtered_transactions = [
-            t for t in filtered_transactions 
-            if t['type'] == filters.transaction_type
-        ]
-    
-    # Sort by transaction_date descending (newest first)
-    filtered_transactions.sort(
-        key=lambda x: x['transaction_date'] if x['transaction_date'] else datetime.min.date(),
-        reverse=True
-    )
-    
-    total_count = len(filtered_transactions)
-    
-    # Apply pagination
-    paginated_transactions = filtered_transactions[offset:offset + limit]
-    
-    return total_count, paginated_transactions
+        conditions.append(ledger.c.type == filters.transaction_type)
+
+    count_query = db.query(ledger)
+    if conditions:
+        count_query = count_query.filter(and_(*conditions))
+    total_count = count_total(count_query, filters.include_total, cursor)
+
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            last_date = date_type.fromisoformat(position['d'])
+            last_key = str(position['k'])
+        except (KeyError, TypeError, ValueError):
+            raise AppException("Invalid cursor", status_code=400)
+
+        conditions.append(or_(
+            sort_date < last_date,
+            and_(sort_date == last_date, ledger.c.ledger_key < last_key)
+        ))
+        offset = 0
+
+    stmt = select(ledger, sort_date.label('sort_date'))
+    if conditions:
+        stmt = stmt.where(and_(*conditions))
+
+    # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+    stmt = stmt.order_by(sort_date.desc(), ledger.c.ledger_key.desc()).offset(offset).limit(limit + 1)
+    rows = db.execute(stmt).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({'d': last['sort_date'].isoformat(), 'k': last['ledger_key']})
+
+    transactions = [
+        {
+            'name': row['name'],
+            'amount': row['amount'],
+            'category': row['category'],
+            'transaction_date': row['transaction_date'],
+            'evidence_path': row['evidence_path'],
+            'type': row['type']
+        }
+        for row in rows
+    ]
+
+    return total_count, transactions, next_cursor
+
+
+BALANCE_PERIODS = ('day', 'month', 'year', 'all')
+
+
+def _balance_period_filters(date_field, today: date_type) -> dict:
+    """Kondisi tanggal untuk tiap period; 'all' tidak ada filter (None)."""
+    return {
+        'day': date_field == today,
+        'month': date_field >= today.replace(day=1),
+        'year': date_field >= today.replace(month=1, day=1),
+        'all': None,
+    }
+
+
+def _build_balance_result(period: str, finance_income: int, fee_income: int, finance_expense: int) -> dict:
+    total_income = finance_income + fee_income
+    return {
+        'total_balance': total_income - finance_expense,
+        'total_income': total_income,
+        'total_expense': finance_expense,
+        'period': period,
+        'period_details': {
+            'finance_income': finance_income,
+            'fee_income': fee_income,
+            'finance_expense': finance_expense
+        }
+    }
+
+
+def get_balance_by_periods(db: Session, periods=BALANCE_PERIODS) -> dict:
+    """
+    Menghitung saldo untuk beberapa period sekaligus dalam SATU query agregat.
+
+    Dibaca dari finance_daily_rollup (ringkasan harian finance transaction dan
+    fee transaction paid), lalu setiap angka (finance income, finance expense,
+    fee income) per period dihitung dengan conditional SUM (CASE WHEN ...).
+
+    Returns:
+        dict {period: hasil seperti get_total_balance}
+    """
+    rollup = FinanceDailyRollupModel
+    period_filters = _balance_period_filters(rollup.rollup_date, date_type.today())
+
+    def conditional_sum(label: str, value, *conditions):
+        return func.coalesce(
+            func.sum(case((and_(*conditions), value), else_=0)), 0
+        ).label(label)
+
+    columns = []
+    for period in periods:
+        in_period = [period_filters[period]] if period_filters[period] is not None else []
+        is_finance = rollup.source == SOURCE_FINANCE
+        columns.extend([
+            conditional_sum(f'{period}_finance_income', rollup.income, is_finance, *in_period),
+            conditional_sum(f'{period}_finance_expense', rollup.expense, is_finance, *in_period),
+            conditional_sum(f'{period}_fee_income', rollup.income, rollup.source == SOURCE_FEE, *in_period),
+        ])
+
+    row = db.execute(select(*columns)).mappings().one()
+
+    return {
+        period: _build_balance_result(
+            period,
+            finance_income=int(row[f'{period}_finance_income'] or 0),
+            fee_income=int(row[f'{period}_fee_income'] or 0),
+            finance_expense=int(row[f'{period}_finance_expense'] or 0),
+        )
+        for period in periods
+    }
 
 
 def get_total_balance(db: Session, period: str = 'all'):
@@ -124,123 +202,7 @@ def get_total_balance(db: Session, period: str = 'all'):
     Returns:
         dict dengan total_balance, total_income, total_expense
     """
-    today = date_type.today()
-    
-    # Tentukan filter tanggal berdasarkan period
-    date_filter = None
-    if period == 'day':
-        # Hari ini
-        date_filter = lambda date_field: date_field == today
-    elif period == 'month':
-        # Bulan ini
-        start_of_month = today.replace(day=1)
-        date_filter = lambda date_field: date_field >= start_of_month
-    elif period == 'year':
-        # Tahun ini
-        start_of_year = today.replace(month=1, day=1)
-        date_filter = lambda date_field: date_field >= start_of_year
-    # 'all' tidak ada filter
-    
-    # Query finance transactions
-    finance_query = db.query(
-        func.coalesce(func.sum(FinanceTransactionModel.amount), 0)
-    )
-    
-    if period != 'all':
-        if period == 'day':
-            finance_query = finance_query.filter(
-                FinanceTransactionModel.transaction_date == today
-            )
-        elif period == 'month':
-            start_of_month = today.replace(day=1)
-            finance_query = finance_query.filter(
-                FinanceTransactionModel.transaction_date >= start_of_month
-            )
-        elif period == 'year':
-            start_of_year = today.replace(month=1, day=1)
-            finance_query = finance_query.filter(
-                FinanceTransactionModel.transaction_date >= start_of_year
-            )
-    
-    finance_total = finance_query.scalar() or 0
-    
-    # Query fee transactions (only paid)
-    fee_query = db.query(FeeTransactionModel).filter(
-        FeeTransactionModel.status == 'paid'
-    ).options(
-        joinedload(FeeTransactionModel.fee_rel)
-    )
-    
-    if period != 'all':
-        if period == 'day':
-            fee_query = fee_query.filter(
-                FeeTransactionModel.transaction_date == today
-            )
-        elif period == 'month':
-            start_of_month = today.replace(day=1)
-            fee_query = fee_query.filter(
-                FeeTransactionModel.transaction_date >= start_of_month
-            )
-        elif period == 'year':
-            start_of_year = today.replace(month=1, day=1)
-            fee_query = fee_query.filter(
-                FeeTransactionModel.transaction_date >= start_of_year
-            )
-    
-    fee_transactions = fee_query.all()
-    
-    # Hitung total dari fee (semua fee adalah income)
-    fee_total = sum(
-        fee_tx.amount
-        for fee_tx in fee_transactions
-    )
-    
-    # Calculate totals
-    # Finance transactions bisa positif (income) atau negatif (expense)
-    finance_income = db.query(
-        func.coalesce(func.sum(FinanceTransactionModel.amount), 0)
-    ).filter(
-        FinanceTransactionModel.amount > 0
-    )
-    
-    finance_expense = db.query(
-        func.coalesce(func.sum(FinanceTransactionModel.amount), 0)
-    ).filter(
-        FinanceTransactionModel.amount < 0
-    )
-    
-    if period != 'all':
-        if period == 'day':
-            finance_income = finance_income.filter(FinanceTransactionModel.transaction_date == today)
-            finance_expense = finance_expense.filter(FinanceTransactionModel.transaction_date == today)
-        elif period == 'month':
-            start_of_month = today.replace(day=1)
-            finance_income = finance_income.filter(FinanceTransactionModel.transaction_date >= start_of_month)
-            finance_expense = finance_expense.filter(FinanceTransactionModel.transaction_date >= start_of_month)
-        elif period == 'year':
-            start_of_year = today.replace(month=1, day=1)
-            finance_income = finance_income.filter(FinanceTransactionModel.transaction_date >= start_of_year)
-            finance_expense = finance_expense.filter(FinanceTransactionModel.transaction_date >= start_of_year)
-    
-    finance_income_total = finance_income.scalar() or 0
-    finance_expense_total = abs(finance_expense.scalar() or 0)  # Absolute value untuk expense
-    
-    # Total income = finance income + fee income
-    total_income = finance_income_total + fee_total
-    total_expense = finance_expense_total
-    total_balance = total_income - total_expense
-    
-    return {
-        'total_balance': total_balance,
-        'total_income': total_income,
-        'total_expense': total_expense,
-        'period': period,
-        'period_details': {
-            'finance_income': finance_income_total,
-            'fee_income': fee_total,
-            'finance_expense': finance_expense_total
-        }
-    }
+    return get_balance_by_periods(db, periods=(period,))[period]
 
 
 def get_fees_list(db: Session, filters, offset: int = 0, limit: int = 10):
@@ -345,6 +307,13 @@ async def create_finance_transaction(
     
     try:
         db.add(new_transaction)
+        record_finance_rollup(
+            db,
+            source=SOURCE_FINANCE,
+            category=category,
+            transaction_date=parsed_date,
+            amount=final_amount
+        )
         db.commit()
         db.refresh(new_transaction)
     except Exception as e:
@@ -460,7 +429,8 @@ def get_fee_transactions_list(db: Session, filters, offset: int = 0, limit: int
 
 def create_fee_with_transactions(db: Session, fee_data):
     """
-    Membuat fee baru dan otomatis membuat transaksi untuk semua keluarga.
+    Membuat fee baru dan otomatis membuat transaksi untuk semua keluarga
+    (atau hanya keluarga di RT tertentu jika fee_data.rt_id diisi).
     
     Args:
         db: Database session
@@ -471,6 +441,9 @@ def create_fee_with_transactions(db: Session, fee_data):
     """
     from src.entities.finance import AutomationMode
     
+    automation_mode = getattr(fee_data, 'automation_mode', None) or AutomationMode.off.value
+    rt_id = getattr(fee_data, 'rt_id', None)
+    
     # Create new fee
     new_fee = FeeModel(
         fee_name=fee_data.fee_name,
@@ -479,29 +452,22 @@ def create_fee_with_transactions(db: Session, fee_data):
         due_date=fee_data.due_date,
         description=fee_data.description,
         fee_category=fee_data.fee_category,
-        automation_mode=AutomationMode.off.value  # Always set to 'off'
+        automation_mode=automation_mode,  # weekly/monthly dilanjutkan oleh src/finance/scheduler.py
+        rt_id=rt_id
     )
     
     db.add(new_fee)
     db.flush()  # Flush to get fee_id
     
-    # Get all families
-    families = db.query(FamilyModel).all()
-    
-    # Create fee transaction for each family
-    transaction_count = 0
-    for family in families:
-        fee_transaction = FeeTransactionModel(
-            transaction_date=None,  # Belum bayar
-            fee_id=new_fee.fee_id,
-            amount=new_fee.amount,
-            transaction_method='cash',  # Default
-            status='unpaid',  # Default
-            family_id=family.family_id,
-            evidence_path=''  # Kosong karena belum bayar
-        )
-        db.add(fee_transaction)
-        transaction_count += 1
+    # Buat fee transaction untuk semua keluarga dalam SATU statement
+    # (INSERT ... SELECT family_id FROM m_family), opsional dibatasi per RT
+    transaction_count = insert_fee_transactions_for_families(
+        db,
+        fee_id=new_fee.fee_id,
+        amount=new_fee.amount,
+        rt_id=rt_id,
+        period_start=get_period_start(automation_mode, new_fee.charge_date)
+    )
     
     db.commit()
     db.refresh(new_fee)
@@ -509,6 +475,73 @@ def create_fee_with_transactions(db: Session, fee_data):
     return new_fee, transaction_count
 
 
+def get_period_start(automation_mode: str, day: date_type):
+    """
+    Awal periode tagihan untuk fee berulang: Senin untuk 'weekly',
+    tanggal 1 untuk 'monthly'. Fee 'off' tidak punya periode (None).
+    """
+    from src.entities.finance import AutomationMode
+    
+    if automation_mode == AutomationMode.weekly.value:
+        return day - timedelta(days=day.weekday())
+    if automation_mode == AutomationMode.monthly.value:
+        return day.replace(day=1)
+    return None
+
+
+def insert_fee_transactions_for_families(
+    db: Session,
+    fee_id,
+    amount: int,
+    rt_id: int = None,
+    period_start: date_type = None
+) -> int:
+    """
+    Set-based fan-out: INSERT INTO t_fee_transaction ... SELECT family_id FROM m_family.
+    Tidak melakukan commit.
+    
+    Jika period_start diisi, keluarga yang sudah punya transaksi untuk
+    (fee, periode) tersebut dilewati sehingga aman dijalankan berulang.
+    
+    Args:
+        db: Database session
+        fee_id: UUID fee
+        amount: Nominal per keluarga
+        rt_id: Jika diisi, hanya keluarga di RT tersebut
+        period_start: Awal periode untuk fee weekly/monthly
+    
+    Returns:
+        Jumlah transaksi yang dibuat
+    """
+    families = select(
+        literal(None, FeeTransactionModel.transaction_date.type),  # Belum bayar
+        literal(fee_id, FeeTransactionModel.fee_id.type),
+        literal(amount, FeeTransactionModel.amount.type),
+        literal('cash', FeeTransactionModel.transaction_method.type),  # Default
+        literal('unpaid', FeeTransactionModel.status.type),  # Default
+        FamilyModel.family_id,
+        literal('', FeeTransactionModel.evidence_path.type),  # Kosong karena belum bayar
+        literal(period_start, FeeTransactionModel.period_start.type),
+    )
+    if rt_id is not None:
+        families = families.where(FamilyModel.rt_id == rt_id)
+    if period_start is not None:
+        already_charged = select(FeeTransactionModel.fee_transaction_id).where(
+            FeeTransactionModel.fee_id == fee_id,
+            FeeTransactionModel.family_id == FamilyModel.family_id,
+            FeeTransactionModel.period_start == period_start
+        )
+        families = families.where(~already_charged.exists())
+    
+    result = db.execute(
+        FeeTransactionModel.__table__.insert().from_select(
+            ['transaction_date', 'fee_id', 'amount', 'transaction_method', 'status', 'family_id', 'evidence_path', 'period_start'],
+            families
+        )
+    )
+    return result.rowcount
+
+
 def get_families_by_fee(db: Session, fee_id: str, filters, offset: int = 0, limit: int = 10):
     """
     Mendapatkan list keluarga dengan transaksi fee tertentu.
@@ -648,3 +681,58 @@ async def update_fee_transaction_to_pending(
         raise HTTPException(status_code=500, detail=f"Failed to update transaction: {str(e)}")
     
     return transaction
+
+
+def update_fee_transaction_status(db: Session, fee_transaction_id: int, status: str):
+    """
+    Verifikasi pembayaran fee oleh admin.
+    Status 'pending' diubah menjadi 'paid' (diterima) atau 'unpaid' (ditolak).
+    Fee yang menjadi 'paid' langsung dicatat ke finance_daily_rollup.
+    
+    Args:
+        db: Database session
+        fee_transaction_id: ID transaksi fee
+        status: Status baru ('paid' atau 'unpaid')
+    
+    Returns:
+        Updated FeeTransactionModel
+    """
+    from fastapi import HTTPException
+    
+    transaction = db.query(FeeTransactionModel).options(
+        joinedload(FeeTransactionModel.fee_rel)
+    ).filter(
+        FeeTransactionModel.fee_transaction_id == fee_transaction_id
+    ).first()
+    
+    if not transaction:
+        raise HTTPException(status_code=404, detail="Fee transaction not found")
+    
+    # Validate status transition (only pending -> paid/unpaid)
+    if transaction.status != 'pending':
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot update transaction with status '{transaction.status}'. Only 'pending' transactions can be verified."
+        )
+    
+    transaction.status = status
+    
+    if status == 'paid':
+        if not transaction.transaction_date:
+            transaction.transaction_date = date_type.today()
+        record_finance_rollup(
+            db,
+            source=SOURCE_FEE,
+            category=transaction.fee_rel.fee_name,
+            transaction_date=transaction.transaction_date,
+            amount=transaction.amount
+        )
+    
+    try:
+        db.commit()
+        db.refresh(transaction)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to update transaction: {str(e)}")
+    
+    return transaction
@@ -23,6 +23,8 @@ def list_homes(
     rt_id: int = Query(None, description="Filter by RT ID"),
     offset: int = 0,
     limit: int = 10,
+    cursor: str = Query(None, description="next_cursor dari halaman sebelumnya (keyset pagination)"),
+    include_total: str = Query("exact", pattern="^(false|exact|estimate)$", description="false = tanpa count (infinite scroll), estimate = perkiraan"),
     db: Session = Depends(get_db)
 ):
     """Get list of homes with filters"""
@@ -32,10 +34,12 @@ def list_homes(
         family_id=family_id,
         rt_id=rt_id,
         offset=offset,
-        limit=limit
+        limit=limit,
+        cursor=cursor,
+        include_total=include_total
     )
     
-    total, homes = service.get_homes(db, filters)
+    total, homes, next_cursor = service.get_homes(db, filters)
     
     # Transform to response
     data = []
@@ -52,7 +56,7 @@ def list_homes(
         )
         data.append(home_out)
     
-    return HomeListResponse(total=total, offset=offset, limit=limit, data=data)
+    return HomeListResponse(total=total, offset=offset, limit=limit, next_cursor=next_cursor, data=data)
 
 
 @router.get("/{home_id}", response_model=HomeOut)
@@ -7,11 +7,12 @@ from datetime import date
 from src.entities.home import HomeModel, HomeHistoryModel
 from src.entities.family import FamilyModel
 from src.home.schemas import HomeCreate, HomeUpdate, HomeFilter, HomeHistoryCreate
+from src.pagination import keyset_paginate, count_total
 
 
 # ==================== Home Services ====================
 
-def get_homes(db: Session, filters: HomeFilter) -> Tuple[int, List[HomeModel]]:
+def get_homes(db: Session, filters: HomeFilter) -> Tuple[Optional[int], List[HomeModel], Optional[str]]:
     """Get list of homes with filters and pagination"""
     query = db.query(HomeModel).options(
         joinedload(HomeModel.family).joinedload(FamilyModel.rt_rel),
@@ -31,10 +32,13 @@ def get_homes(db: Session, filters: HomeFilter) -> Tuple[int, List[HomeModel]]:
     if filters.rt_id:
         query = query.join(FamilyModel).filter(FamilyModel.rt_id == filters.rt_id)
     
-    total = query.count()
-    results = query.order_by(HomeModel.home_name).offset(filters.offset).limit(filters.limit).all()
+    total = count_total(query, filters.include_total, filters.cursor)
+    results, next_cursor = keyset_paginate(
+        query, HomeModel.home_name, HomeModel.home_id,
+        limit=filters.limit, offset=filters.offset, cursor=filters.cursor, descending=False
+    )
     
-    return total, results
+    return total, results, next_cursor
 
 
 def get_home_by_id(db: Session, home_id: int) -> Optional[HomeModel]:
@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 from src.database.core import get_db
+from src.auth.service import require_role
 from src.letter.schemas import (
     LetterResponse, LetterTransactionCreate, LetterTransactionResponse,
-    LetterTransactionFilter, ApprovalRequest
+    LetterTransactionFilter, ApprovalRequest,
+    BatchApprovalRequest, BatchApprovalResponse, BatchRenderStatus
 )
 from src.letter.service import (
     get_letters, get_letter_by_id,
     create_letter_transaction, get_letter_transactions,
-    get_transaction_by_id, update_transaction_status, delete_transaction
+    get_transaction_by_id, update_transaction_status, delete_transaction,
+    retry_letter_render, batch_approve_transactions, get_render_batch_status
 )
 
 router = APIRouter(prefix="/letters", tags=["Letters"])
@@ -72,6 +75,7 @@ async def create_letter_request_endpoint(
         data=transaction.data,
         letter_result_path=transaction.letter_result_path,
         rejection_reason=transaction.rejection_reason,
+        render_error=transaction.render_error,
         user_id=str(transaction.user_id),
         letter_id=str(transaction.letter_id),
         letter_name=transaction.letter.letter_name if transaction.letter else None,
@@ -87,7 +91,7 @@ async def get_letter_requests_endpoint(
     db: Session = Depends(get_db)
 ):
     """Get list of letter requests with filters (admin & user)"""
-    total, transactions = get_letter_transactions(db, filters)
+    total, transactions, next_cursor = get_letter_transactions(db, filters)
     
     data = []
     for transaction in transactions:
@@ -102,6 +106,7 @@ async def get_letter_requests_endpoint(
             data=transaction.data,
             letter_result_path=transaction.letter_result_path,
             rejection_reason=transaction.rejection_reason,
+            render_error=transaction.render_error,
             user_id=str(transaction.user_id),
             letter_id=str(transaction.letter_id),
             letter_name=transaction.letter.letter_name if transaction.letter else None,
@@ -110,7 +115,7 @@ async def get_letter_requests_endpoint(
             updated_at=transaction.updated_at
         ))
     
-    return {"total": total, "data": data}
+    return {"total": total, "next_cursor": next_cursor, "data": data}
 
 
 @router.get("/requests/{transaction_id}", response_model=LetterTransactionResponse)
@@ -132,6 +137,7 @@ async def get_letter_request_endpoint(
         data=transaction.data,
         letter_result_path=transaction.letter_result_path,
         rejection_reason=transaction.rejection_reason,
+        render_error=transaction.render_error,
         user_id=str(transaction.user_id),
         letter_id=str(transaction.letter_id),
         letter_name=transaction.letter.letter_name if transaction.letter else None,
@@ -147,7 +153,7 @@ async def update_request_status_endpoint(
     approval: ApprovalRequest,
     db: Session = Depends(get_db)
 ):
-    """Approve or reject letter request (admin only) - PDF generated on approval"""
+    """Approve or reject letter request (admin only) - approval returns status 'rendering', PDF is generated in the background"""
     transaction = update_transaction_status(db, transaction_id, approval)
     
     applicant_name = None
@@ -161,6 +167,7 @@ async def update_request_status_endpoint(
         data=transaction.data,
         letter_result_path=transaction.letter_result_path,
         rejection_reason=transaction.rejection_reason,
+        render_error=transaction.render_error,
         user_id=str(transaction.user_id),
         letter_id=str(transaction.letter_id),
         letter_name=transaction.letter.letter_name if transaction.letter else None,
@@ -170,6 +177,50 @@ async def update_request_status_endpoint(
     )
 
 
+@router.post("/requests/{transaction_id}/render", response_model=LetterTransactionResponse, dependencies=[require_role("admin")])
+async def retry_request_render_endpoint(
+    transaction_id: str,
+    db: Session = Depends(get_db)
+):
+    """Re-render PDF for a request with status render_failed (admin only)"""
+    transaction = retry_letter_render(db, transaction_id)
+    
+    return LetterTransactionResponse(
+        letter_transaction_id=str(transaction.letter_transaction_id),
+        application_date=transaction.application_date,
+        status=transaction.status,
+        data=transaction.data,
+        letter_result_path=transaction.letter_result_path,
+        rejection_reason=transaction.rejection_reason,
+        render_error=transaction.render_error,
+        user_id=str(transaction.user_id),
+        letter_id=str(transaction.letter_id),
+        letter_name=transaction.letter.letter_name if transaction.letter else None,
+        created_at=transaction.created_at,
+        updated_at=transaction.updated_at
+    )
+
+
+@router.post("/requests/batch-approve", response_model=BatchApprovalResponse, dependencies=[require_role("admin")])
+async def batch_approve_requests_endpoint(
+    batch: BatchApprovalRequest,
+    db: Session = Depends(get_db)
+):
+    """Approve many letter requests at once (admin only) - PDFs are rendered in parallel in the background, poll progress with batch_id"""
+    batch_id, approved, skipped = batch_approve_transactions(db, batch.letter_transaction_ids)
+    
+    return BatchApprovalResponse(batch_id=batch_id, approved=approved, skipped=skipped)
+
+
+@router.get("/requests/batches/{batch_id}", response_model=BatchRenderStatus, dependencies=[require_role("admin")])
+async def get_render_batch_status_endpoint(
+    batch_id: str,
+    db: Session = Depends(get_db)
+):
+    """Render progress of a batch-approve (admin only)"""
+    return get_render_batch_status(db, batch_id)
+
+
 @router.delete("/requests/{transaction_id}", status_code=204)
 async def delete_letter_request_endpoint(
     transaction_id: str,
@@ -0,0 +1,283 @@
+"""
+Antrian render PDF surat.
+
+Approval tidak lagi merender PDF di dalam request: update_transaction_status
+hanya mengubah status menjadi 'rendering' lalu commit. Tabel t_letter_transaction
+sendiri menjadi antrian (tahan restart, tanpa dependensi tambahan):
+
+1. claim   ambil baris status 'rendering' yang render_available_at-nya sudah lewat,
+           render_attempts += 1 dan render_available_at = now + lease, commit.
+           Di PostgreSQL memakai FOR UPDATE SKIP LOCKED sehingga beberapa worker
+           tidak mengambil surat yang sama.
+2. render  xhtml2pdf + QR di proses terpisah, tanpa transaksi DB terbuka, lewat
+           src/letter/storage.py (PDF identik dipakai ulang, ditulis ke .tmp lalu di-rename).
+3. selesai sukses -> letter_result_path diisi, status 'approved'.
+           gagal  -> render_error diisi, dicoba lagi dengan backoff
+                     (LETTER_RENDER_RETRY_SECONDS * 2^(percobaan-1)); setelah
+                     LETTER_RENDER_MAX_ATTEMPTS status menjadi 'render_failed'.
+Worker yang mati di tengah render tidak menghilangkan job: setelah lease habis
+surat diambil lagi.
+
+Cara menjalankan:
+- In-process (default): loop asyncio dijalankan saat startup (lihat src/main.py),
+  dibangunkan langsung setiap ada approval, render di ProcessPoolExecutor.
+- Worker terpisah (set LETTER_RENDER_WORKER_ENABLED=false di API):
+    python -m src.letter.render_queue --loop
+- Sekali jalan (cron / rq): python -m src.letter.render_queue, atau enqueue
+  `src.letter.render_queue.run_letter_render_job` ke queue redis.
+
+Konfigurasi (env):
+    LETTER_RENDER_WORKER_ENABLED   true/false (default: true)
+    LETTER_RENDER_PROCESSES        jumlah proses render in-process (default: min(jumlah CPU, 4))
+    LETTER_RENDER_POLL_SECONDS     jeda pengecekan retry (default: 5)
+    LETTER_RENDER_MAX_ATTEMPTS     batas percobaan (default: 5)
+    LETTER_RENDER_RETRY_SECONDS    backoff dasar (default: 30)
+    LETTER_RENDER_LEASE_SECONDS    lama lease satu render (default: 300)
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid as uuid_lib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+from typing import List
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, joinedload
+from src.entities.letter import LetterStatus, LetterTransactionModel
+from src.letter.storage import remove_if_unreferenced, render_letter
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = int(os.getenv("LETTER_RENDER_MAX_ATTEMPTS", "5"))
+RETRY_SECONDS = int(os.getenv("LETTER_RENDER_RETRY_SECONDS", "30"))
+LEASE_SECONDS = int(os.getenv("LETTER_RENDER_LEASE_SECONDS", "300"))
+
+
+def render_worker_enabled() -> bool:
+    return os.getenv("LETTER_RENDER_WORKER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+def render_processes() -> int:
+    """Jumlah proses render paralel; default dibatasi 4 agar memori API tidak membengkak."""
+    default = min(os.cpu_count() or 1, 4)
+    return max(int(os.getenv("LETTER_RENDER_PROCESSES", str(default))), 1)
+
+
+# ---------------------------
+# ENQUEUE (DIPANGGIL SERVICE)
+# ---------------------------
+def enqueue_letter_render(transaction: LetterTransactionModel) -> None:
+    """Tandai transaksi untuk dirender. Tidak melakukan commit; pemanggil yang commit."""
+    transaction.status = LetterStatus.rendering.value
+    transaction.render_attempts = 0
+    transaction.render_error = None
+    transaction.render_available_at = None
+
+
+_loop = None
+_wake_event = None
+
+
+def notify_render_queue() -> None:
+    """Bangunkan loop in-process (jika berjalan) setelah job baru di-commit."""
+    if _loop is not None and _wake_event is not None:
+        _loop.call_soon_threadsafe(_wake_event.set)
+
+
+# ---------------------------
+# CLAIM / SELESAI
+# ---------------------------
+def claim_render_jobs(db: Session, limit: int) -> List[dict]:
+    """Ambil dan lease sampai `limit` job render. Return list job (dict yang bisa di-pickle)."""
+    now = datetime.utcnow()
+    query = (
+        db.query(LetterTransactionModel)
+        .options(joinedload(LetterTransactionModel.letter, innerjoin=True))
+        .filter(
+            LetterTransactionModel.status == LetterStatus.rendering.value,
+            or_(
+                LetterTransactionModel.render_available_at.is_(None),
+                LetterTransactionModel.render_available_at <= now
+            )
+        )
+        .order_by(LetterTransactionModel.updated_at)
+        .limit(limit)
+    )
+    if db.get_bind().dialect.name == 'postgresql':
+        query = query.with_for_update(skip_locked=True, of=LetterTransactionModel)
+
+    jobs = []
+    for transaction in query.all():
+        transaction.render_attempts = (transaction.render_attempts or 0) + 1
+        transaction.render_available_at = now + timedelta(seconds=LEASE_SECONDS)
+        jobs.append({
+            "transaction_id": str(transaction.letter_transaction_id),
+            "template_path": transaction.letter.template_path,
+            "data": transaction.data or {},
+        })
+    db.commit()
+    return jobs
+
+
+def complete_render_job(db: Session, transaction_id: str, output_path: str = None, error: str = None) -> str:
+    """
+    Simpan hasil satu job render. Return status akhir transaksi
+    (None jika transaksi sudah dihapus / tidak lagi menunggu render).
+    """
+    transaction = db.query(LetterTransactionModel).filter(
+        LetterTransactionModel.letter_transaction_id == uuid_lib.UUID(transaction_id),
+        LetterTransactionModel.status == LetterStatus.rendering.value
+    ).first()
+
+    if transaction is None:
+        # Transaksi dihapus selama render; jangan tinggalkan file yatim
+        remove_if_unreferenced(db, output_path)
+        return None
+
+    if output_path:
+        transaction.letter_result_path = output_path
+        transaction.status = LetterStatus.approved.value
+        transaction.render_error = None
+        transaction.render_available_at = None
+    else:
+        transaction.render_error = (error or "Unknown error")[:500]
+        if transaction.render_attempts >= MAX_ATTEMPTS:
+            transaction.status = LetterStatus.render_failed.value
+            transaction.render_available_at = None
+        else:
+            backoff = RETRY_SECONDS * 2 ** (transaction.render_attempts - 1)
+            transaction.render_available_at = datetime.utcnow() + timedelta(seconds=backoff)
+
+    transaction.updated_at = datetime.utcnow()
+    db.commit()
+    return transaction.status
+
+
+# ---------------------------
+# RENDER (PROSES WORKER)
+# ---------------------------
+def render_letter_file(template_path: str, data: dict) -> str:
+    """Render PDF (atau pakai ulang PDF identik) di storage surat. Return path PDF."""
+    from fastapi import HTTPException
+
+    try:
+        return render_letter(template_path, data)
+    except HTTPException as e:
+        # HTTPException tidak aman di-pickle antar proses
+        raise RuntimeError(e.detail)
+
+
+def _session_call(fn, *args, **kwargs):
+    import src.entities  # noqa: F401  (registrasi semua mapper)
+    from src.database.core import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+def run_letter_render_job(limit: int = 50) -> dict:
+    """Entry point untuk cron/rq/CLI: render semua job yang siap di proses ini."""
+    stats = {"rendered": 0, "retrying": 0, "failed": 0}
+    while True:
+        jobs = _session_call(claim_render_jobs, limit)
+        if not jobs:
+            return stats
+
+        for job in jobs:
+            try:
+                output_path, error = render_letter_file(job["template_path"], job["data"]), None
+            except Exception as e:
+                logger.exception(f"Letter render failed for {job['transaction_id']}")
+                output_path, error = None, str(e)
+            status = _session_call(complete_render_job, job["transaction_id"], output_path, error)
+            _count(stats, status)
+
+
+def _count(stats: dict, status: str) -> None:
+    if status == LetterStatus.approved.value:
+        stats["rendered"] += 1
+    elif status == LetterStatus.render_failed.value:
+        stats["failed"] += 1
+    elif status == LetterStatus.rendering.value:
+        stats["retrying"] += 1
+
+
+# ---------------------------
+# LOOP IN-PROCESS
+# ---------------------------
+async def _render_one(executor, job: dict) -> str:
+    try:
+        output_path = await asyncio.get_running_loop().run_in_executor(
+            executor, render_letter_file, job["template_path"], job["data"]
+        )
+        error = None
+    except BrokenProcessPool:
+        raise
+    except Exception as e:
+        logger.exception(f"Letter render failed for {job['transaction_id']}")
+        output_path, error = None, str(e)
+    return await asyncio.to_thread(_session_call, complete_render_job, job["transaction_id"], output_path, error)
+
+
+def _new_executor(processes: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+
+
+async def letter_render_loop():
+    """
+    Loop asyncio in-process: claim + simpan hasil di thread, render di proses terpisah
+    supaya xhtml2pdf tidak memakan GIL event loop.
+    """
+    global _loop, _wake_event
+    _loop = asyncio.get_running_loop()
+    _wake_event = asyncio.Event()
+    poll_seconds = float(os.getenv("LETTER_RENDER_POLL_SECONDS", "5"))
+    processes = render_processes()
+    executor = _new_executor(processes)
+
+    try:
+        while True:
+            _wake_event.clear()
+            jobs = []
+            try:
+                jobs = await asyncio.to_thread(_session_call, claim_render_jobs, processes * 2)
+                await asyncio.gather(*[_render_one(executor, job) for job in jobs])
+            except BrokenProcessPool:
+                # Job yang sedang di-lease dicoba lagi setelah lease habis
+                logger.exception("Letter render process pool broken, recreating")
+                executor.shutdown(wait=False, cancel_futures=True)
+                executor = _new_executor(processes)
+            except Exception:
+                logger.exception("Letter render loop failed")
+
+            if jobs:
+                continue
+            try:
+                await asyncio.wait_for(_wake_event.wait(), timeout=poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        _loop = _wake_event = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render PDF surat yang sudah disetujui")
+    parser.add_argument("--loop", action="store_true", help="Jalan terus sebagai worker")
+    parser.add_argument("--poll-seconds", type=float, default=float(os.getenv("LETTER_RENDER_POLL_SECONDS", "5")))
+    args = parser.parse_args()
+
+    while True:
+        stats = run_letter_render_job()
+        if any(stats.values()) or not args.loop:
+            print(f"✓ {stats['rendered']} rendered, {stats['retrying']} will retry, {stats['failed']} failed")
+        if not args.loop:
+            break
+        time.sleep(args.poll_seconds)
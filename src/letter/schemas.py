@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from uuid import UUID
 from pydantic import BaseModel, Field
 from datetime import datetime
@@ -64,6 +64,8 @@ class LetterTransactionFilter(BaseModel):
     status: Optional[str] = None
     limit: int = Field(default=20, ge=1, le=100)
     offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None  # next_cursor dari halaman sebelumnya (keyset pagination)
+    include_total: str = Field(default="exact", pattern="^(false|exact|estimate)$")  # false = tanpa count (infinite scroll)
 
 
 class ApprovalRequest(BaseModel):
@@ -71,6 +73,36 @@ class ApprovalRequest(BaseModel):
     rejection_reason: Optional[str] = None
 
 
+class BatchApprovalRequest(BaseModel):
+    letter_transaction_ids: List[str] = Field(..., min_length=1, max_length=500)
+
+
+class BatchApprovalSkipped(BaseModel):
+    letter_transaction_id: str
+    reason: str
+
+
+class BatchApprovalResponse(BaseModel):
+    batch_id: str  # Dipakai untuk polling GET /letters/requests/batches/{batch_id}
+    approved: int
+    skipped: List[BatchApprovalSkipped]
+
+
+class BatchRenderFailure(BaseModel):
+    letter_transaction_id: str
+    render_error: Optional[str]
+
+
+class BatchRenderStatus(BaseModel):
+    batch_id: str
+    total: int
+    rendering: int
+    approved: int
+    render_failed: int
+    done: bool  # True jika tidak ada lagi surat berstatus rendering
+    failures: List[BatchRenderFailure]
+
+
 class LetterTransactionResponse(BaseModel):
     letter_transaction_id: str
     application_date: datetime
@@ -78,6 +110,7 @@ class LetterTransactionResponse(BaseModel):
     data: Optional[Dict[str, Any]]
     letter_result_path: Optional[str]
     rejection_reason: Optional[str]
+    render_error: Optional[str] = None  # Error render PDF terakhir (status rendering/render_failed)
     user_id: str
     letter_id: str
     letter_name: Optional[str] = None
@@ -9,25 +9,45 @@ from src.letter.schemas import (
     LetterTransactionCreate, LetterTransactionUpdate, 
     LetterTransactionFilter, ApprovalRequest
 )
+from src.pagination import keyset_paginate, count_total
+from src.letter.render_queue import enqueue_letter_render, notify_render_queue
+from src.letter.storage import remove_if_unreferenced
 import uuid as uuid_lib
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, TemplateNotFound
 from xhtml2pdf import pisa
 import qrcode
 from io import BytesIO
 import base64
+import hashlib
+import math
 import os
 
 
 # ==================== QR Code Generator ====================
 
+# Ukuran QR di template (CSS px, 96 px = 1 inch) dan resolusi PNG yang dibuat.
+# PNG 1-bit tanpa interpolasi tetap tajam; resolusi di atas ini hanya menambah ukuran PDF.
+QR_PRINT_SIZE_PX = 90
+QR_DPI = int(os.getenv("LETTER_QR_DPI", "150"))
+QR_CACHE_SIZE = int(os.getenv("LETTER_QR_CACHE_SIZE", "1024"))
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
 def generate_dummy_qr_code(text: str) -> str:
-    """Generate dummy QR code and return as base64 data URL"""
-    qr = qrcode.QRCode(version=1, box_size=10, border=2)
+    """
+    Generate dummy QR code and return as base64 data URL (PNG 1-bit).
+    Di-memoize per payload: payload yang sama hanya dirender sekali.
+    """
+    qr = qrcode.QRCode(border=2)
     qr.add_data(text)
     qr.make(fit=True)
     
+    # box_size terkecil yang mencapai QR_DPI pada ukuran cetak
+    target_px = QR_PRINT_SIZE_PX / 96 * QR_DPI
+    qr.box_size = max(1, math.ceil(target_px / (qr.modules_count + 2 * qr.border)))
     img = qr.make_image(fill_color="black", back_color="white")
     
     # Convert to base64
@@ -38,30 +58,100 @@ def generate_dummy_qr_code(text: str) -> str:
     return f"data:image/png;base64,{img_str}"
 
 
-# ==================== PDF Generator ====================
-
-def generate_letter_pdf(letter_type: str, data: Dict[str, Any], output_path: str) -> str:
-    """Generate PDF from HTML template using Jinja2 and WeasyPrint"""
+class LazyQRCode:
+    """QR yang baru dirender saat dipakai template, sehingga QR yang tidak dirujuk template tidak dibuat."""
     
-    # Setup Jinja2 environment
-    template_dir = Path(__file__).parent / "template"
-    env = Environment(loader=FileSystemLoader(str(template_dir)))
+    def __init__(self, text: str):
+        self.text = text
     
-    # Determine template file
-    template_map = {
-        "Surat Keterangan Domisili": "domisili_new.html",
-        "Surat Keterangan Usaha": "pernyataan_usaha_new.html"
-    }
-    
-    template_file = template_map.get(letter_type)
-    if not template_file:
-        raise HTTPException(status_code=400, detail=f"Template not found for letter type: {letter_type}")
+    def __str__(self) -> str:
+        return generate_dummy_qr_code(self.text)
+
+
+# ==================== Template Registry ====================
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+TEMPLATE_DIR = Path(__file__).resolve().parent / "template"
+# Bytecode hasil kompilasi template dibagi antar proses (API + worker render); kosong = nonaktif
+TEMPLATE_CACHE_DIR = os.getenv("LETTER_TEMPLATE_CACHE_DIR", "storage/cache/letter_templates")
+# Cek perubahan file template setiap render; hanya untuk development
+TEMPLATE_AUTO_RELOAD = os.getenv("LETTER_TEMPLATE_AUTO_RELOAD", "false").lower() in ("1", "true", "yes")
+
+
+def _create_template_env() -> Environment:
+    bytecode_cache = None
+    if TEMPLATE_CACHE_DIR:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+    
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATE_DIR)),
+        auto_reload=TEMPLATE_AUTO_RELOAD,
+        bytecode_cache=bytecode_cache
+    )
+
+
+# Satu Environment per proses: template dikompilasi sekali lalu disimpan di cache-nya
+template_env = _create_template_env()
+
+
+def resolve_template_name(template_path: Optional[str]) -> str:
+    """
+    LetterModel.template_path (mis. "src/letter/template/domisili_new.html", relatif ke
+    PROJECT_ROOT, bukan working directory, atau cukup nama file) -> nama template relatif
+    TEMPLATE_DIR. Path di luar TEMPLATE_DIR ditolak.
+    """
+    if not template_path:
+        raise HTTPException(status_code=400, detail="Letter type has no template_path")
+    
+    path = Path(template_path)
+    if len(path.parts) == 1:
+        path = TEMPLATE_DIR / path
+    elif not path.is_absolute():
+        path = PROJECT_ROOT / path
     
-    template = env.get_template(template_file)
+    try:
+        return path.resolve().relative_to(TEMPLATE_DIR.resolve()).as_posix()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Template must be inside {TEMPLATE_DIR}: {template_path}")
+
+
+def get_letter_template(template_path: Optional[str]):
+    """Template terkompilasi untuk LetterModel.template_path (dari cache Environment)"""
+    try:
+        return template_env.get_template(resolve_template_name(template_path))
+    except TemplateNotFound:
+        raise HTTPException(status_code=400, detail=f"Template not found: {template_path}")
+
+
+def get_template_version(template_path: Optional[str]) -> str:
+    """Hash isi file template; dipakai sebagai bagian key render di src/letter/storage.py"""
+    try:
+        source, _, _ = template_env.loader.get_source(template_env, resolve_template_name(template_path))
+    except TemplateNotFound:
+        raise HTTPException(status_code=400, detail=f"Template not found: {template_path}")
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+# ==================== PDF Generator ====================
+
+def generate_letter_pdf(
+    template_path: str,
+    data: Dict[str, Any],
+    output_path: str,
+    current_date: Optional[datetime] = None,
+    nomor_surat: Optional[str] = None
+) -> str:
+    """
+    Generate PDF from LetterModel.template_path using Jinja2 and xhtml2pdf.
+    current_date/nomor_surat diisi oleh src/letter/storage.py agar hasil render deterministik.
+    """
+    
+    template = get_letter_template(template_path)
     
     # Add default data (dummy data for Kelurahan, RT, RW)
-    current_date = datetime.now()
-    nomor_surat = f"{uuid_lib.uuid4().hex[:8].upper()}/SKT/{current_date.strftime('%m/%Y')}"
+    current_date = current_date or datetime.now()
+    nomor_surat = nomor_surat or f"{uuid_lib.uuid4().hex[:8].upper()}/SKT/{current_date.strftime('%m/%Y')}"
     
     template_data = {
         **data,
@@ -75,11 +165,11 @@ def generate_letter_pdf(letter_type: str, data: Dict[str, Any], output_path: str
         "nama_rt": "Budi Santoso",
         "nama_lurah": "Dr. Ahmad Yani, S.H.",
         "nip_lurah": "197512312005011001",
-        # Generate QR codes
-        "qr_code_url": generate_dummy_qr_code(f"RT_SIGNATURE_{nomor_surat}"),
-        "qr_code_rt_url": generate_dummy_qr_code(f"RT_SIGNATURE_{nomor_surat}"),
-        "qr_code_lurah_url": generate_dummy_qr_code(f"LURAH_SIGNATURE_{nomor_surat}"),
-        "qr_code_pemohon_url": generate_dummy_qr_code(f"APPLICANT_{data.get('nik', 'UNKNOWN')}"),
+        # QR codes (dirender saat dipakai template; payload yang sama dirender sekali)
+        "qr_code_url": LazyQRCode(f"RT_SIGNATURE_{nomor_surat}"),
+        "qr_code_rt_url": LazyQRCode(f"RT_SIGNATURE_{nomor_surat}"),
+        "qr_code_lurah_url": LazyQRCode(f"LURAH_SIGNATURE_{nomor_surat}"),
+        "qr_code_pemohon_url": LazyQRCode(f"APPLICANT_{data.get('nik', 'UNKNOWN')}"),
     }
     
     # Render HTML
@@ -153,7 +243,7 @@ def create_letter_transaction(db: Session, user_id: str, transaction_data: Lette
     return transaction
 
 
-def get_letter_transactions(db: Session, filters: LetterTransactionFilter) -> Tuple[int, List[LetterTransactionModel]]:
+def get_letter_transactions(db: Session, filters: LetterTransactionFilter) -> Tuple[Optional[int], List[LetterTransactionModel], Optional[str]]:
     """Get list of letter transactions with filters and pagination"""
     query = db.query(LetterTransactionModel).options(
         joinedload(LetterTransactionModel.letter),
@@ -170,10 +260,13 @@ def get_letter_transactions(db: Session, filters: LetterTransactionFilter) -> Tu
     if filters.status:
         query = query.filter(LetterTransactionModel.status == filters.status)
     
-    total = query.count()
-    results = query.order_by(LetterTransactionModel.created_at.desc()).offset(filters.offset).limit(filters.limit).all()
+    total = count_total(query, filters.include_total, filters.cursor)
+    results, next_cursor = keyset_paginate(
+        query, LetterTransactionModel.created_at, LetterTransactionModel.letter_transaction_id,
+        limit=filters.limit, offset=filters.offset, cursor=filters.cursor
+    )
     
-    return total, results
+    return total, results, next_cursor
 
 
 def get_transaction_by_id(db: Session, transaction_id: str) -> LetterTransactionModel:
@@ -206,24 +299,9 @@ def update_transaction_status(db: Session, transaction_id: str, approval: Approv
     if transaction.status != "pending":
         raise HTTPException(status_code=400, detail="Transaction already processed")
     
-    # If approved, generate PDF first
+    # If approved, enqueue PDF render (status 'rendering' -> 'approved' oleh render_queue)
     if approval.status == "approved":
-        try:
-            # Generate PDF
-            filename = f"{transaction_id}_{datetime.now().strftime('%Y%m%d%H%M%S')}.pdf"
-            output_path = f"storage/letters/{filename}"
-            
-            generate_letter_pdf(
-                letter_type=transaction.letter.letter_name,
-                data=transaction.data,
-                output_path=output_path
-            )
-            
-            transaction.letter_result_path = output_path
-            transaction.status = "approved"
-            
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Failed to generate PDF: {str(e)}")
+        enqueue_letter_render(transaction)
     
     elif approval.status == "rejected":
         transaction.status = "rejected"
@@ -233,9 +311,115 @@ def update_transaction_status(db: Session, transaction_id: str, approval: Approv
     db.commit()
     db.refresh(transaction)
     
+    if transaction.status == "rendering":
+        notify_render_queue()
+    
     return transaction
 
 
+def retry_letter_render(db: Session, transaction_id: str) -> LetterTransactionModel:
+    """Masukkan ulang surat yang gagal dirender ke antrian render (admin)"""
+    transaction = db.query(LetterTransactionModel).filter(
+        LetterTransactionModel.letter_transaction_id == uuid_lib.UUID(transaction_id)
+    ).first()
+    
+    if not transaction:
+        raise HTTPException(status_code=404, detail="Letter transaction not found")
+    
+    if transaction.status != "render_failed":
+        raise HTTPException(status_code=400, detail="Only transactions with status render_failed can be re-rendered")
+    
+    enqueue_letter_render(transaction)
+    transaction.updated_at = datetime.utcnow()
+    db.commit()
+    db.refresh(transaction)
+    
+    notify_render_queue()
+    return transaction
+
+
+def batch_approve_transactions(db: Session, transaction_ids: List[str]) -> Tuple[str, int, List[Dict[str, str]]]:
+    """
+    Setujui banyak surat sekaligus (admin, mis. akhir bulan).
+    Semua perubahan status di-commit dalam satu transaksi; PDF dirender paralel oleh
+    render_queue (LETTER_RENDER_PROCESSES proses). Progres bisa di-polling lewat batch_id.
+    Return (batch_id, jumlah disetujui, daftar yang dilewati beserta alasannya).
+    """
+    batch_id = uuid_lib.uuid4()
+    skipped = []
+
+    requested = {}
+    for transaction_id in dict.fromkeys(transaction_ids):
+        try:
+            requested[uuid_lib.UUID(transaction_id)] = transaction_id
+        except ValueError:
+            skipped.append({"letter_transaction_id": transaction_id, "reason": "Invalid transaction ID"})
+
+    query = db.query(LetterTransactionModel).filter(
+        LetterTransactionModel.letter_transaction_id.in_(list(requested))
+    )
+    if db.get_bind().dialect.name == 'postgresql':
+        # Cegah approve ganda jika transaksi yang sama sedang di-approve dari request lain
+        query = query.with_for_update(of=LetterTransactionModel)
+    transactions = {transaction.letter_transaction_id: transaction for transaction in query.all()}
+
+    approved = 0
+    now = datetime.utcnow()
+    for transaction_uuid, transaction_id in requested.items():
+        transaction = transactions.get(transaction_uuid)
+        if transaction is None:
+            skipped.append({"letter_transaction_id": transaction_id, "reason": "Letter transaction not found"})
+        elif transaction.status != "pending":
+            skipped.append({"letter_transaction_id": transaction_id, "reason": "Transaction already processed"})
+        else:
+            enqueue_letter_render(transaction)
+            transaction.render_batch_id = batch_id
+            transaction.updated_at = now
+            approved += 1
+
+    db.commit()
+
+    if approved:
+        notify_render_queue()
+
+    return str(batch_id), approved, skipped
+
+
+def get_render_batch_status(db: Session, batch_id: str) -> Dict[str, Any]:
+    """Progres render satu batch dari batch_approve_transactions"""
+    try:
+        batch_uuid = uuid_lib.UUID(batch_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid batch ID")
+
+    rows = db.query(
+        LetterTransactionModel.letter_transaction_id,
+        LetterTransactionModel.status,
+        LetterTransactionModel.render_error
+    ).filter(
+        LetterTransactionModel.render_batch_id == batch_uuid
+    ).all()
+
+    if not rows:
+        raise HTTPException(status_code=404, detail="Render batch not found")
+
+    counts = {"rendering": 0, "approved": 0, "render_failed": 0}
+    failures = []
+    for transaction_id, status, render_error in rows:
+        if status in counts:
+            counts[status] += 1
+        if status == "render_failed":
+            failures.append({"letter_transaction_id": str(transaction_id), "render_error": render_error})
+
+    return {
+        "batch_id": batch_id,
+        "total": len(rows),
+        **counts,
+        "done": counts["rendering"] == 0,
+        "failures": failures,
+    }
+
+
 def delete_transaction(db: Session, transaction_id: str) -> None:
     """Delete transaction"""
     transaction = db.query(LetterTransactionModel).filter(
@@ -245,9 +429,9 @@ def delete_transaction(db: Session, transaction_id: str) -> None:
     if not transaction:
         raise HTTPException(status_code=404, detail="Letter transaction not found")
     
-    # Delete PDF file if exists
-    if transaction.letter_result_path and os.path.exists(transaction.letter_result_path):
-        os.remove(transaction.letter_result_path)
-    
+    letter_result_path = transaction.letter_result_path
     db.delete(transaction)
     db.commit()
+    
+    # PDF bisa dipakai bersama transaksi lain (content-addressed); hapus hanya jika tidak dirujuk lagi
+    remove_if_unreferenced(db, letter_result_path)
@@ -0,0 +1,197 @@
+"""
+Penyimpanan PDF surat berbasis isi (content-addressed).
+
+Key render = SHA-256 dari semua input yang menentukan isi PDF:
+    RENDER_VERSION, versi template (hash isi file template), data surat
+    (JSON kanonik) dan tanggal surat.
+Nomor surat diturunkan dari key, sehingga surat yang sama (mis. ditolak lalu
+diajukan ulang dengan data yang sama, atau di-render ulang setelah render_failed)
+pada hari yang sama menghasilkan key yang sama dan PDF yang sudah ada dipakai
+ulang tanpa render. Tanggal ikut di-hash karena tercetak di surat.
+
+File disimpan per shard agar satu direktori tidak berisi ribuan file:
+
+    storage/letters/<key[0:2]>/<key[2:4]>/<key>.pdf
+
+Satu file bisa dirujuk beberapa transaksi, jadi file hanya dihapus lewat
+remove_if_unreferenced() atau GC, dan keduanya tidak menyentuh file yang mtime-nya
+lebih baru dari LETTER_GC_GRACE_SECONDS (default 3600). render_letter() memperbarui
+mtime setiap kali file dibuat atau dipakai ulang, sehingga file yang akan dirujuk
+transaksi yang belum di-commit tidak ikut terhapus. GC menghapus PDF (dan .tmp sisa
+render yang gagal) yang tidak dirujuk t_letter_transaction.letter_result_path:
+
+    python -m src.letter.storage --dry-run
+    python -m src.letter.storage
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+from datetime import date, datetime
+from typing import Any, Dict
+from sqlalchemy.orm import Session
+from src.entities.letter import LetterTransactionModel
+
+LETTER_DIR = os.path.join("storage", "letters")
+# Naikkan jika isi PDF berubah di luar template (mis. data default di generate_letter_pdf)
+RENDER_VERSION = "1"
+GC_GRACE_SECONDS = int(os.getenv("LETTER_GC_GRACE_SECONDS", "3600"))
+
+
+# ---------------------------
+# KEY & PATH
+# ---------------------------
+def render_key(template_version: str, data: Dict[str, Any], letter_date: date) -> str:
+    payload = json.dumps(
+        {
+            "render_version": RENDER_VERSION,
+            "template": template_version,
+            "data": data or {},
+            "date": letter_date.isoformat(),
+        },
+        sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def letter_path(key: str, letter_dir: str = LETTER_DIR) -> str:
+    return os.path.join(letter_dir, key[:2], key[2:4], f"{key}.pdf").replace("\\", "/")
+
+
+def letter_number(key: str, letter_date: date) -> str:
+    """Nomor surat deterministik dari key render"""
+    return f"{key[:8].upper()}/SKT/{letter_date.strftime('%m/%Y')}"
+
+
+# ---------------------------
+# RENDER
+# ---------------------------
+def render_letter(template_path: str, data: Dict[str, Any], letter_date: datetime = None) -> str:
+    """
+    Return path PDF untuk (template, data, tanggal). Render hanya jika file untuk
+    key tersebut belum ada; ditulis ke .tmp lalu di-rename.
+    """
+    from src.letter.service import generate_letter_pdf, get_template_version
+
+    letter_date = letter_date or datetime.now()
+    key = render_key(get_template_version(template_path), data, letter_date.date())
+    output_path = letter_path(key)
+
+    try:
+        # Perbarui mtime supaya tidak dihapus (GC / remove_if_unreferenced) sebelum transaksi baru merujuknya
+        os.utime(output_path)
+        return output_path
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    # Nama .tmp per proses: dua worker bisa merender key yang sama bersamaan
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        generate_letter_pdf(
+            template_path=template_path,
+            data=data,
+            output_path=tmp_path,
+            current_date=letter_date,
+            nomor_surat=letter_number(key, letter_date)
+        )
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+# ---------------------------
+# HAPUS / GC
+# ---------------------------
+def _is_recent(path: str, grace_seconds: int) -> bool:
+    return os.stat(path).st_mtime > time.time() - grace_seconds
+
+
+def remove_if_unreferenced(db: Session, path: str, grace_seconds: int = GC_GRACE_SECONDS) -> bool:
+    """
+    Hapus file PDF jika tidak ada transaksi lain yang merujuknya. Return True jika dihapus.
+    File yang baru dibuat/dipakai ulang (lebih baru dari grace_seconds) dibiarkan untuk GC,
+    karena render yang sedang menunggu commit mungkin akan merujuknya.
+    """
+    if not path or not os.path.exists(path) or _is_recent(path, grace_seconds):
+        return False
+
+    referenced = db.query(LetterTransactionModel.letter_transaction_id).filter(
+        LetterTransactionModel.letter_result_path == path
+    ).first()
+    if referenced is not None:
+        return False
+
+    os.remove(path)
+    return True
+
+
+def collect_garbage(
+    db: Session,
+    letter_dir: str = LETTER_DIR,
+    grace_seconds: int = GC_GRACE_SECONDS,
+    dry_run: bool = False
+) -> dict:
+    """
+    Hapus PDF/.tmp di letter_dir yang tidak dirujuk transaksi mana pun dan lebih tua
+    dari grace_seconds, lalu hapus direktori shard yang kosong.
+    Return dict statistik: scanned, removed, removed_bytes, recent (yatim tetapi masih baru).
+    """
+    referenced = {
+        os.path.normpath(path)
+        for (path,) in db.query(LetterTransactionModel.letter_result_path).filter(
+            LetterTransactionModel.letter_result_path.isnot(None)
+        )
+    }
+
+    cutoff = time.time() - grace_seconds
+    stats = {"scanned": 0, "removed": 0, "removed_bytes": 0, "recent": 0}
+    for root, dirs, files in os.walk(letter_dir, topdown=False):
+        for filename in files:
+            if not filename.endswith((".pdf", ".tmp")):
+                continue
+            full_path = os.path.join(root, filename)
+            stats["scanned"] += 1
+            if os.path.normpath(full_path) in referenced:
+                continue
+
+            stat = os.stat(full_path)
+            if stat.st_mtime > cutoff:
+                stats["recent"] += 1
+                continue
+
+            stats["removed"] += 1
+            stats["removed_bytes"] += stat.st_size
+            if not dry_run:
+                os.remove(full_path)
+
+        if not dry_run and os.path.normpath(root) != os.path.normpath(letter_dir) and not os.listdir(root):
+            os.rmdir(root)
+
+    return stats
+
+
+if __name__ == "__main__":
+    import src.entities  # noqa: F401  (registrasi semua mapper)
+    from src.database.core import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Hapus PDF surat yang tidak lagi dirujuk transaksi")
+    parser.add_argument("--dir", default=LETTER_DIR)
+    parser.add_argument("--grace-seconds", type=int, default=GC_GRACE_SECONDS)
+    parser.add_argument("--dry-run", action="store_true", help="Hanya tampilkan yang akan dihapus")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        stats = collect_garbage(db, args.dir, args.grace_seconds, args.dry_run)
+    finally:
+        db.close()
+
+    action = "would be removed" if args.dry_run else "removed"
+    print(
+        f"✓ {stats['scanned']} files scanned: {stats['removed']} orphaned {action} "
+        f"({stats['removed_bytes'] / 1024:.1f} KB), {stats['recent']} recent orphans kept"
+    )
@@ -1,12 +1,21 @@
 # main.py
 from fastapi import FastAPI
 import asyncio
+import logging
+import os
 from src.rate_limit import init_rate_limit
 from src.exceptions import AppException, app_exception_handler
 from src.api import register_routes
+from src.finance.scheduler import scheduler_enabled, recurring_fee_scheduler_loop
+from src.marketplace.view_counter import view_counter_flush_loop, run_view_counter_flush
+from src.letter.render_queue import render_worker_enabled, letter_render_loop
+from src.ai.inference import inference_pool
+from src.ai.thumbnails import THUMBNAIL_DIR, THUMBNAIL_URL_PREFIX, ImmutableStaticFiles, build_thumbnails
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 
 app.add_exception_handler(AppException, app_exception_handler)
@@ -25,6 +34,45 @@ async def startup_event():
 	redis_url = "redis://localhost:6379"
 	await init_rate_limit(redis_url)
 
+	# Generator fee berulang (weekly/monthly) di background, hanya jika diaktifkan
+	if scheduler_enabled():
+		app.state.fee_scheduler_task = asyncio.create_task(recurring_fee_scheduler_loop())
+
+	# Flush berkala view_count produk yang di-buffer
+	app.state.view_counter_task = asyncio.create_task(view_counter_flush_loop())
+
+	# Render PDF surat yang sudah disetujui di background
+	if render_worker_enabled():
+		app.state.letter_render_task = asyncio.create_task(letter_render_loop())
+
+	# Load + warm-up model AI di semua worker sebelum menerima request prediksi
+	try:
+		info = await inference_pool.warm_up()
+		logger.info(f"AI model {info['version']} ready")
+	except AppException as ae:
+		logger.error(f"AI model warm-up failed: {ae.message}")
+
+	# Thumbnail similar_images (hanya gambar yang berubah yang di-encode ulang)
+	if os.getenv("AI_THUMBNAILS_ON_STARTUP", "1") == "1":
+		try:
+			await asyncio.to_thread(build_thumbnails)
+		except Exception:
+			logger.exception("AI thumbnail build failed")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+	# Tulis sisa view_count yang belum di-flush
+	app.state.view_counter_task.cancel()
+	await asyncio.to_thread(run_view_counter_flush)
+
+	# Surat yang sedang dirender diambil lagi setelah lease habis
+	if getattr(app.state, "letter_render_task", None):
+		app.state.letter_render_task.cancel()
+
+	inference_pool.shutdown()
+
+# Thumbnail ber-hash harus di-mount sebelum /storage agar mendapat Cache-Control immutable
+app.mount(THUMBNAIL_URL_PREFIX, ImmutableStaticFiles(directory=THUMBNAIL_DIR, check_dir=False), name="thumbnails")
 app.mount("/storage", StaticFiles(directory="storage"), name="storage")
 
 register_routes(app)
\ No newline at end of file
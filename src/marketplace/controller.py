@@ -62,16 +62,13 @@ async def list_products_endpoint(
     db: Session = Depends(get_db)
 ):
     """Get all products with filters"""
-    total, products = get_products(db, filters)
+    total, products, next_cursor = get_products(db, filters)
     
     data = []
     for product in products:
-        # Calculate average rating
-        avg_rating = None
-        total_ratings = 0
-        if product.ratings:
-            total_ratings = len(product.ratings)
-            avg_rating = sum(r.rating_value for r in product.ratings) / total_ratings
+        # Average rating dari kolom agregat (tanpa query ke t_product_rating)
+        total_ratings = product.rating_count or 0
+        avg_rating = product.rating_sum / total_ratings if total_ratings else None
         
         seller_name = None
         if product.user and product.user.resident:
@@ -97,7 +94,7 @@ async def list_products_endpoint(
             updated_at=product.updated_at
         ))
     
-    return {"total": total, "data": data}
+    return {"total": total, "next_cursor": next_cursor, "data": data}
 
 @router.get("/products/{product_id}", response_model=ProductResponse)
 async def get_product_endpoint(
@@ -107,12 +104,9 @@ async def get_product_endpoint(
     """Get product detail"""
     product = get_product_by_id(db, product_id)
     
-    # Calculate average rating
-    avg_rating = None
-    total_ratings = 0
-    if product.ratings:
-        total_ratings = len(product.ratings)
-        avg_rating = sum(r.rating_value for r in product.ratings) / total_ratings
+    # Average rating dari kolom agregat (tanpa query ke t_product_rating)
+    total_ratings = product.rating_count or 0
+    avg_rating = product.rating_sum / total_ratings if total_ratings else None
     
     seller_name = None
     if product.user and product.user.resident:
@@ -145,15 +139,12 @@ async def get_my_products_endpoint(
     db: Session = Depends(get_db)
 ):
     """Get seller's products"""
-    total, products = get_my_products(db, user_id, filters)
+    total, products, next_cursor = get_my_products(db, user_id, filters)
 
     data = []
     for product in products:
-        avg_rating = None
-        total_ratings = 0
-        if product.ratings:
-            total_ratings = len(product.ratings)
-            avg_rating = sum(r.rating_value for r in product.ratings) / total_ratings
+        total_ratings = product.rating_count or 0
+        avg_rating = product.rating_sum / total_ratings if total_ratings else None
         
         data.append(ProductResponse(
             product_id=str(product.product_id),
@@ -174,7 +165,7 @@ async def get_my_products_endpoint(
             updated_at=product.updated_at
         ))
     
-    return {"total": total, "data": data}
+    return {"total": total, "next_cursor": next_cursor, "data": data}
 
 @router.put("/products/{product_id}", response_model=ProductResponse)
 async def update_product_endpoint(
@@ -333,7 +324,7 @@ async def get_user_transactions_endpoint(
     db: Session = Depends(get_db)
 ):
     """Get user's transactions (buyer)"""
-    total, transactions = get_user_transactions(db, user_id, filters)
+    total, transactions, next_cursor = get_user_transactions(db, user_id, filters)
     
     data = []
     for transaction in transactions:
@@ -367,7 +358,7 @@ async def get_user_transactions_endpoint(
             updated_at=transaction.updated_at
         ))
     
-    return {"total": total, "data": data}
+    return {"total": total, "next_cursor": next_cursor, "data": data}
 
 @router.get("/transactions/sales", response_model=dict)
 async def get_seller_transactions_endpoint(
@@ -376,7 +367,7 @@ async def get_seller_transactions_endpoint(
     db: Session = Depends(get_db)
 ):
     """Get seller's transactions"""
-    total, transactions = get_seller_transactions(db, user_id, filters)
+    total, transactions, next_cursor = get_seller_transactions(db, user_id, filters)
     
     data = []
     for transaction in transactions:
@@ -415,7 +406,7 @@ async def get_seller_transactions_endpoint(
             updated_at=transaction.updated_at
         ))
     
-    return {"total": total, "data": data}
+    return {"total": total, "next_cursor": next_cursor, "data": data}
 
 @router.get("/transactions/{transaction_id}", response_model=TransactionResponse)
 async def get_transaction_endpoint(
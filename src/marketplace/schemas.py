@@ -23,10 +23,13 @@ class ProductUpdate(BaseModel):
     images_path: Optional[List[str]] = None
 
 class ProductFilter(BaseModel):
-    name: Optional[str] = None
+    name: Optional[str] = None  # Pencarian pada name + description
     category: Optional[str] = None
+    sort: str = Field(default="newest", pattern="^(newest|relevance)$")  # relevance hanya berlaku jika name diisi
     limit: int = Field(default=20, ge=1, le=100)
     offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None  # next_cursor dari halaman sebelumnya (keyset pagination)
+    include_total: str = Field(default="exact", pattern="^(false|exact|estimate)$")  # false = tanpa count (infinite scroll)
 
 class ProductResponse(BaseModel):
     product_id: str
@@ -80,6 +83,8 @@ class TransactionFilter(BaseModel):
     type: Optional[str] = None  # "active" or "history"
     limit: int = Field(default=20, ge=1, le=100)
     offset: int = Field(default=0, ge=0)
+    cursor: Optional[str] = None  # next_cursor dari halaman sebelumnya (keyset pagination)
+    include_total: str = Field(default="exact", pattern="^(false|exact|estimate)$")  # false = tanpa count (infinite scroll)
 
 class TransactionItemResponse(BaseModel):
     product_id: str
@@ -0,0 +1,144 @@
+"""
+Pencarian produk marketplace (name + description) dengan ranking relevansi.
+
+- PostgreSQL: full-text search (to_tsvector 'simple', prefix match) yang
+  memakai GIN index ix_product_search_vector, ditambah ILIKE pada name yang
+  dipercepat index trigram ix_product_name_trgm (pg_trgm). Relevansi =
+  ts_rank + similarity(name). Lihat migration 011.
+- Dialect lain (mis. SQLite saat test): inverted index in-process yang
+  dibangun ulang otomatis jika data produk berubah.
+"""
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from sqlalchemy import case, false, func, literal_column, or_
+from sqlalchemy.orm import Query, Session
+from src.entities.marketplace import ProductModel
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Bobot token dari name lebih tinggi dibanding description
+NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+
+def tokenize(text: str) -> list:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def product_search_document():
+    """Ekspresi tsvector; harus identik dengan index di migration 011."""
+    return func.to_tsvector(
+        literal_column("'simple'::regconfig"),
+        func.coalesce(ProductModel.name, '') + ' ' + func.coalesce(ProductModel.description, '')
+    )
+
+
+class InvertedIndex:
+    """Inverted index sederhana: token -> {product_id: bobot}, dengan prefix match."""
+
+    def __init__(self):
+        self._postings = {}
+        self._vocabulary = []
+        self._doc_count = 0
+
+    def build(self, rows) -> None:
+        postings = defaultdict(lambda: defaultdict(float))
+        doc_count = 0
+        for product_id, name, description in rows:
+            doc_count += 1
+            for token in tokenize(name):
+                postings[token][product_id] += NAME_WEIGHT
+            for token in tokenize(description):
+                postings[token][product_id] += DESCRIPTION_WEIGHT
+
+        self._postings = {token: dict(docs) for token, docs in postings.items()}
+        self._vocabulary = sorted(self._postings)
+        self._doc_count = doc_count
+
+    def _expand(self, prefix: str) -> list:
+        start = bisect_left(self._vocabulary, prefix)
+        matches = []
+        for token in self._vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def search(self, text: str) -> dict:
+        """
+        Semua token query harus cocok (AND); setiap token dicocokkan sebagai prefix.
+        Returns: {product_id: score}
+        """
+        scores = None
+        for query_token in tokenize(text):
+            token_scores = defaultdict(float)
+            for token in self._expand(query_token):
+                docs = self._postings[token]
+                idf = math.log(1 + self._doc_count / len(docs))
+                for product_id, weight in docs.items():
+                    token_scores[product_id] += weight * idf
+
+            if scores is None:
+                scores = dict(token_scores)
+            else:
+                scores = {pid: score + token_scores[pid] for pid, score in scores.items() if pid in token_scores}
+            if not scores:
+                return {}
+
+        return scores
+
+
+class _FallbackProductIndex:
+    """InvertedIndex untuk produk, dibangun ulang jika jumlah/updated_at produk berubah."""
+
+    def __init__(self):
+        self._index = InvertedIndex()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def search(self, db: Session, text: str) -> dict:
+        version = db.query(func.count(ProductModel.product_id), func.max(ProductModel.updated_at)).one()
+        version = tuple(version)
+        with self._lock:
+            if version != self._version:
+                rows = db.query(ProductModel.product_id, ProductModel.name, ProductModel.description).all()
+                self._index.build(rows)
+                self._version = version
+            return self._index.search(text)
+
+
+_fallback_index = _FallbackProductIndex()
+
+
+def apply_product_search(db: Session, query: Query, text: str, rank: bool = False) -> Query:
+    """
+    Filter query produk berdasarkan teks pencarian (name + description).
+    Jika rank=True, hasil diurutkan berdasarkan relevansi (paling relevan dulu).
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        # Tidak ada kata yang bisa di-index (mis. hanya simbol)
+        return query.filter(ProductModel.name.ilike(f"%{text}%"))
+
+    if db.get_bind().dialect.name == 'postgresql':
+        document = product_search_document()
+        ts_query = func.to_tsquery(literal_column("'simple'::regconfig"), " & ".join(f"{t}:*" for t in tokens))
+        query = query.filter(or_(
+            document.op('@@')(ts_query),
+            ProductModel.name.ilike(f"%{text}%")
+        ))
+        if rank:
+            query = query.order_by((func.ts_rank(document, ts_query) + func.similarity(ProductModel.name, text)).desc())
+        return query
+
+    scores = _fallback_index.search(db, text)
+    if not scores:
+        return query.filter(false())
+
+    query = query.filter(ProductModel.product_id.in_(list(scores)))
+    if rank:
+        query = query.order_by(case(scores, value=ProductModel.product_id, else_=0).desc())
+    return query
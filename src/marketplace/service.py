@@ -8,6 +8,9 @@ from src.entities.marketplace import (
 )
 from src.entities.user import UserModel
 from src.entities.resident import ResidentModel
+from src.marketplace.search import apply_product_search
+from src.marketplace.view_counter import record_product_view
+from src.pagination import keyset_paginate, count_total
 from src.marketplace.schemas import (
     ProductCreate, ProductUpdate, ProductFilter,
     TransactionCreate, TransactionFilter, TransactionStatusUpdate,
@@ -55,50 +58,61 @@ def create_product(db: Session, user_id: str, product_data: ProductCreate) -> Pr
     db.refresh(product)
     return product
 
-def get_products(db: Session, filters: ProductFilter) -> Tuple[int, List[ProductModel]]:
-    """Get list of products with filters and pagination"""
+def _check_product_cursor(filters: ProductFilter) -> bool:
+    """Returns True jika urutan relevansi dipakai (keyset tidak berlaku, hanya offset)"""
+    ranked = bool(filters.name) and filters.sort == "relevance"
+    if ranked and filters.cursor:
+        raise HTTPException(status_code=400, detail="cursor is not supported with sort=relevance, use offset")
+    return ranked
+
+def get_products(db: Session, filters: ProductFilter) -> Tuple[Optional[int], List[ProductModel], Optional[str]]:
+    """Get list of products with filters and pagination (total None jika memakai cursor)"""
+    ranked = _check_product_cursor(filters)
     query = db.query(ProductModel).options(
-        joinedload(ProductModel.user).joinedload(UserModel.resident),
-        joinedload(ProductModel.ratings)
+        joinedload(ProductModel.user).joinedload(UserModel.resident)
     )
     
     # Apply filters
     if filters.name:
-        query = query.filter(ProductModel.name.ilike(f"%{filters.name}%"))
+        query = apply_product_search(db, query, filters.name, rank=ranked)
     if filters.category:
         query = query.filter(ProductModel.category == filters.category)
     
-    total = query.count()
-    results = query.order_by(ProductModel.created_at.desc()).offset(filters.offset).limit(filters.limit).all()
+    total = count_total(query, filters.include_total, filters.cursor)
+    results, next_cursor = keyset_paginate(
+        query, ProductModel.created_at, ProductModel.product_id,
+        limit=filters.limit, offset=filters.offset, cursor=filters.cursor
+    )
     
-    return total, results
+    return total, results, (None if ranked else next_cursor)
 
 def get_product_by_id(db: Session, product_id: str) -> ProductModel:
-    """Get product by ID with ratings"""
+    """Get product by ID (rating summary from rating_count/rating_sum)"""
     product = db.query(ProductModel).options(
-        joinedload(ProductModel.user).joinedload(UserModel.resident),
-        joinedload(ProductModel.ratings).joinedload(ProductRatingModel.user).joinedload(UserModel.resident)
+        joinedload(ProductModel.user).joinedload(UserModel.resident)
     ).filter(ProductModel.product_id == uuid_lib.UUID(product_id)).first()
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
 
-def get_my_products(db: Session, user_id: str, filters: ProductFilter) -> Tuple[int, List[ProductModel]]:
+def get_my_products(db: Session, user_id: str, filters: ProductFilter) -> Tuple[Optional[int], List[ProductModel], Optional[str]]:
     """Get seller's products"""
-    query = db.query(ProductModel).options(
-        joinedload(ProductModel.ratings)
-    ).filter(ProductModel.user_id == uuid_lib.UUID(user_id))
+    ranked = _check_product_cursor(filters)
+    query = db.query(ProductModel).filter(ProductModel.user_id == uuid_lib.UUID(user_id))
     
     if filters.name:
-        query = query.filter(ProductModel.name.ilike(f"%{filters.name}%"))
+        query = apply_product_search(db, query, filters.name, rank=ranked)
     if filters.category:
         query = query.filter(ProductModel.category == filters.category)
     
-    total = query.count()
-    results = query.order_by(ProductModel.created_at.desc()).offset(filters.offset).limit(filters.limit).all()
+    total = count_total(query, filters.include_total, filters.cursor)
+    results, next_cursor = keyset_paginate(
+        query, ProductModel.created_at, ProductModel.product_id,
+        limit=filters.limit, offset=filters.offset, cursor=filters.cursor
+    )
     
-    return total, results
+    return total, results, (None if ranked else next_cursor)
 
 def update_product(db: Session, product_id: str, user_id: str, product_data: ProductUpdate) -> ProductModel:
     """Update product (only owner can update)"""
@@ -156,11 +170,8 @@ def add_product_images(db: Session, product_id: str, user_id: str, image_paths:
     return product
 
 def increment_view_count(db: Session, product_id: str) -> None:
-    """Increment product view count"""
-    product = db.query(ProductModel).filter(ProductModel.product_id == uuid_lib.UUID(product_id)).first()
-    if product:
-        product.view_count += 1
-        db.commit()
+    """Increment product view count (di-buffer, ditulis batch oleh view_counter)"""
+    record_product_view(db, product_id)
 
 # ==================== Transaction Services ====================
 
@@ -213,7 +224,7 @@ def create_transaction(db: Session, user_id: str, transaction_data: TransactionC
     db.refresh(transaction)
     return transaction
 
-def get_user_transactions(db: Session, user_id: str, filters: TransactionFilter) -> Tuple[int, List[ProductTransactionModel]]:
+def get_user_transactions(db: Session, user_id: str, filters: TransactionFilter) -> Tuple[Optional[int], List[ProductTransactionModel], Optional[str]]:
     """Get user's transactions (as buyer)"""
     query = db.query(ProductTransactionModel).options(
         joinedload(ProductTransactionModel.transaction_method),
@@ -223,12 +234,15 @@ def get_user_transactions(db: Session, user_id: str, filters: TransactionFilter)
     if filters.status:
         query = query.filter(ProductTransactionModel.status == filters.status)
     
-    total = query.count()
-    results = query.order_by(ProductTransactionModel.created_at.desc()).offset(filters.offset).limit(filters.limit).all()
+    total = count_total(query, filters.include_total, filters.cursor)
+    results, next_cursor = keyset_paginate(
+        query, ProductTransactionModel.created_at, ProductTransactionModel.product_transaction_id,
+        limit=filters.limit, offset=filters.offset, cursor=filters.cursor
+    )
     
-    return total, results
+    return total, results, next_cursor
 
-def get_seller_transactions(db: Session, seller_id: str, filters: TransactionFilter) -> Tuple[int, List[ProductTransactionModel]]:
+def get_seller_transactions(db: Session, seller_id: str, filters: TransactionFilter) -> Tuple[Optional[int], List[ProductTransactionModel], Optional[str]]:
     """Get seller's transactions"""
     query = db.query(ProductTransactionModel).options(
         joinedload(ProductTransactionModel.user).joinedload(UserModel.resident),
@@ -258,11 +272,18 @@ def get_seller_transactions(db: Session, seller_id: str, filters: TransactionFil
     elif filters.status:
         query = query.filter(ProductTransactionModel.status == filters.status)
     
+    # Count cukup DISTINCT id transaksi, bukan DISTINCT seluruh kolom + eager load
+    total = count_total(
+        query.with_entities(ProductTransactionModel.product_transaction_id).distinct(),
+        filters.include_total, filters.cursor
+    )
     query = query.distinct()
-    total = query.count()
-    results = query.order_by(ProductTransactionModel.created_at.desc()).offset(filters.offset).limit(filters.limit).all()
+    results, next_cursor = keyset_paginate(
+        query, ProductTransactionModel.created_at, ProductTransactionModel.product_transaction_id,
+        limit=filters.limit, offset=filters.offset, cursor=filters.cursor
+    )
     
-    return total, results
+    return total, results, next_cursor
 
 def get_transaction_by_id(db: Session, transaction_id: str) -> ProductTransactionModel:
     """Get transaction by ID"""
@@ -327,6 +348,16 @@ def cancel_transaction(db: Session, transaction_id: str, user_id: str) -> Produc
 
 # ==================== Rating Services ====================
 
+def _apply_rating_delta(db: Session, product_id, count_delta: int, sum_delta: int) -> None:
+    """Update rating_count/rating_sum secara atomik di database (tanpa commit)"""
+    db.query(ProductModel).filter(ProductModel.product_id == product_id).update(
+        {
+            ProductModel.rating_count: ProductModel.rating_count + count_delta,
+            ProductModel.rating_sum: ProductModel.rating_sum + sum_delta
+        },
+        synchronize_session=False
+    )
+
 def create_rating(db: Session, product_id: str, user_id: str, rating_data: RatingCreate) -> ProductRatingModel:
     """Create product rating"""
     # Check if product exists
@@ -352,6 +383,7 @@ def create_rating(db: Session, product_id: str, user_id: str, rating_data: Ratin
         description=rating_data.description
     )
     db.add(rating)
+    _apply_rating_delta(db, rating.product_id, 1, rating.rating_value)
     db.commit()
     db.refresh(rating)
     return rating
@@ -386,10 +418,14 @@ def update_rating(db: Session, rating_id: str, user_id: str, rating_data: Rating
     if not rating:
         raise HTTPException(status_code=404, detail="Rating not found or unauthorized")
     
+    old_value = rating.rating_value
     update_data = rating_data.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(rating, key, value)
     
+    if rating.rating_value != old_value:
+        _apply_rating_delta(db, rating.product_id, 0, rating.rating_value - old_value)
+    
     rating.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(rating)
@@ -407,6 +443,7 @@ def delete_rating(db: Session, rating_id: str, user_id: str) -> None:
     if not rating:
         raise HTTPException(status_code=404, detail="Rating not found or unauthorized")
     
+    _apply_rating_delta(db, rating.product_id, -1, -rating.rating_value)
     db.delete(rating)
     db.commit()
 
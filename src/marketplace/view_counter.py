@@ -0,0 +1,209 @@
+"""
+Buffer view_count produk marketplace.
+
+POST /marketplace/products/{id}/view hanya menambah counter di buffer
+(memori proses, atau Redis jika VIEW_COUNTER_REDIS_URL diisi supaya bisa
+dipakai bersama oleh beberapa worker). Buffer di-flush berkala sebagai satu
+UPDATE batch:
+
+    UPDATE m_product SET view_count = view_count + CASE product_id ... END
+    WHERE product_id IN (...)
+
+sehingga produk yang sedang ramai tidak lagi menimbulkan satu transaksi
+tulis (dan row lock) per impression.
+
+Konfigurasi (env):
+    VIEW_COUNTER_REDIS_URL          redis://... (default: kosong = buffer memori)
+    VIEW_COUNTER_FLUSH_SECONDS      interval flush (default: 10)
+    VIEW_COUNTER_MAX_PENDING        jumlah produk di buffer memori sebelum
+                                    flush langsung (default: 10000)
+    VIEW_COUNTER_FLUSH_LOCK_SECONDS TTL lock flush Redis (default: 60)
+"""
+import asyncio
+import logging
+import os
+import threading
+import uuid as uuid_lib
+from collections import Counter
+from contextlib import contextmanager
+from redis.exceptions import LockError, RedisError
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+from src.entities.marketplace import ProductModel
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY = "marketplace:product_views"
+FLUSHING_KEY = f"{REDIS_KEY}:flushing"
+FLUSH_LOCK_KEY = f"{REDIS_KEY}:flush_lock"
+# Harus lebih lama dari satu flush; jika lewat, worker lain bisa ikut flush
+FLUSH_LOCK_SECONDS = int(os.getenv("VIEW_COUNTER_FLUSH_LOCK_SECONDS", "60"))
+
+
+class MemoryViewBuffer:
+    """Counter per proses; hilang jika proses mati sebelum flush."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, product_id: str, count: int = 1) -> int:
+        """Returns jumlah produk yang menunggu flush"""
+        with self._lock:
+            self._counts[product_id] += count
+            return len(self._counts)
+
+    @contextmanager
+    def draining(self):
+        """Yield counter yang tertunda; dikembalikan ke buffer jika blok gagal."""
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        try:
+            yield dict(counts)
+        except BaseException:
+            with self._lock:
+                self._counts.update(counts)
+            raise
+
+
+class RedisViewBuffer:
+    """
+    Counter di hash Redis, dipakai bersama oleh semua worker.
+
+    Flush memindahkan hash ke FLUSHING_KEY dan baru menghapusnya setelah UPDATE
+    di-commit. Jika proses mati atau UPDATE gagal, FLUSHING_KEY tetap ada dan
+    digabung dengan view baru pada flush berikutnya. Hanya satu worker yang
+    flush pada satu waktu (lock Redis), supaya counter yang sama tidak ditulis dua kali.
+    """
+
+    # Atomic: pindahkan view baru ke flushing key (gabung jika sisa flush gagal masih ada)
+    _MERGE_SCRIPT = """
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        if redis.call('EXISTS', KEYS[2]) == 0 then
+            redis.call('RENAME', KEYS[1], KEYS[2])
+        else
+            local pending = redis.call('HGETALL', KEYS[1])
+            for i = 1, #pending, 2 do
+                redis.call('HINCRBY', KEYS[2], pending[i], pending[i + 1])
+            end
+            redis.call('DEL', KEYS[1])
+        end
+    end
+    return redis.call('HGETALL', KEYS[2])
+    """
+
+    def __init__(self, redis_url: str):
+        from redis import Redis
+        self._redis = Redis.from_url(redis_url, decode_responses=True)
+        # from_url tidak membuka koneksi; ping supaya Redis yang mati langsung fallback ke memori
+        self._redis.ping()
+        self._merge = self._redis.register_script(self._MERGE_SCRIPT)
+
+    def add(self, product_id: str, count: int = 1) -> int:
+        self._redis.hincrby(REDIS_KEY, product_id, count)
+        # Batas ukuran tidak berlaku, flush berkala yang mengosongkan hash
+        return 0
+
+    @contextmanager
+    def draining(self):
+        """Yield counter yang tertunda; dihapus dari Redis hanya jika blok selesai tanpa error."""
+        lock = self._redis.lock(FLUSH_LOCK_KEY, timeout=FLUSH_LOCK_SECONDS)
+        if not lock.acquire(blocking=False):
+            yield {}  # worker lain sedang flush
+            return
+
+        try:
+            pending = self._merge(keys=[REDIS_KEY, FLUSHING_KEY])
+            counts = dict(zip(pending[::2], pending[1::2]))
+            yield {product_id: int(count) for product_id, count in counts.items()}
+            self._redis.delete(FLUSHING_KEY)
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                logger.warning("View counter flush lock expired before release")
+
+
+def _create_buffer():
+    redis_url = os.getenv("VIEW_COUNTER_REDIS_URL")
+    if redis_url:
+        try:
+            return RedisViewBuffer(redis_url)
+        except Exception:
+            logger.exception("Redis view buffer unavailable, falling back to in-memory buffer")
+    return MemoryViewBuffer()
+
+
+view_buffer = _create_buffer()
+
+MAX_PENDING = int(os.getenv("VIEW_COUNTER_MAX_PENDING", "10000"))
+
+
+def record_product_view(db: Session, product_id: str) -> None:
+    """
+    Catat satu view; flush langsung jika buffer memori sudah terlalu besar.
+    Counter hanya statistik, jadi Redis yang gagal tidak boleh menggagalkan request.
+    """
+    product_id = str(uuid_lib.UUID(product_id))
+    try:
+        pending = view_buffer.add(product_id)
+    except RedisError:
+        logger.exception("Failed to record product view")
+        return
+    if pending >= MAX_PENDING:
+        flush_view_counts(db)
+
+
+def flush_view_counts(db: Session) -> int:
+    """
+    Tulis semua view yang tertunda dengan satu UPDATE batch.
+    Counter baru dilepas dari buffer setelah commit; jika gagal, counter
+    tetap di buffer untuk flush berikutnya.
+
+    Returns:
+        Jumlah baris produk yang di-update
+    """
+    with view_buffer.draining() as counts:
+        if not counts:
+            return 0
+
+        # Urutan id tetap supaya urutan row lock konsisten antar worker
+        product_ids = sorted(counts)
+        increments = {uuid_lib.UUID(product_id): counts[product_id] for product_id in product_ids}
+
+        try:
+            result = db.execute(
+                update(ProductModel)
+                .where(ProductModel.product_id.in_(list(increments)))
+                .values(view_count=ProductModel.view_count + case(increments, value=ProductModel.product_id, else_=0))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    return result.rowcount
+
+
+def run_view_counter_flush() -> int:
+    """Flush dengan session sendiri (dipakai loop background dan saat shutdown)."""
+    from src.database.core import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return flush_view_counts(db)
+    finally:
+        db.close()
+
+
+async def view_counter_flush_loop():
+    """Loop asyncio in-process; flush dijalankan di thread agar event loop tidak terblokir."""
+    interval = float(os.getenv("VIEW_COUNTER_FLUSH_SECONDS", "10"))
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(run_view_counter_flush)
+        except Exception:
+            logger.exception("Product view counter flush failed")
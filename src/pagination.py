@@ -0,0 +1,204 @@
+import base64
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Optional, Tuple
+from uuid import UUID
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from src.exceptions import AppException
+
+# TTL cache count untuk include_total=estimate di luar PostgreSQL
+COUNT_CACHE_TTL_SECONDS = int(os.getenv("COUNT_CACHE_TTL_SECONDS", "60"))
+COUNT_CACHE_MAX_ENTRIES = 1024
+
+
+def encode_cursor(values: dict) -> str:
+    """
+    Encode posisi terakhir sebuah halaman menjadi token opaque (base64 url-safe).
+    Client cukup mengirim balik token ini sebagai `cursor` untuk halaman berikutnya.
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """
+    Decode token dari encode_cursor.
+    Raise AppException (400) jika token rusak atau bukan buatan server.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise AppException("Invalid cursor", status_code=400)
+
+    if not isinstance(values, dict):
+        raise AppException("Invalid cursor", status_code=400)
+    return values
+
+
+def _cursor_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def _restore_cursor_value(column, raw):
+    """Kembalikan nilai dari token ke tipe Python kolom (datetime, UUID, int, ...)."""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return raw
+
+    if python_type is datetime:
+        return datetime.fromisoformat(raw)
+    if python_type is date:
+        return date.fromisoformat(raw)
+    if python_type is UUID:
+        return UUID(str(raw))
+    return python_type(raw)
+
+
+def keyset_paginate(
+    query: Query,
+    sort_column,
+    pk_column=None,
+    limit: int = 20,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    descending: bool = True
+) -> Tuple[list, Optional[str]]:
+    """
+    Ambil satu halaman dari `query` dengan urutan stabil (sort_column, pk_column).
+
+    - cursor diisi: keyset pagination, WHERE (sort, pk) setelah posisi terakhir;
+      `offset` diabaikan sehingga biaya per halaman tetap berapa pun dalamnya.
+    - cursor kosong: halaman pertama / client lama yang masih memakai offset.
+
+    sort_column harus NOT NULL. pk_column boleh None jika sort_column sudah unik
+    (mis. primary key). Order yang sudah ada di `query` (mis. relevansi) tetap
+    menjadi urutan utama.
+
+    Returns: (rows, next_cursor); next_cursor None jika tidak ada halaman berikutnya.
+    """
+    columns = [sort_column] if pk_column is None else [sort_column, pk_column]
+
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            last = [_restore_cursor_value(sort_column, position['s'])]
+            if pk_column is not None:
+                last.append(_restore_cursor_value(pk_column, position['k']))
+        except (KeyError, TypeError, ValueError):
+            raise AppException("Invalid cursor", status_code=400)
+
+        # (a, b) > (x, y)  <=>  a > x OR (a = x AND b > y)
+        after = []
+        for i, column in enumerate(columns):
+            step = column < last[i] if descending else column > last[i]
+            after.append(and_(*[columns[j] == last[j] for j in range(i)], step))
+        query = query.filter(or_(*after))
+        offset = 0
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column in columns])
+
+    # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+    rows = query.offset(offset).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_row = rows[-1]
+        position = {'s': _cursor_value(getattr(last_row, sort_column.key))}
+        if pk_column is not None:
+            position['k'] = _cursor_value(getattr(last_row, pk_column.key))
+        next_cursor = encode_cursor(position)
+
+    return rows, next_cursor
+
+
+# ==================== Total Count ====================
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement>, untuk membaca estimasi baris dari planner."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, 'postgresql')
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+_count_cache = {}
+_count_cache_lock = threading.Lock()
+
+
+def _planner_estimate(query: Query) -> Optional[int]:
+    """Estimasi jumlah baris dari statistik planner PostgreSQL (tanpa eksekusi query)."""
+    statement = query.enable_eagerloads(False).order_by(None).statement
+    try:
+        with query.session.begin_nested():
+            plan = query.session.execute(_Explain(statement)).scalar()
+    except Exception:
+        return None
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def _cached_count(query: Query) -> int:
+    """query.count() yang di-cache per (SQL, parameter) selama COUNT_CACHE_TTL_SECONDS."""
+    compiled = query.statement.compile(dialect=query.session.get_bind().dialect)
+    key = (str(compiled), repr(sorted(compiled.params.items())))
+    now = time.monotonic()
+
+    with _count_cache_lock:
+        entry = _count_cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+
+    total = query.count()
+
+    with _count_cache_lock:
+        if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+            for expired in [k for k, (expires, _) in _count_cache.items() if expires <= now]:
+                del _count_cache[expired]
+            if len(_count_cache) >= COUNT_CACHE_MAX_ENTRIES:
+                _count_cache.clear()
+        _count_cache[key] = (now + COUNT_CACHE_TTL_SECONDS, total)
+
+    return total
+
+
+def count_total(query: Query, include_total: str = "exact", cursor: Optional[str] = None) -> Optional[int]:
+    """
+    Hitung total untuk response list sesuai parameter include_total:
+    - "false": tidak dihitung (None), untuk infinite scroll
+    - "exact": query.count()
+    - "estimate": estimasi planner PostgreSQL, atau count yang di-cache (TTL)
+      untuk dialect lain / jika estimasi gagal
+
+    Halaman lanjutan (cursor diisi) tidak pernah menghitung total.
+    """
+    if cursor or include_total == "false":
+        return None
+
+    if include_total == "estimate":
+        if query.session.get_bind().dialect.name == 'postgresql':
+            estimate = _planner_estimate(query)
+            if estimate is not None:
+                return estimate
+        return _cached_count(query)
+
+    return query.count()
@@ -43,7 +43,7 @@ async def get_reports_endpoint(
     db: Session = Depends(get_db)
 ):
     """Get list of reports with filters and pagination"""
-    total, reports = get_reports(db, filters)
+    total, reports, next_cursor = get_reports(db, filters)
     
     data = [
         ReportResponse(
@@ -60,7 +60,7 @@ async def get_reports_endpoint(
         for report in reports
     ]
     
-    return {"total": total, "data": data}
+    return {"total": total, "next_cursor": next_cursor, "data": data}
 
 
 @router.get("/{report_id}", response_model=ReportResponse)
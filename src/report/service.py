@@ -4,6 +4,7 @@ from sqlalchemy import or_, and_
 from fastapi import HTTPException, UploadFile
 from src.entities.report import ReportModel
 from src.report.schemas import ReportCreate, ReportUpdate, ReportFilter
+from src.pagination import keyset_paginate, count_total
 import uuid as uuid_lib
 from datetime import datetime
 from pathlib import Path
@@ -45,7 +46,7 @@ def create_report(db: Session, report_data: ReportCreate) -> ReportModel:
     return report
 
 
-def get_reports(db: Session, filters: ReportFilter) -> Tuple[int, List[ReportModel]]:
+def get_reports(db: Session, filters: ReportFilter) -> Tuple[Optional[int], List[ReportModel], Optional[str]]:
     """Get list of reports with filters and pagination"""
     query = db.query(ReportModel)
     
@@ -66,10 +67,13 @@ def get_reports(db: Session, filters: ReportFilter) -> Tuple[int, List[ReportMod
             )
         )
     
-    total = query.count()
-    results = query.order_by(ReportModel.created_at.desc()).offset(filters.offset).limit(filters.limit).all()
+    total = count_total(query, filters.include_total, filters.cursor)
+    results, next_cursor = keyset_paginate(
+        query, ReportModel.created_at, ReportModel.report_id,
+        limit=filters.limit, offset=filters.offset, cursor=filters.cursor
+    )
     
-    return total, results
+    return total, results, next_cursor
 
 
 def get_report_by_id(db: Session, report_id: str) -> ReportModel:
@@ -41,7 +41,7 @@ async def list_residents(
     filters: ResidentsFilter = Depends(),
     db: Session = Depends(get_db)
 ):
-    total, results = get_residents(db=db, filters=filters)
+    total, results, next_cursor = get_residents(db=db, filters=filters)
 
     data = [
         ResidentList(
@@ -73,6 +73,7 @@ async def list_residents(
         "total": total,
         "limit": filters.limit,
         "offset": filters.offset,
+        "next_cursor": next_cursor,
         "data": data
     }
     
@@ -1,5 +1,5 @@
 from uuid import UUID
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from sqlalchemy import String
 from typing import Optional
 
@@ -47,6 +47,8 @@ class ResidentsFilter(BaseModel):
     family_id: Optional[str] = None
     limit: int = 20
     offset: int = 0
+    cursor: Optional[str] = None  # next_cursor dari halaman sebelumnya (keyset pagination)
+    include_total: str = Field(default="exact", pattern="^(false|exact|estimate)$")  # false = tanpa count (infinite scroll)
 
 
 
@@ -12,6 +12,7 @@ from sqlalchemy.orm import joinedload
 from sqlalchemy import and_
 from src.resident.schemas import ResidentsFilter
 from src.entities.family import FamilyModel
+from src.pagination import keyset_paginate, count_total
 
 import os
 import hashlib
@@ -40,10 +41,6 @@ def get_residents(db, filters: ResidentsFilter, last_id: str | None = None):
     if filters.family_id:
         query_filters.append(ResidentModel.family_id == filters.family_id)
 
-    # Keyset pagination: ambil data dengan id > last_id
-    if last_id:
-        query_filters.append(ResidentModel.resident_id > last_id)
-
     # Query utama dengan selective eager loading
     query = db.query(ResidentModel).options(
         joinedload(ResidentModel.user),
@@ -54,20 +51,24 @@ def get_residents(db, filters: ResidentsFilter, last_id: str | None = None):
     if query_filters:
         query = query.filter(and_(*query_filters))
 
+    # Keyset pagination: total hanya dihitung untuk halaman pertama
     total_subq = db.query(ResidentModel.resident_id)
     if query_filters:
         total_subq = total_subq.filter(and_(*query_filters))
-    total_count = total_subq.count()
+    total_count = count_total(total_subq, filters.include_total, filters.cursor or last_id)
+
+    # last_id (lama): ambil data dengan id > last_id, tanpa offset
+    offset = filters.offset
+    if last_id and not filters.cursor:
+        query = query.filter(ResidentModel.resident_id > last_id)
+        offset = 0
 
-    results = (
-        query
-        .order_by(ResidentModel.resident_id)
-        .offset(filters.offset)
-        .limit(filters.limit)
-        .all()
+    results, next_cursor = keyset_paginate(
+        query, ResidentModel.resident_id,
+        limit=filters.limit, offset=offset, cursor=filters.cursor, descending=False
     )
 
-    return total_count, results
+    return total_count, results, next_cursor
 
 def get_resident_summary(db: Session) -> dict:
     total_residents = db.query(ResidentModel).count()
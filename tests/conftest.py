@@ -0,0 +1,9 @@
+import os
+
+# src.database.core membuat engine saat import; test tidak butuh PostgreSQL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Jangan tulis cache bytecode template ke storage/ saat test
+os.environ.setdefault("LETTER_TEMPLATE_CACHE_DIR", "")
+# Token JWT dibuat sendiri oleh test
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
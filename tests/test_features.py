@@ -0,0 +1,49 @@
+"""
+Histogram LBP versi vektorisasi (src/ai/features.py) harus sama dengan
+skimage.feature.local_binary_pattern(method="uniform") yang dipakai saat model dilatih.
+"""
+import glob
+import os
+import cv2
+import numpy as np
+import pytest
+from skimage.feature import local_binary_pattern
+from src.ai.features import FEATURE_SIZE, lbp_histogram_from_gray, to_feature_gray
+
+DATASET_DIR = os.path.join(os.path.dirname(__file__), "..", "storage", "vegetable_images")
+SAMPLE_IMAGES = sorted(glob.glob(os.path.join(DATASET_DIR, "*", "*.jpg")))[::5]
+
+
+def skimage_lbp_histogram(gray: np.ndarray, P: int = 8, R: int = 1) -> np.ndarray:
+    lbp = local_binary_pattern(gray, P, R, method="uniform")
+    hist, _ = np.histogram(lbp.ravel(), bins=np.arange(0, P + 3), range=(0, P + 2))
+    hist = hist.astype("float")
+    hist /= (hist.sum() + 1e-7)
+    return hist
+
+
+def _generated_grays() -> dict:
+    rng = np.random.default_rng(0)
+    masked = rng.integers(0, 256, FEATURE_SIZE, dtype=np.uint8)
+    masked[:40] = 0  # latar hitam hasil segmentasi
+    gradient = np.tile(np.arange(FEATURE_SIZE[0], dtype=np.uint8) * 2, (FEATURE_SIZE[1], 1))
+    return {
+        "noise": rng.integers(0, 256, FEATURE_SIZE, dtype=np.uint8),
+        "flat": np.full(FEATURE_SIZE, 127, dtype=np.uint8),
+        "masked": masked,
+        "gradient": gradient,
+        "small_odd": rng.integers(0, 256, (7, 13), dtype=np.uint8),
+    }
+
+
+@pytest.mark.parametrize("name", sorted(_generated_grays()))
+def test_lbp_histogram_matches_skimage_on_generated_images(name):
+    gray = _generated_grays()[name]
+    np.testing.assert_allclose(lbp_histogram_from_gray(gray), skimage_lbp_histogram(gray), atol=1e-9)
+
+
+@pytest.mark.skipif(not SAMPLE_IMAGES, reason="storage/vegetable_images kosong")
+@pytest.mark.parametrize("path", SAMPLE_IMAGES, ids=os.path.basename)
+def test_lbp_histogram_matches_skimage_on_sample_images(path):
+    gray = to_feature_gray(cv2.imread(path))
+    np.testing.assert_allclose(lbp_histogram_from_gray(gray), skimage_lbp_histogram(gray), atol=1e-9)
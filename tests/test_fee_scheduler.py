@@ -0,0 +1,19 @@
+import pytest
+from src.finance.scheduler import _off_peak_hours
+
+
+@pytest.mark.parametrize("value, hours", [
+    ("0-5", {0, 1, 2, 3, 4, 5}),
+    ("22-2", {22, 23, 0, 1, 2}),
+    ("23-23", {23}),
+])
+def test_off_peak_hours(monkeypatch, value, hours):
+    monkeypatch.setenv("FEE_SCHEDULER_OFF_PEAK_HOURS", value)
+    assert _off_peak_hours() == hours
+
+
+@pytest.mark.parametrize("value", ["22-24", "-1-5", "5", "a-b", "1-2-3", ""])
+def test_off_peak_hours_rejects_malformed_value(monkeypatch, value):
+    monkeypatch.setenv("FEE_SCHEDULER_OFF_PEAK_HOURS", value)
+    with pytest.raises(ValueError):
+        _off_peak_hours()
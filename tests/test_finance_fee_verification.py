@@ -0,0 +1,78 @@
+import uuid
+from datetime import timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import src.entities  # noqa: F401  (registrasi semua mapper)
+from src.auth.service import create_access_token
+from src.database.core import Base, get_db
+from src.entities.family import FamilyModel
+from src.entities.finance import FeeModel, FeeTransactionModel, FinanceDailyRollupModel
+from src.exceptions import AppException, app_exception_handler
+from src.finance.controller import router
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[
+        FamilyModel.__table__, FeeModel.__table__, FeeTransactionModel.__table__, FinanceDailyRollupModel.__table__
+    ])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(router)
+    app.add_exception_handler(AppException, app_exception_handler)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def _headers(role: str) -> dict:
+    token = create_access_token(uuid.uuid4(), role, timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _pending_fee_transaction(db) -> int:
+    family = FamilyModel(family_name="Keluarga A", kk_path="kk.pdf", status="active", rt_id=1)
+    fee = FeeModel(fee_name="Iuran Kebersihan", amount=25000, fee_category="rutin")
+    db.add_all([family, fee])
+    db.flush()
+    transaction = FeeTransactionModel(
+        fee_id=fee.fee_id, family_id=family.family_id, amount=25000, status="pending", evidence_path="bukti.jpg"
+    )
+    db.add(transaction)
+    db.commit()
+    return transaction.fee_transaction_id
+
+
+def _rollup_income(db) -> int:
+    return db.query(func.coalesce(func.sum(FinanceDailyRollupModel.income), 0)).scalar()
+
+
+@pytest.mark.parametrize("headers", [{}, _headers("citizen")], ids=["anonymous", "citizen"])
+def test_fee_verification_requires_admin(client, db, headers):
+    fee_transaction_id = _pending_fee_transaction(db)
+
+    response = client.patch(f"/finance/fee-transactions/{fee_transaction_id}/status?status=paid", headers=headers)
+    assert response.status_code in (401, 403)
+
+    db.expire_all()
+    assert db.get(FeeTransactionModel, fee_transaction_id).status == "pending"
+    assert _rollup_income(db) == 0
+
+
+def test_admin_fee_verification_updates_rollup(client, db):
+    fee_transaction_id = _pending_fee_transaction(db)
+
+    response = client.patch(f"/finance/fee-transactions/{fee_transaction_id}/status?status=paid", headers=_headers("admin"))
+    assert response.status_code == 200
+    assert response.json()["data"]["status"] == "paid"
+    assert _rollup_income(db) == 25000
@@ -0,0 +1,102 @@
+"""
+Warm-up / hot-swap InferencePool dengan proses worker sungguhan (spawn):
+pool baru hanya dipakai jika setiap worker me-load model yang sama.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from src.ai.features import extract_feature_vector
+from src.ai.inference import InferencePool, _init_worker
+from src.ai.service import activate_model
+from src.exceptions import AppException
+
+WORKERS = 2
+
+
+@pytest.fixture(scope="module")
+def model_path(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    n_features = extract_feature_vector(np.zeros((64, 64, 3), dtype=np.uint8)).shape[0]
+    model = LogisticRegression(max_iter=50).fit(rng.random((6, n_features)), [0, 1] * 3)
+    path = tmp_path_factory.mktemp("model") / "model.pkl"
+    joblib.dump(model, path)
+    return str(path)
+
+
+@pytest.fixture
+def broken_model_path(tmp_path):
+    path = tmp_path / "broken.pkl"
+    path.write_bytes(b"bukan model")
+    return str(path)
+
+
+def _pool(model_path: str) -> InferencePool:
+    return InferencePool(workers=WORKERS, max_pending=16, model_path=model_path)
+
+
+def test_warm_up_loads_model_in_every_worker(model_path):
+    pool = _pool(model_path)
+
+    async def run():
+        info = await pool.warm_up()
+        executor = pool._get_executor()
+        return info, len(executor._processes)
+
+    try:
+        info, processes = asyncio.run(run())
+    finally:
+        pool.shutdown()
+    assert info["version"] == pool.model_version
+    assert "pid" not in info
+    assert processes == WORKERS
+
+
+def test_warm_up_fails_when_initializer_fails(broken_model_path):
+    pool = _pool(broken_model_path)
+    try:
+        with pytest.raises(AppException) as exc:
+            asyncio.run(pool.warm_up())
+    finally:
+        pool.shutdown()
+    assert exc.value.status_code == 503
+    assert pool.model_version is None
+    assert pool._executor is None
+
+
+def test_failed_swap_keeps_current_model(model_path, broken_model_path):
+    pool = _pool(model_path)
+
+    async def run():
+        info = await pool.warm_up()
+        executor = pool._get_executor()
+        with pytest.raises(AppException) as exc:
+            await pool.swap_model(broken_model_path)
+        return info, executor, exc.value
+
+    try:
+        info, executor, error = asyncio.run(run())
+        assert error.status_code == 503
+        assert pool._get_executor() is executor
+        assert pool.model_path == model_path
+        assert pool.model_version == info["version"]
+    finally:
+        pool.shutdown()
+
+
+def test_strict_initializer_raises_on_load_failure(broken_model_path):
+    _init_worker(broken_model_path)  # pool lazy: worker tetap hidup
+    with pytest.raises(AppException):
+        _init_worker(broken_model_path, strict=True)
+
+
+def test_load_in_workers_requires_a_report_from_every_worker(model_path):
+    # Dua "worker" yang sebenarnya satu proses (pid sama) tidak boleh dianggap siap
+    activate_model(model_path)
+    pool = _pool(model_path)
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        with pytest.raises(AppException) as exc:
+            asyncio.run(pool._load_in_workers(executor, model_path))
+    assert exc.value.status_code == 503
@@ -0,0 +1,102 @@
+import uuid
+from datetime import timedelta
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import src.entities  # noqa: F401  (registrasi semua mapper)
+from src.auth.service import create_access_token
+from src.database.core import Base, get_db
+from src.entities.letter import LetterStatus, LetterTransactionModel
+from src.exceptions import AppException, app_exception_handler
+from src.letter.controller import router
+from src.letter.render_queue import render_processes
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[LetterTransactionModel.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(router)
+    app.add_exception_handler(AppException, app_exception_handler)
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def _headers(role: str) -> dict:
+    token = create_access_token(uuid.uuid4(), role, timedelta(minutes=5))
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _pending(db) -> str:
+    transaction = LetterTransactionModel(user_id=uuid.uuid4(), letter_id=uuid.uuid4(), data={}, status="pending")
+    db.add(transaction)
+    db.commit()
+    return str(transaction.letter_transaction_id)
+
+
+@pytest.mark.parametrize("headers", [{}, _headers("citizen")], ids=["anonymous", "citizen"])
+def test_batch_endpoints_require_admin(client, db, headers):
+    transaction_id = _pending(db)
+
+    response = client.post("/letters/requests/batch-approve", json={"letter_transaction_ids": [transaction_id]}, headers=headers)
+    assert response.status_code in (401, 403)
+    assert db.get(LetterTransactionModel, uuid.UUID(transaction_id)).status == LetterStatus.pending.value
+
+    response = client.get(f"/letters/requests/batches/{uuid.uuid4()}", headers=headers)
+    assert response.status_code in (401, 403)
+
+
+@pytest.mark.parametrize("headers", [{}, _headers("citizen")], ids=["anonymous", "citizen"])
+def test_render_retry_requires_admin(client, db, headers):
+    transaction = LetterTransactionModel(
+        user_id=uuid.uuid4(), letter_id=uuid.uuid4(), data={},
+        status=LetterStatus.render_failed.value, render_attempts=5
+    )
+    db.add(transaction)
+    db.commit()
+
+    response = client.post(f"/letters/requests/{transaction.letter_transaction_id}/render", headers=headers)
+    assert response.status_code in (401, 403)
+
+    db.refresh(transaction)
+    assert transaction.status == LetterStatus.render_failed.value
+    assert transaction.render_attempts == 5
+
+
+def test_admin_batch_approve_and_poll(client, db):
+    transaction_ids = [_pending(db) for _ in range(3)]
+    headers = _headers("admin")
+
+    response = client.post(
+        "/letters/requests/batch-approve",
+        json={"letter_transaction_ids": transaction_ids + ["not-a-uuid"]},
+        headers=headers
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["approved"] == 3
+    assert body["skipped"] == [{"letter_transaction_id": "not-a-uuid", "reason": "Invalid transaction ID"}]
+
+    status = client.get(f"/letters/requests/batches/{body['batch_id']}", headers=headers).json()
+    assert status["total"] == 3 and status["rendering"] == 3 and status["done"] is False
+
+
+@pytest.mark.parametrize("cpu_count, expected", [(1, 1), (2, 2), (16, 4), (None, 1)])
+def test_render_processes_default_is_parallel_and_capped(cpu_count, expected, monkeypatch):
+    monkeypatch.delenv("LETTER_RENDER_PROCESSES", raising=False)
+    monkeypatch.setattr("os.cpu_count", lambda: cpu_count)
+    assert render_processes() == expected
+
+    monkeypatch.setenv("LETTER_RENDER_PROCESSES", "8")
+    assert render_processes() == 8
@@ -0,0 +1,101 @@
+"""
+PDF surat dipakai bersama oleh beberapa transaksi (src/letter/storage.py):
+file tidak boleh terhapus selagi transaksi lain baru saja memakainya ulang
+tetapi belum commit.
+"""
+import os
+import uuid
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+import src.entities  # noqa: F401  (registrasi semua mapper)
+from src.database.core import Base
+from src.entities.letter import LetterStatus, LetterTransactionModel
+from src.letter.render_queue import complete_render_job
+from src.letter.service import delete_transaction
+from src.letter.storage import collect_garbage, remove_if_unreferenced, render_letter
+
+TEMPLATE_PATH = "src/letter/template/domisili_new.html"
+DATA = {"nama_lengkap": "Ani", "nik": "3201"}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # LETTER_DIR relatif terhadap cwd
+    monkeypatch.chdir(tmp_path)
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[LetterTransactionModel.__table__])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _add_transaction(db, letter_result_path=None, status=LetterStatus.approved.value):
+    transaction = LetterTransactionModel(
+        user_id=uuid.uuid4(), letter_id=uuid.uuid4(), data=DATA,
+        status=status, letter_result_path=letter_result_path
+    )
+    db.add(transaction)
+    db.commit()
+    return transaction
+
+
+def _age(path):
+    os.utime(path, (0, 0))
+
+
+def test_identical_letters_share_one_pdf(db):
+    assert render_letter(TEMPLATE_PATH, DATA) == render_letter(TEMPLATE_PATH, dict(reversed(DATA.items())))
+    assert render_letter(TEMPLATE_PATH, {**DATA, "nik": "3202"}) != render_letter(TEMPLATE_PATH, DATA)
+
+
+def test_reused_pdf_survives_delete_of_previous_owner(db):
+    path = render_letter(TEMPLATE_PATH, DATA)
+    a = _add_transaction(db, path)
+    _age(path)
+
+    # Worker untuk transaksi B memakai ulang PDF yang sama, belum commit...
+    assert render_letter(TEMPLATE_PATH, DATA) == path
+    # ...lalu A dihapus di jendela tersebut
+    delete_transaction(db, str(a.letter_transaction_id))
+    assert os.path.exists(path)
+
+    b = _add_transaction(db, path)
+    assert os.path.exists(b.letter_result_path)
+
+
+def test_reused_pdf_survives_transaction_deleted_mid_render(db):
+    path = render_letter(TEMPLATE_PATH, DATA)
+    _age(path)
+
+    # Transaksi C dihapus selama render; worker untuk D memakai ulang PDF yang sama, belum commit
+    c = _add_transaction(db, status=LetterStatus.rendering.value)
+    delete_transaction(db, str(c.letter_transaction_id))
+    assert render_letter(TEMPLATE_PATH, DATA) == path
+
+    assert complete_render_job(db, str(c.letter_transaction_id), output_path=path) is None
+    assert os.path.exists(path)
+
+
+def test_old_unreferenced_pdf_is_removed(db):
+    path = render_letter(TEMPLATE_PATH, DATA)
+    a = _add_transaction(db, path)
+    b = _add_transaction(db, path)
+    _age(path)
+
+    delete_transaction(db, str(a.letter_transaction_id))
+    assert os.path.exists(path)  # masih dirujuk B
+
+    delete_transaction(db, str(b.letter_transaction_id))
+    assert not os.path.exists(path)
+
+
+def test_recent_orphan_is_left_for_gc(db):
+    path = render_letter(TEMPLATE_PATH, DATA)
+    assert remove_if_unreferenced(db, path) is False
+    assert collect_garbage(db)["recent"] == 1
+
+    _age(path)
+    assert collect_garbage(db)["removed"] == 1
+    assert not os.path.exists(path)
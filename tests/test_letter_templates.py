@@ -0,0 +1,33 @@
+import pytest
+from fastapi import HTTPException
+from src.letter.service import TEMPLATE_DIR, get_letter_template, resolve_template_name
+
+# Nilai template_path dari seeders/letter_seeder.py
+SEEDED_PATHS = ["src/letter/template/domisili_new.html", "src/letter/template/pernyataan_usaha_new.html"]
+
+
+@pytest.mark.parametrize("template_path", SEEDED_PATHS)
+def test_seeded_template_path_resolves_outside_project_root(template_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    name = resolve_template_name(template_path)
+    assert name == template_path.rsplit("/", 1)[1]
+    assert get_letter_template(template_path).name == name
+
+
+def test_bare_and_absolute_template_paths():
+    assert resolve_template_name("domisili_new.html") == "domisili_new.html"
+    assert resolve_template_name(str(TEMPLATE_DIR / "domisili_new.html")) == "domisili_new.html"
+
+
+@pytest.mark.parametrize("template_path", ["../service.py", "src/letter/service.py", "/etc/passwd", "src/letter/template/../service.py"])
+def test_template_path_outside_template_dir_is_rejected(template_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(HTTPException) as exc:
+        resolve_template_name(template_path)
+    assert exc.value.status_code == 400
+
+
+def test_missing_template_path_is_rejected():
+    for template_path in (None, "", "missing.html"):
+        with pytest.raises(HTTPException):
+            get_letter_template(template_path)
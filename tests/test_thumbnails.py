@@ -0,0 +1,76 @@
+"""
+build_thumbnails dijalankan saat startup di setiap proses worker web, jadi
+beberapa build bisa berjalan bersamaan pada direktori yang sama.
+"""
+import json
+import multiprocessing
+import os
+import numpy as np
+import pytest
+from PIL import Image
+from src.ai.thumbnails import MANIFEST_FILENAME, build_thumbnails
+
+WIDTHS = (32, 64)
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    for label in ("kubis", "cabai"):
+        os.makedirs(tmp_path / "source" / label)
+        for i in range(3):
+            image = Image.fromarray(rng.integers(0, 256, (90, 120, 3), dtype=np.uint8))
+            image.save(tmp_path / "source" / label / f"{label}_{i}.jpg")
+    return str(tmp_path / "source")
+
+
+def _build(source_dir: str, output_dir: str, force: bool) -> dict:
+    return build_thumbnails(source_dir, output_dir, WIDTHS, force=force)
+
+
+def _files(output_dir: str) -> set:
+    return {
+        os.path.relpath(os.path.join(root, filename), output_dir).replace("\\", "/")
+        for root, _, files in os.walk(output_dir)
+        for filename in files
+    }
+
+
+def _manifest_files(output_dir: str) -> set:
+    with open(os.path.join(output_dir, MANIFEST_FILENAME), encoding="utf-8") as f:
+        manifest = json.load(f)
+    return {
+        variant["file"]
+        for entry in manifest.values()
+        for variants in entry["variants"].values()
+        for variant in variants
+    }
+
+
+def test_concurrent_builds_leave_consistent_output(source_dir, tmp_path):
+    output_dir = str(tmp_path / "thumbnails")
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(3) as pool:
+        results = pool.starmap(_build, [(source_dir, output_dir, True)] * 3)
+
+    assert all(result["images"] == 6 for result in results)
+    referenced = _manifest_files(output_dir)
+    assert len(referenced) == 6 * len(WIDTHS) * 2
+    # Tidak ada varian yang hilang, tidak ada .tmp yang tertinggal
+    assert _files(output_dir) == referenced | {MANIFEST_FILENAME, ".lock"}
+
+
+def test_prune_skips_in_flight_tmp_files(source_dir, tmp_path):
+    output_dir = str(tmp_path / "thumbnails")
+    _build(source_dir, output_dir, False)
+
+    in_flight = os.path.join(output_dir, "kubis", "kubis_0-32w.0123456789ab.webp.999.tmp")
+    stale = os.path.join(output_dir, "kubis", "old-32w.0123456789ab.webp")
+    for path in (in_flight, stale):
+        with open(path, "wb") as f:
+            f.write(b"x")
+
+    stats = _build(source_dir, output_dir, False)
+    assert stats["reused"] == 6 and stats["pruned"] == 1
+    assert os.path.exists(in_flight)
+    assert not os.path.exists(stale)
@@ -0,0 +1,115 @@
+import uuid
+from types import SimpleNamespace
+import pytest
+from src.marketplace import view_counter
+from src.marketplace.view_counter import FLUSHING_KEY, MemoryViewBuffer, RedisViewBuffer
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class FakeSession:
+    """Session minimal: m_product memakai ARRAY sehingga tidak bisa dibuat di sqlite."""
+
+    def __init__(self, fail_commit=False):
+        self.fail_commit = fail_commit
+        self.committed = []
+        self._pending = None
+
+    def execute(self, statement):
+        self._pending = statement.compile().params["product_id_1"]
+        return SimpleNamespace(rowcount=len(self._pending))
+
+    def commit(self):
+        if self.fail_commit:
+            raise RuntimeError("database down")
+        self.committed.append(self._pending)
+
+    def rollback(self):
+        self._pending = None
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis_buffer(monkeypatch, server):
+    monkeypatch.setattr(
+        "redis.Redis.from_url",
+        lambda url, **kwargs: fakeredis.FakeRedis(server=server, **kwargs)
+    )
+    buffer = RedisViewBuffer("redis://fake")
+    monkeypatch.setattr(view_counter, "view_buffer", buffer)
+    return buffer
+
+
+def _pending_views(buffer: RedisViewBuffer) -> dict:
+    with buffer.draining() as counts:
+        pass
+    return counts
+
+
+def test_unreachable_redis_falls_back_to_memory(monkeypatch):
+    monkeypatch.setenv("VIEW_COUNTER_REDIS_URL", "redis://127.0.0.1:1/0")
+    assert isinstance(view_counter._create_buffer(), MemoryViewBuffer)
+
+
+def test_redis_error_does_not_fail_view(redis_buffer, server):
+    server.connected = False
+    view_counter.record_product_view(FakeSession(), str(uuid.uuid4()))
+
+
+def test_failed_commit_keeps_counts_for_next_flush(redis_buffer):
+    product_id = str(uuid.uuid4())
+    view_counter.record_product_view(FakeSession(), product_id)
+    view_counter.record_product_view(FakeSession(), product_id)
+
+    with pytest.raises(RuntimeError):
+        view_counter.flush_view_counts(FakeSession(fail_commit=True))
+    assert redis_buffer._redis.hgetall(FLUSHING_KEY) == {product_id: "2"}
+
+    # View baru setelah flush gagal digabung dengan sisa flushing key
+    view_counter.record_product_view(FakeSession(), product_id)
+    with pytest.raises(RuntimeError):
+        view_counter.flush_view_counts(FakeSession(fail_commit=True))
+    assert redis_buffer._redis.hgetall(FLUSHING_KEY) == {product_id: "3"}
+
+    db = FakeSession()
+    assert view_counter.flush_view_counts(db) == 1
+    assert _pending_views(redis_buffer) == {}
+    assert not redis_buffer._redis.exists(FLUSHING_KEY)
+
+
+def test_flush_is_skipped_while_another_worker_holds_lock(redis_buffer, server):
+    product_id = str(uuid.uuid4())
+    view_counter.record_product_view(FakeSession(), product_id)
+
+    other_worker = RedisViewBuffer("redis://fake")
+    with other_worker.draining() as counts:
+        assert counts == {product_id: 1}
+        assert view_counter.flush_view_counts(FakeSession()) == 0
+
+    assert _pending_views(redis_buffer) == {}
+
+
+def test_flush_removes_counts_after_commit(redis_buffer):
+    product_id = str(uuid.uuid4())
+    view_counter.record_product_view(FakeSession(), product_id)
+
+    db = FakeSession()
+    assert view_counter.flush_view_counts(db) == 1
+    assert db.committed == [[uuid.UUID(product_id)]]
+    assert _pending_views(redis_buffer) == {}
+
+
+def test_memory_buffer_restores_counts_on_failure(monkeypatch):
+    buffer = MemoryViewBuffer()
+    monkeypatch.setattr(view_counter, "view_buffer", buffer)
+    product_id = str(uuid.uuid4())
+    view_counter.record_product_view(FakeSession(), product_id)
+
+    with pytest.raises(RuntimeError):
+        view_counter.flush_view_counts(FakeSession(fail_commit=True))
+    with buffer.draining() as counts:
+        assert counts == {product_id: 1}